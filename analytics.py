@@ -0,0 +1,170 @@
+"""Funnel analytics: which games and durations users pick, and where they stop.
+
+Handlers call :func:`emit` with a small event (language, game, duration,
+guide or FAQ chosen); it only appends a tuple to an in-memory ring buffer.
+A JobQueue task (and shutdown) hands the buffered events to a worker thread
+that encodes them as JSON lines and appends them to ``ANALYTICS_PATH`` in one
+write, so no disk I/O or encoding happens on the event loop. When the buffer
+is full the oldest events are overwritten and counted as dropped.
+
+The file is aggregated offline, one line at a time, so logs larger than
+memory are fine; only the sets of user ids per funnel step are kept::
+
+    python analytics.py analytics.jsonl [older.jsonl ...]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, deque
+
+from config import ANALYTICS_BUFFER, ANALYTICS_PATH
+
+logger = logging.getLogger(__name__)
+
+# Event names; each carries the user id, the user's language and the fields listed.
+LANGUAGE = "language"  # (none)
+GAME = "game"          # game
+DURATION = "duration"  # game, days
+GUIDE = "guide"        # game
+FAQ = "faq"            # faq
+
+
+class EventLog:
+    """Bounded buffer of events waiting to be written."""
+
+    def __init__(self, path: str | None, capacity: int = ANALYTICS_BUFFER):
+        self.path = path
+        self.buffer: deque[tuple] = deque(maxlen=capacity)
+        self.dropped = 0
+        self.written = 0
+        self._lock = asyncio.Lock()
+
+    def emit(self, event: str, user_id: int, lang: str, **fields) -> None:
+        if self.path is None:
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((time.time(), event, user_id, lang, fields))
+
+    def _write(self, events: list[tuple]) -> None:
+        lines = []
+        for ts, event, user_id, lang, fields in events:
+            record = {"ts": round(ts, 3), "event": event, "user": user_id, "lang": lang, **fields}
+            lines.append(json.dumps(record, ensure_ascii=False))
+        # One append per batch keeps lines from several worker processes whole.
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of events written."""
+        async with self._lock:
+            if not self.buffer:
+                return 0
+            events = list(self.buffer)
+            self.buffer.clear()
+            try:
+                await asyncio.to_thread(self._write, events)
+            except OSError as exc:
+                logger.warning("Could not write %d analytics events: %s", len(events), exc)
+                self.dropped += len(events)
+                return 0
+            self.written += len(events)
+            return len(events)
+
+    def stats(self) -> dict[str, int]:
+        return {"buffered": len(self.buffer), "written": self.written, "dropped": self.dropped}
+
+
+events = EventLog(ANALYTICS_PATH)
+
+
+def emit(event: str, user_id: int, lang: str, **fields) -> None:
+    events.emit(event, user_id, lang, **fields)
+
+
+async def flush(context=None) -> None:
+    """JobQueue callback (and shutdown hook) writing the buffered events."""
+    await events.flush()
+
+
+class Funnel:
+    """Streaming aggregation of event records into per-step user sets."""
+
+    def __init__(self):
+        self.languages: dict[str, set] = defaultdict(set)
+        self.games: dict[str, set] = defaultdict(set)
+        self.durations: dict[tuple[str, str], set] = defaultdict(set)
+        self.game_buyers: dict[str, set] = defaultdict(set)
+        self.lang_games: dict[str, set] = defaultdict(set)
+        self.lang_buyers: dict[str, set] = defaultdict(set)
+        self.guides: dict[str, int] = defaultdict(int)
+        self.faqs: dict[str, int] = defaultdict(int)
+        self.records = 0
+        self.skipped = 0
+
+    def add(self, record: dict) -> None:
+        self.records += 1
+        event, user, lang = record.get("event"), record.get("user"), record.get("lang")
+        if event == LANGUAGE:
+            self.languages[lang].add(user)
+        elif event == GAME:
+            self.games[record["game"]].add(user)
+            self.lang_games[lang].add(user)
+        elif event == DURATION:
+            self.durations[(record["game"], record["days"])].add(user)
+            self.game_buyers[record["game"]].add(user)
+            self.lang_buyers[lang].add(user)
+        elif event == GUIDE:
+            self.guides[record["game"]] += 1
+        elif event == FAQ:
+            self.faqs[record["faq"]] += 1
+
+    def read(self, lines) -> None:
+        for line in lines:
+            try:
+                self.add(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                # A torn last line after a crash, or a foreign record.
+                self.skipped += 1
+
+    def report(self) -> str:
+        def rate(part: int, whole: int) -> str:
+            return f"{part / whole:.1%}" if whole else "-"
+
+        out = ["Game               chose game  chose duration  conversion"]
+        for game, users in sorted(self.games.items(), key=lambda item: -len(item[1])):
+            buyers = len(self.game_buyers[game] & users)
+            out.append(f"{game:<18} {len(users):>10}  {buyers:>14}  {rate(buyers, len(users)):>10}")
+        out += ["", "Game               days       users  share of game"]
+        for (game, days), users in sorted(self.durations.items(), key=lambda item: (item[0][0], -len(item[1]))):
+            out.append(f"{game:<18} {days:>4}  {len(users):>10}  {rate(len(users), len(self.games[game])):>13}")
+        out += ["", "Language   chose language  chose game  chose duration  conversion"]
+        for lang in sorted(set(self.languages) | set(self.lang_games)):
+            games, buyers = len(self.lang_games[lang]), len(self.lang_buyers[lang])
+            out.append(f"{lang:<10} {len(self.languages[lang]):>14}  {games:>10}  {buyers:>14}  {rate(buyers, games):>10}")
+        if self.guides:
+            guides = sorted(self.guides.items(), key=lambda item: -item[1])
+            out += ["", "Guides opened: " + ", ".join(f"{game} {count}" for game, count in guides)]
+        if self.faqs:
+            faqs = sorted(self.faqs.items(), key=lambda item: -item[1])
+            out += ["FAQ opened: " + ", ".join(f"#{faq_id} {count}" for faq_id, count in faqs)]
+        out += ["", f"{self.records} records, {self.skipped} skipped"]
+        return "\n".join(out)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate funnel analytics logs into conversion rates.")
+    parser.add_argument("paths", nargs="+", help="JSON lines files written by the bot")
+    args = parser.parse_args(argv)
+    funnel = Funnel()
+    for path in args.paths:
+        with open(path, encoding="utf-8") as f:
+            funnel.read(f)
+    print(funnel.report())
+
+
+if __name__ == "__main__":
+    main()
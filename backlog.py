@@ -0,0 +1,106 @@
+"""Startup drain of the updates that piled up while the bot was down.
+
+Replaying a backlog in order makes every old button press edit a menu the
+user has long left, spending the flood budget while fresh users wait. Before
+polling starts, :func:`drain` fetches the whole backlog and keeps, per user,
+only the latest navigation action (button press, ``/start`` or a typed
+question). Superseded button presses only get their spinner stopped with an
+answer, superseded messages and expired inline queries are dropped, and
+everything else (other commands, updates without a user) is kept. The
+remaining updates are queued in their original order and the backlog is
+confirmed, so the updater continues with new updates only.
+"""
+
+import asyncio
+import logging
+
+from telegram.error import TelegramError
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+FETCH_LIMIT = 100
+NAVIGATION_COMMANDS = frozenset({"/start"})
+
+backlog_updates = metrics.REGISTRY.counter(
+    "bot_backlog_updates_total", "Updates found in the startup backlog by outcome", ("outcome",))
+
+
+def _is_navigation(update) -> bool:
+    if update.callback_query is not None:
+        return True
+    message = update.message
+    if message is None or not message.text:
+        return False
+    if not message.text.startswith("/"):
+        return True
+    command = message.text.split()[0].split("@")[0]
+    return command in NAVIGATION_COMMANDS
+
+
+def collapse(updates: list) -> tuple[list, list, int]:
+    """Split a backlog into (updates to process, stale callback queries, dropped count)."""
+    latest: dict[int, int] = {}
+    for position, update in enumerate(updates):
+        user = update.effective_user
+        if user is not None and _is_navigation(update):
+            latest[user.id] = position
+    keep, stale, dropped = [], [], 0
+    for position, update in enumerate(updates):
+        user = update.effective_user
+        if update.inline_query is not None:
+            # Inline results are only useful while the user is still typing.
+            dropped += 1
+        elif user is None or not _is_navigation(update) or latest[user.id] == position:
+            keep.append(update)
+        elif update.callback_query is not None:
+            stale.append(update.callback_query)
+        else:
+            dropped += 1
+    return keep, stale, dropped
+
+
+async def fetch(bot) -> list:
+    """Read every pending update; each call confirms the previous batch."""
+    updates, offset = [], None
+    while True:
+        batch = await bot.get_updates(offset=offset, limit=FETCH_LIMIT, timeout=0)
+        if not batch:
+            return updates
+        updates.extend(batch)
+        offset = batch[-1].update_id + 1
+        if len(batch) < FETCH_LIMIT:
+            # Confirm the last batch too, so polling starts after it.
+            await bot.get_updates(offset=offset, limit=1, timeout=0)
+            return updates
+
+
+async def _answer(query) -> None:
+    try:
+        await query.answer()
+    except TelegramError:
+        # Too old to answer; the spinner has already timed out.
+        pass
+
+
+async def drain(app) -> None:
+    """Collapse the pending backlog and queue what is left for processing."""
+    try:
+        updates = await fetch(app.bot)
+    except TelegramError as exc:
+        logger.warning("Skipping backlog drain: %s", exc)
+        return
+    if not updates:
+        return
+    keep, stale, dropped = collapse(updates)
+    await asyncio.gather(*(_answer(query) for query in stale))
+    for update in keep:
+        await app.update_queue.put(update)
+    backlog_updates.inc("processed", amount=len(keep))
+    backlog_updates.inc("answered", amount=len(stale))
+    backlog_updates.inc("dropped", amount=dropped)
+    logger.info(
+        "Backlog of %d updates: %d queued, %d stale buttons answered, %d dropped",
+        len(updates), len(keep), len(stale), dropped,
+    )
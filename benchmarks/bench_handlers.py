@@ -0,0 +1,229 @@
+"""Per-handler microbenchmarks against the test stubs, with saved baselines.
+
+Every handler runs in isolation on fake ``Update``/``CallbackQuery``/``Message``
+objects whose Bot API methods are awaitable recorders, with the ``telegram``
+package replaced by the stand-ins from ``tests/stubs.py``: what is measured is
+the bot's own code. For each case the script reports the time per call, the
+memory blocks and bytes still held after each call (growing caches, leaks)
+and the peak bytes allocated while a call runs.
+
+    python benchmarks/bench_handlers.py                 # compare with the baseline
+    python benchmarks/bench_handlers.py --save          # record a new baseline
+    python benchmarks/bench_handlers.py --check game    # exit 1 if matching cases regressed
+
+Baselines are machine specific and kept in ``benchmarks/baselines/``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "tests")]
+
+import stubs  # noqa: E402
+
+stubs.install()
+os.environ["STATE_BACKEND"] = "memory"
+os.environ["ANALYTICS_PATH"] = os.devnull
+os.environ["ANALYTICS_BUFFER"] = str(1 << 20)
+
+import language  # noqa: E402
+import main  # noqa: E402
+import search  # noqa: E402
+from router import encode  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "handlers.json"
+USER_ID = 10_001
+
+
+class Recorder:
+    """Counts Bot API calls by method; every call is awaitable and returns at once."""
+
+    def __init__(self):
+        self.calls: dict[str, int] = {}
+        self.message_ids = iter(range(10**9))
+
+    def __call__(self, name: str, result=True):
+        async def method(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return result() if callable(result) else result
+        return method
+
+    def sent_message(self):
+        return types.SimpleNamespace(chat_id=USER_ID, message_id=next(self.message_ids))
+
+
+def fake_user(uid: int = USER_ID):
+    return types.SimpleNamespace(id=uid, is_bot=False, first_name="bench", language_code="ru")
+
+
+def fake_message(recorder: Recorder, text: str = "", message_id: int = 1):
+    user = fake_user()
+    return types.SimpleNamespace(
+        chat_id=user.id, message_id=message_id, text=text, from_user=user,
+        reply_text=recorder("sendMessage", recorder.sent_message),
+    )
+
+
+def fake_callback_query(recorder: Recorder, data: str = "", message_id: int = 1):
+    user = fake_user()
+    bot = types.SimpleNamespace(send_message=recorder("sendMessage", recorder.sent_message))
+    return types.SimpleNamespace(
+        id="1", from_user=user, data=data, message=fake_message(recorder, message_id=message_id),
+        answer=recorder("answerCallbackQuery"),
+        edit_message_text=recorder("editMessageText"),
+        get_bot=lambda: bot,
+    )
+
+
+def fake_update(callback_query=None, message=None, inline_query=None, update_id: int = 1):
+    source = callback_query or message or inline_query
+    return types.SimpleNamespace(
+        update_id=update_id, effective_user=source.from_user,
+        callback_query=callback_query, message=message, inline_query=inline_query,
+    )
+
+
+def press(recorder: Recorder, data: str = ""):
+    return fake_update(callback_query=fake_callback_query(recorder, data))
+
+
+def dispatch_case(recorder: Recorder):
+    # Alternate two screens on one message so every call really edits it.
+    updates = [press(recorder, encode("game", "pubg")), press(recorder, encode("main"))]
+    state = {"next": 0}
+
+    def call():
+        state["next"] ^= 1
+        return main.callbacks.dispatch(updates[state["next"]], None)
+    return call
+
+
+def cases(recorder: Recorder) -> dict:
+    """name -> zero-argument function returning the coroutine to await."""
+    version = main.catalog_version()
+    start = fake_update(message=fake_message(recorder, "/start"))
+    question = fake_update(message=fake_message(recorder, "how to enable spoofer"))
+    inline = fake_update(inline_query=types.SimpleNamespace(
+        from_user=fake_user(), query="pubg 30", answer=recorder("answerInlineQuery")))
+    update = press(recorder)
+    return {
+        "start_command": lambda: main.start_command(start, types.SimpleNamespace(args=[])),
+        "start_deep_link": lambda: main.start_command(start, types.SimpleNamespace(args=["pubg_30"])),
+        "handle_language_selection": lambda: language.handle_language_selection(
+            update, None, "ru", main_menu_fn=main.main_menu),
+        "back_to_main": lambda: main.back_to_main(update, None),
+        "menu_handler": lambda: main.menu_handler(update, None),
+        "game_selected": lambda: main.game_selected(update, None, "pubg"),
+        "subscription_selected": lambda: main.subscription_selected(update, None, "pubg", "30", version),
+        "subscription_outdated": lambda: main.subscription_selected(update, None, "pubg", "30", "stale"),
+        "guide_handler": lambda: main.guide_handler(update, None, "pubg", version),
+        "send_loader_info": lambda: main.send_loader_info(update, None),
+        "show_faq": lambda: main.show_faq(update, None),
+        "send_faq_link": lambda: main.send_faq_link(update, None, "7"),
+        "support_handler": lambda: main.support_handler(update, None),
+        "change_language": lambda: main.change_language(update, None),
+        "stale_callback": lambda: main.stale_callback(update, None),
+        "dispatch_and_respond": dispatch_case(recorder),
+        "inline_query": lambda: search.inline_query(inline, None),
+        "faq_message": lambda: search.faq_message(question, None),
+    }
+
+
+async def _batch(call, calls: int) -> None:
+    for _ in range(calls):
+        await call()
+
+
+def measure(loop, call, calls: int, repeat: int) -> dict[str, float]:
+    loop.run_until_complete(_batch(call, calls))  # warm caches first
+    best = min(_timed(loop, call, calls) for _ in range(repeat))
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    loop.run_until_complete(_batch(call, calls))
+    after = tracemalloc.take_snapshot()
+    stats = after.compare_to(before, "filename")
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    loop.run_until_complete(_batch(call, 1))
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {
+        "us": best / calls * 1e6,
+        "blocks": sum(s.count_diff for s in stats) / calls,
+        "bytes": sum(s.size_diff for s in stats) / calls,
+        "peak": peak,
+    }
+
+
+def _timed(loop, call, calls: int) -> float:
+    started = time.perf_counter()
+    loop.run_until_complete(_batch(call, calls))
+    return time.perf_counter() - started
+
+
+def regressions(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Metrics of one case that got worse than ``baseline`` allows."""
+    worse = []
+    if result["us"] > baseline["us"] * (1 + tolerance):
+        worse.append("time")
+    if result["blocks"] > baseline["blocks"] + 0.5:
+        worse.append("retained")
+    if result["peak"] > baseline["peak"] * (1 + tolerance) + 256:
+        worse.append("peak")
+    return worse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help="only run cases whose name contains one of these")
+    parser.add_argument("--calls", type=int, default=2000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs; the fastest counts")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="baseline file")
+    return parser.parse_args(argv)
+
+
+def main_(argv=None) -> int:
+    args = parse_args(argv)
+    main.build_all()
+    recorder = Recorder()
+    selected = {
+        name: call for name, call in cases(recorder).items()
+        if not args.cases or any(part in name for part in args.cases)
+    }
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    loop = asyncio.new_event_loop()
+    results, failed = {}, []
+    print(f"{'handler':<26} {'us/call':>8} {'blocks':>7} {'bytes':>8} {'peak B':>8}  vs baseline")
+    for name, call in selected.items():
+        result = results[name] = measure(loop, call, args.calls, args.repeat)
+        note = ""
+        if name in baseline:
+            change = result["us"] / baseline[name]["us"] - 1
+            worse = regressions(result, baseline[name], args.tolerance)
+            note = f"{change:+6.0%}" + (f"  REGRESSION: {', '.join(worse)}" if worse else "")
+            if worse:
+                failed.append(name)
+        print(f"{name:<26} {result['us']:>8.2f} {result['blocks']:>7.1f} {result['bytes']:>8.0f} "
+              f"{result['peak']:>8.0f}  {note}")
+    loop.close()
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+        print(f"baseline saved to {args.baseline}")
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_(sys.argv[1:]))
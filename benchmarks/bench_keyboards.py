@@ -0,0 +1,76 @@
+"""Compare per-callback keyboard allocations with and without the registry.
+
+Run from the repository root with the requirements installed::
+
+    python benchmarks/bench_keyboards.py
+"""
+
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup  # noqa: E402
+
+import keyboards  # noqa: E402
+from catalog import faq, texts  # noqa: E402
+
+LANG = "ru"
+
+
+def rebuild_faq(lang: str) -> InlineKeyboardMarkup:
+    """The pre-registry ``show_faq`` keyboard construction."""
+    keyboard = [
+        [InlineKeyboardButton(entry["title"][lang], callback_data=faq_id)] for faq_id, entry in faq.items()
+    ]
+    keyboard.append([InlineKeyboardButton(texts(lang)["back"], callback_data="back_to_main")])
+    return InlineKeyboardMarkup(keyboard)
+
+
+def rebuild_main(lang: str) -> InlineKeyboardMarkup:
+    """The pre-registry ``build_main_menu_keyboard``."""
+    return keyboards._build_main(lang)
+
+
+def rebuild_game(lang: str) -> InlineKeyboardMarkup:
+    """The pre-registry ``game_selected`` keyboard construction."""
+    return keyboards._build_game(lang, "pubg")
+
+
+CASES = {
+    "faq": (rebuild_faq, lambda lang: keyboards.get_keyboard("faq", lang)),
+    "main": (rebuild_main, lambda lang: keyboards.get_keyboard("main", lang)),
+    "game": (rebuild_game, lambda lang: keyboards.get_keyboard("game", lang, "pubg")),
+}
+
+
+def allocations(fn, calls: int = 1000) -> tuple[float, float]:
+    """Return (allocated blocks, bytes) per call of ``fn``."""
+    fn(LANG)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [fn(LANG) for _ in range(calls)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    del keep
+    # The list holding the results accounts for one pointer per call.
+    return blocks / calls, size / calls
+
+
+def main() -> None:
+    keyboards.build_all()
+    print(f"{'menu':<6} {'variant':<9} {'blocks/call':>12} {'bytes/call':>12} {'us/call':>9}")
+    for name, (before, after) in CASES.items():
+        for variant, fn in (("rebuild", before), ("registry", after)):
+            blocks, size = allocations(fn)
+            seconds = timeit.timeit(lambda: fn(LANG), number=2000) / 2000
+            print(f"{name:<6} {variant:<9} {blocks:>12.1f} {size:>12.0f} {seconds * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Measure callback dispatch cost: twelve regex handlers vs. the table router.
+
+The "regex" variant reproduces the previous handler registration and asks
+each ``CallbackQueryHandler`` in turn whether it accepts the update, exactly
+as PTB does. The "router" variant checks the single catch-all handler and
+then decodes the payload once for a dict lookup. Handlers are not executed.
+
+    python benchmarks/bench_router.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from telegram import CallbackQuery, Update, User  # noqa: E402
+from telegram.ext import CallbackQueryHandler  # noqa: E402
+
+import router  # noqa: E402
+
+
+async def noop(update, context):
+    pass
+
+
+LEGACY_PATTERNS = [
+    "^lang_", "^menu_", "^choose_", "^sub_", "^guide$", "^faq_", "^faq$",
+    "^back_to_main$", "^support$", "^download_loader$", "^change_language$",
+]
+LEGACY_DATA = [
+    "lang_ru", "menu_choose_game", "choose_pubg", "sub_30", "guide",
+    "faq", "faq_7", "back_to_main", "support", "download_loader", "change_language",
+]
+ROUTED_DATA = [
+    router.encode("lang", "ru"), router.encode("games"), router.encode("game", "pubg"),
+    router.encode("sub", "30"), router.encode("guide"), router.encode("faqs"), router.encode("faq", "7"),
+    router.encode("main"), router.encode("support"), router.encode("loader"), router.encode("language"),
+]
+
+USER = User(1, "bench", False)
+
+
+def make_updates(payloads):
+    return [
+        Update(i, callback_query=CallbackQuery(str(i), USER, "bench", data=data))
+        for i, data in enumerate(payloads)
+    ]
+
+
+def legacy_dispatch(handlers, updates):
+    for update in updates:
+        for handler in handlers:
+            if handler.check_update(update):
+                break
+
+
+def routed_dispatch(handler, routes, updates):
+    for update in updates:
+        if handler.check_update(update):
+            parsed = router.decode(update.callback_query.data)
+            routes.get(parsed[0])
+
+
+def main() -> None:
+    legacy_handlers = [CallbackQueryHandler(noop, pattern=p) for p in LEGACY_PATTERNS]
+    legacy_updates = make_updates(LEGACY_DATA)
+    catch_all = CallbackQueryHandler(noop)
+    routes = {router.decode(data)[0]: noop for data in ROUTED_DATA}
+    routed_updates = make_updates(ROUTED_DATA)
+
+    number = 5000
+    per_update = number * len(LEGACY_DATA)
+    legacy = timeit.timeit(lambda: legacy_dispatch(legacy_handlers, legacy_updates), number=number)
+    routed = timeit.timeit(lambda: routed_dispatch(catch_all, routes, routed_updates), number=number)
+    print(f"regex handlers: {legacy / per_update * 1e6:6.2f} us/update")
+    print(f"table router:   {routed / per_update * 1e6:6.2f} us/update")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Local stand-in for the Telegram Bot API used by the load tools.
+
+Serves ``getMe`` and long-polled ``getUpdates`` from an in-memory queue and
+records every other call (``sendMessage``, ``editMessageText``,
+``answerCallbackQuery``, ...) so a test driver can wait for the bot's replies.
+Point the bot at it with ``base_url=f"{api.base_url}/bot"``.
+"""
+
+import asyncio
+import itertools
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from httpserver import Request, Response, start_server  # noqa: E402
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Load test", "username": "loadtest_bot"}
+MESSAGE_METHODS = frozenset({"sendMessage", "editMessageText"})
+
+
+def _params(request: Request) -> dict:
+    if request.headers.get("content-type", "").startswith("application/json"):
+        return request.json() or {}
+    params = {}
+    for key, value in parse_qsl(request.body.decode()):
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+class FakeBotApi:
+    """Minimal Bot API server; replies are delivered to per-chat waiters."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: dict[str, int] = defaultdict(int)
+        self.calls_by_chat: dict[int, int] = defaultdict(int)
+        self._updates: list[dict] = []
+        self._new_updates = asyncio.Event()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1000)
+        self._waiters: dict[int, list[asyncio.Future]] = defaultdict(list)
+        self.delivered_at: dict[int, float] = {}
+        self.server = None
+        self.base_url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.server = await start_server(self.handle, host, port)
+        port = self.server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Release pending long polls so their connections close cleanly."""
+        self.server.close()
+        self._new_updates.set()
+        await asyncio.sleep(0.1)
+
+    def push(self, update: dict) -> int:
+        update_id = next(self._update_ids)
+        update["update_id"] = update_id
+        self._updates.append(update)
+        self._new_updates.set()
+        return update_id
+
+    def wait_for_reply(self, chat_id: int) -> asyncio.Future:
+        """Future resolved with (method, params, message) on the next message call for ``chat_id``."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[chat_id].append(future)
+        return future
+
+    async def handle(self, request: Request) -> Response:
+        method = request.path.rsplit("/", 1)[-1]
+        params = _params(request)
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if method == "getMe":
+            return Response.json({"ok": True, "result": BOT_USER})
+        if method == "getUpdates":
+            return Response.json({"ok": True, "result": await self._get_updates(params)})
+        chat_id = params.get("chat_id")
+        if chat_id is not None:
+            self.calls_by_chat[int(chat_id)] += 1
+        if method in MESSAGE_METHODS:
+            message = {
+                "message_id": params.get("message_id") or next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+            waiters = self._waiters.get(int(chat_id))
+            if waiters:
+                future = waiters.pop(0)
+                if not future.done():
+                    future.set_result((method, params, message))
+            return Response.json({"ok": True, "result": message})
+        return Response.json({"ok": True, "result": True})
+
+    async def _get_updates(self, params: dict) -> list[dict]:
+        offset = int(params.get("offset") or 0)
+        if offset:
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), float(params.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                pass
+        batch = self._updates[: int(params.get("limit") or 100)]
+        now = time.perf_counter()
+        for update in batch:
+            self.delivered_at.setdefault(update["update_id"], now)
+        return batch
+
+
+def user(uid: int) -> dict:
+    return {"id": uid, "is_bot": False, "first_name": f"user{uid}", "language_code": "en"}
+
+
+def command_update(uid: int, text: str) -> dict:
+    command = text.split()[0]
+    return {
+        "message": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": uid, "type": "private"},
+            "from": user(uid),
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+        }
+    }
+
+
+def callback_update(uid: int, message_id: int, data: str) -> dict:
+    return {
+        "callback_query": {
+            "id": f"{uid}-{message_id}-{time.perf_counter_ns()}",
+            "from": user(uid),
+            "chat_instance": str(uid),
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": uid, "type": "private"},
+                "from": BOT_USER,
+                "text": "menu",
+            },
+        }
+    }
@@ -0,0 +1,165 @@
+"""End-to-end load test of the real handlers against a local fake Bot API.
+
+Every synthetic user runs the journey /start -> language -> menu -> game ->
+subscription -> main menu -> FAQ -> FAQ entry, waiting for the bot's reply
+before pressing the next button, like a real user would. Reports throughput,
+handler latency percentiles (update delivered -> reply received) and API
+calls per journey. No network access is needed.
+
+    python benchmarks/loadtest.py --users 10 100 1000
+    python benchmarks/loadtest.py --users 1000 --processes 4
+    python benchmarks/loadtest.py --users 500 --api-latency 0.05 --pool-size 8
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fakeapi import FakeBotApi, callback_update, command_update  # noqa: E402
+
+MAIN = Path(__file__).resolve().parents[1] / "main.py"
+TOKEN = "123456:LOADTEST"
+UNLIMITED_RATE = "1000000"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[100], help="user counts to run")
+    parser.add_argument("--workers", type=int, default=32, help="MAX_CONCURRENT_UPDATES for the bot")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="seconds added to every API call")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="run the bot as a supervisor with this many worker processes")
+    parser.add_argument("--flood-limits", action="store_true", help="keep the production flood limits")
+    parser.add_argument("--pool-size", type=int, help="HTTP_POOL_SIZE connections for replies")
+    parser.add_argument("--keepalive", type=float, help="HTTP_KEEPALIVE seconds")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args) -> None:
+    """Settings must be in place before config.py is imported."""
+    os.environ["STATE_BACKEND"] = "memory"
+    os.environ["ANALYTICS_PATH"] = os.devnull
+    os.environ["MAX_CONCURRENT_UPDATES"] = str(args.workers)
+    if args.pool_size is not None:
+        os.environ["HTTP_POOL_SIZE"] = str(args.pool_size)
+    if args.keepalive is not None:
+        os.environ["HTTP_KEEPALIVE"] = str(args.keepalive)
+    if not args.flood_limits:
+        os.environ["FLOOD_OVERALL_RATE"] = UNLIMITED_RATE
+        os.environ["FLOOD_CHAT_RATE"] = UNLIMITED_RATE
+
+
+def journey():
+    from catalog import current
+    from router import encode
+
+    version = current().version
+    return [
+        ("command", "/start"),
+        ("callback", encode("lang", "ru")),
+        ("callback", encode("games")),
+        ("callback", encode("game", "pubg")),
+        ("callback", encode("sub", "pubg", "30", version)),
+        ("callback", encode("main")),
+        ("callback", encode("faqs")),
+        ("callback", encode("faq", "7")),
+    ]
+
+
+async def run_user(api: FakeBotApi, uid: int, steps, latencies: list[float]) -> None:
+    message_id = None
+    for kind, payload in steps:
+        reply = api.wait_for_reply(uid)
+        if kind == "command":
+            update_id = api.push(command_update(uid, payload))
+        else:
+            update_id = api.push(callback_update(uid, message_id, payload))
+        _, _, message = await asyncio.wait_for(reply, 60)
+        latencies.append(time.perf_counter() - api.delivered_at[update_id])
+        message_id = message["message_id"]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+async def drive(api: FakeBotApi, users: int) -> tuple[list[float], float]:
+    steps = journey()
+    latencies: list[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_user(api, 10_000 + i, steps, latencies) for i in range(users)))
+    return latencies, time.perf_counter() - started
+
+
+async def run_in_process(api: FakeBotApi, users: int) -> tuple[list[float], float]:
+    import main
+
+    app = main.build_application(TOKEN, base_url=f"{api.base_url}/bot")
+    async with app:
+        await app.start()
+        await app.updater.start_polling(timeout=1)
+        result = await drive(api, users)
+        await app.updater.stop()
+        await app.stop()
+    return result
+
+
+async def run_supervised(api: FakeBotApi, users: int, processes: int) -> tuple[list[float], float]:
+    env = dict(os.environ, BOT_TOKEN=TOKEN, BOT_API_URL=f"{api.base_url}/bot", METRICS_PORT="0")
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, str(MAIN), "--mode", "supervisor", "--workers", str(processes),
+        env=env, stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        # Every worker calls getMe once it is up.
+        while api.calls["getMe"] < processes:
+            await asyncio.sleep(0.05)
+        return await drive(api, users)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        await proc.wait()
+
+
+async def run(users: int, processes: int = 0, api_latency: float = 0.0) -> dict:
+    api = FakeBotApi(api_latency)
+    await api.start()
+    if processes:
+        latencies, elapsed = await run_supervised(api, users, processes)
+    else:
+        latencies, elapsed = await run_in_process(api, users)
+    await api.stop()
+    api_calls = sum(count for method, count in api.calls.items() if method not in ("getUpdates", "getMe", "deleteWebhook"))
+    return {
+        "users": users,
+        "updates": len(latencies),
+        "seconds": elapsed,
+        "updates_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "calls_per_journey": api_calls / users,
+    }
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    configure_environment(args)
+    print(f"{'users':>6} {'updates':>8} {'sec':>7} {'upd/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'calls/journey':>14}")
+    for users in args.users:
+        r = asyncio.run(run(users, args.processes, args.api_latency))
+        print(
+            f"{r['users']:>6} {r['updates']:>8} {r['seconds']:>7.2f} {r['updates_per_s']:>8.0f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['calls_per_journey']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
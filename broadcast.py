@@ -0,0 +1,187 @@
+"""Admin broadcasts: one announcement to every known user in their language.
+
+``/broadcast <key>`` sends the catalog text ``key`` (e.g. ``status_updated``)
+translated into each user's stored language; ``/broadcast <text>`` sends the
+text as is and ``/broadcast`` alone reports progress. Recipients are the users
+in the language store, visited in user id order.
+
+Before a batch is sent its last user id is checkpointed in the state store, so
+a broadcast interrupted by a restart resumes after that batch: a crash can
+cost one batch of recipients but never sends anyone the message twice. Every
+worker checks for a broadcast whose process died and claims it with a
+compare-and-set on the record, so exactly one of them continues it. Sends
+are paced by their own token bucket below the global flood limit, leaving
+headroom for interactive traffic, and users who blocked the bot or deleted
+their account are removed from the store.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+
+from telegram import Update
+from telegram.error import BadRequest, Forbidden, TelegramError
+from telegram.ext import ContextTypes
+
+import catalog
+from catalog import texts
+from config import ADMIN_IDS, BROADCAST_BATCH_SIZE, BROADCAST_RATE
+from language import user_languages
+from ratelimit import TokenBucket
+from storage import get_store
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "broadcast"
+RECORD_ID = 0
+STALE_SECONDS = 120
+RESUME_INTERVAL = 30
+
+_task: asyncio.Task | None = None
+
+
+@dataclass
+class Broadcast:
+    key: str | None
+    text: str | None
+    admin_chat: int
+    started_at: float = field(default_factory=time.time)
+    last_user: int = -1
+    sent: int = 0
+    pruned: int = 0
+    failed: int = 0
+    done: bool = False
+    owner: int = field(default_factory=os.getpid)
+    updated_at: float = field(default_factory=time.time)
+
+    def message(self, lang: str) -> str:
+        return texts(lang)[self.key] if self.key else self.text
+
+    def summary(self) -> str:
+        state = "finished" if self.done else "in progress"
+        return f"Broadcast {state}: {self.sent} sent, {self.pruned} removed, {self.failed} failed"
+
+
+def load() -> Broadcast | None:
+    # Read past the cache: the record is written by whichever worker runs the broadcast.
+    raw = get_store().fetch(NAMESPACE, RECORD_ID)
+    return Broadcast(**json.loads(raw)) if raw else None
+
+
+async def save(job: Broadcast) -> None:
+    """Persist ``job`` immediately; the checkpoint must hit the disk before sending."""
+    job.updated_at = time.time()
+    store = get_store()
+    store.set(NAMESPACE, RECORD_ID, json.dumps(asdict(job)))
+    await asyncio.to_thread(store.flush)
+
+
+def _owner_alive(job: Broadcast) -> bool:
+    if job.owner == os.getpid():
+        return _task is not None and not _task.done()
+    try:
+        os.kill(job.owner, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return time.time() - job.updated_at < STALE_SECONDS
+
+
+async def _send(bot, user_id: int, job: Broadcast, bucket: TokenBucket) -> None:
+    await bucket.acquire()
+    try:
+        await bot.send_message(user_id, job.message(user_languages.get(user_id, "en")))
+    except Forbidden:
+        # Blocked the bot or deactivated the account.
+        get_store().delete(user_languages.namespace, user_id)
+        job.pruned += 1
+        return
+    except BadRequest as exc:
+        if "chat not found" in str(exc).lower():
+            get_store().delete(user_languages.namespace, user_id)
+            job.pruned += 1
+        else:
+            logger.warning("Broadcast to %s failed: %s", user_id, exc)
+            job.failed += 1
+        return
+    except TelegramError as exc:
+        logger.warning("Broadcast to %s failed: %s", user_id, exc)
+        job.failed += 1
+        return
+    job.sent += 1
+
+
+async def run(bot, job: Broadcast, rate: float = BROADCAST_RATE, batch_size: int = BROADCAST_BATCH_SIZE) -> Broadcast:
+    """Send ``job`` to every user after its checkpoint."""
+    bucket = TokenBucket(rate, 1)
+    users = get_store().users(user_languages.namespace, after=job.last_user)
+    job.owner = os.getpid()
+    # Reading the user table flushes the store and queries SQLite: keep it off the event loop.
+    while batch := await asyncio.to_thread(lambda: list(islice(users, batch_size))):
+        job.last_user = batch[-1]
+        await save(job)
+        await asyncio.gather(*(_send(bot, user_id, job, bucket) for user_id in batch))
+    job.done = True
+    await save(job)
+    logger.info(job.summary())
+    try:
+        await bot.send_message(job.admin_chat, job.summary())
+    except TelegramError:
+        logger.warning("Could not report the broadcast result to %s", job.admin_chat)
+    return job
+
+
+def _start(application, job: Broadcast) -> None:
+    global _task
+    _task = application.create_task(run(application.bot, job))
+
+
+async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+    message = update.message
+    _, _, argument = message.text.partition(" ")
+    argument = argument.strip()
+    job = load()
+    if not argument:
+        await message.reply_text(job.summary() if job else "No broadcasts yet.")
+        return
+    if job and not job.done and _owner_alive(job):
+        await message.reply_text("A broadcast is already running. " + job.summary())
+        return
+    key = argument if argument in catalog.translations else None
+    job = Broadcast(key=key, text=None if key else argument, admin_chat=message.chat_id)
+    await save(job)
+    _start(context.application, job)
+    audience = await asyncio.to_thread(get_store().count, user_languages.namespace)
+    await message.reply_text(f"Broadcast started for {audience} users.")
+
+
+def claim() -> Broadcast | None:
+    """Take over an unfinished broadcast whose process is gone; None if there is none or another worker won."""
+    store = get_store()
+    raw = store.fetch(NAMESPACE, RECORD_ID)
+    if raw is None:
+        return None
+    job = Broadcast(**json.loads(raw))
+    if job.done or _owner_alive(job):
+        return None
+    job.owner = os.getpid()
+    job.updated_at = time.time()
+    if not store.compare_and_set(NAMESPACE, RECORD_ID, raw, json.dumps(asdict(job))):
+        return None
+    return job
+
+
+async def resume(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Repeating JobQueue callback that continues a broadcast interrupted by a crash."""
+    job = await asyncio.to_thread(claim)
+    if job is None:
+        return
+    logger.info("Resuming broadcast after user %s", job.last_user)
+    _start(context.application, job)
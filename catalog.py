@@ -0,0 +1,351 @@
+"""Product catalog, FAQ and translations loaded from ``catalog.json``.
+
+The file is validated once per load and compiled into a read-only
+:class:`Catalog` snapshot: per-language flat text tables (falling back to
+English), pre-parsed templates and pre-rendered static messages such as every
+(game, duration, language) offer. Reloads swap the snapshot atomically and notify
+subscribers (keyboard registry, search indexes, ...) so derived caches are
+rebuilt. A broken file is logged and ignored; the bot keeps serving the last
+good catalog.
+"""
+
+import json
+import logging
+import os
+import string
+import zlib
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable
+
+from config import CATALOG_PATH, LOADER_URL
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_LANGUAGE = "en"
+
+# Keys the handlers rely on; these must be translated into every language.
+REQUIRED_TRANSLATIONS = (
+    "start", "language_selected", "choose_game", "choose_subscription", "day", "days",
+    "subscription_result", "back", "menu_title", "menu_website", "menu_game", "menu_loader",
+    "menu_status", "menu_support", "menu_language", "menu_instruction", "menu_faq",
+    "loader_password", "session_timeout", "faq_no_match", "faq_suggestions",
+)
+
+# Placeholders each template is rendered with; a translation may use any subset.
+TEMPLATE_FIELDS = {
+    "loader_password": frozenset({"url"}),
+    "subscription_result": frozenset({"title", "days", "desc", "link"}),
+    "status_changed": frozenset({"game", "status"}),
+}
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog file is malformed."""
+
+
+class Template:
+    """A ``str.format`` template parsed once at load time.
+
+    Only plain ``{name}`` placeholders are supported; format specs,
+    conversions, positional and attribute fields raise ``ValueError``.
+    """
+
+    __slots__ = ("source", "parts", "fields")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if field is not None and (not field.isidentifier() or spec or conversion):
+                suffix = (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "")
+                raise ValueError(f"unsupported placeholder {{{field}{suffix}}}, use a plain {{name}}")
+            parts.append((literal, field))
+        self.parts = tuple(parts)
+        self.fields = frozenset(field for _, field in self.parts if field is not None)
+
+    def render(self, **values) -> str:
+        out = []
+        for literal, field in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return "".join(out)
+
+
+def escape_markdown(text: str) -> str:
+    """Escape characters that have special meaning in Markdown."""
+    return text.replace("_", "\\_")
+
+
+@dataclass(frozen=True)
+class Catalog:
+    languages: tuple[str, ...]
+    language_labels: Mapping[str, str]
+    games: Mapping[str, Mapping]
+    faq: Mapping[str, Mapping]
+    translations: Mapping[str, Mapping[str, str]]
+    version: str
+    tables: Mapping[str, Mapping[str, str]]
+    templates: Mapping[str, Mapping[str, Template]]
+    rendered: Mapping[tuple, str]
+    coverage: Mapping[str, float]
+    path: str | None = None
+    mtime: float | None = None
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_freeze(item) for item in value]
+    return value
+
+
+def _require(condition: bool, message: str) -> None:
+    if not condition:
+        raise CatalogError(message)
+
+
+def _check_localized(value, languages, where: str) -> None:
+    _require(isinstance(value, dict), f"{where} must be an object keyed by language")
+    missing = [lang for lang in languages if not isinstance(value.get(lang), str)]
+    _require(not missing, f"{where} is missing languages: {', '.join(missing)}")
+
+
+def validate(data) -> None:
+    """Check the structure of raw catalog data, raising :class:`CatalogError`."""
+    _require(isinstance(data, dict), "catalog must be a JSON object")
+    languages = data.get("languages")
+    _require(isinstance(languages, dict) and languages, "languages must be a non-empty object")
+    _require("en" in languages, "languages must include en")
+
+    games = data.get("games")
+    _require(isinstance(games, dict) and games, "games must be a non-empty object")
+    for gid, game in games.items():
+        where = f"games.{gid}"
+        _require(isinstance(game, dict), f"{where} must be an object")
+        _require(isinstance(game.get("title"), str), f"{where}.title must be a string")
+        _require(isinstance(game.get("guide"), str), f"{where}.guide must be a string")
+        _check_localized(game.get("description"), languages, f"{where}.description")
+        links = game.get("links")
+        durations = game.get("durations")
+        _require(isinstance(links, dict), f"{where}.links must be an object")
+        _require(isinstance(durations, list) and durations, f"{where}.durations must be a non-empty list")
+        for days in durations:
+            _require(isinstance(days, str) and days.isdigit(), f"{where}.durations has invalid value {days!r}")
+            _require(isinstance(links.get(days), str), f"{where}.links has no link for {days} days")
+
+    faq = data.get("faq")
+    _require(isinstance(faq, dict), "faq must be an object")
+    for faq_id, entry in faq.items():
+        where = f"faq.{faq_id}"
+        _require(isinstance(entry, dict), f"{where} must be an object")
+        _check_localized(entry.get("title"), languages, f"{where}.title")
+        _require(isinstance(entry.get("link"), str), f"{where}.link must be a string")
+        keywords = entry.get("keywords", [])
+        _require(
+            isinstance(keywords, list) and all(isinstance(k, str) for k in keywords),
+            f"{where}.keywords must be a list of strings",
+        )
+
+    translations = data.get("translations")
+    _require(isinstance(translations, dict), "translations must be an object")
+    missing = [key for key in REQUIRED_TRANSLATIONS if key not in translations]
+    _require(not missing, f"translations are missing keys: {', '.join(missing)}")
+    for key, texts in translations.items():
+        where = f"translations.{key}"
+        if key in REQUIRED_TRANSLATIONS:
+            _check_localized(texts, languages, where)
+        else:
+            _check_localized(texts, (FALLBACK_LANGUAGE,), where)
+        for lang, text in texts.items():
+            _require(isinstance(text, str), f"{where}.{lang} must be a string")
+        try:
+            fields = Template(texts[FALLBACK_LANGUAGE]).fields
+            allowed = TEMPLATE_FIELDS.get(key, frozenset())
+            _require(fields <= allowed, f"{where} uses unknown placeholders: {sorted(fields - allowed)}")
+            for lang, text in texts.items():
+                _require(Template(text).fields == fields, f"{where}.{lang} uses different placeholders than en")
+        except ValueError as exc:
+            if isinstance(exc, CatalogError):
+                raise
+            raise CatalogError(f"{where} is not a valid template: {exc}") from exc
+
+
+def _compile_texts(data) -> tuple[dict, dict, dict]:
+    """Build flat per-language tables, templates and the coverage report."""
+    languages = tuple(data["languages"])
+    translations = data["translations"]
+    tables, templates, coverage = {}, {}, {}
+    for lang in languages:
+        table = {key: texts.get(lang, texts[FALLBACK_LANGUAGE]) for key, texts in translations.items()}
+        tables[lang] = MappingProxyType(table)
+        templates[lang] = MappingProxyType(
+            {key: Template(text) for key, text in table.items() if "{" in text or key in TEMPLATE_FIELDS}
+        )
+        translated = sum(1 for texts in translations.values() if lang in texts)
+        coverage[lang] = translated / len(translations)
+    return tables, templates, coverage
+
+
+def _render_static(data, tables, templates) -> dict:
+    """Pre-render every message whose inputs are all known at load time."""
+    rendered = {}
+    for lang, table in tables.items():
+        rendered[("loader", lang)] = templates[lang]["loader_password"].render(url=LOADER_URL)
+        for gid, game in data["games"].items():
+            rendered[("guide", gid, lang)] = f"{table['menu_instruction']}\n{escape_markdown(game['guide'])}"
+            for days in game["durations"]:
+                word = table["day"] if days == "1" else table["days"]
+                rendered[("duration", days, lang)] = f"{days} {word}"
+                rendered[("offer", gid, days, lang)] = templates[lang]["subscription_result"].render(
+                    title=game["title"], days=days, desc=game["description"][lang], link=game["links"][days]
+                )
+    return rendered
+
+
+def compile_catalog(data, path: str | None = None, mtime: float | None = None) -> Catalog:
+    """Validate raw data and build an immutable :class:`Catalog` snapshot."""
+    validate(data)
+    fingerprint = json.dumps(data["games"], sort_keys=True, ensure_ascii=False).encode()
+    tables, templates, coverage = _compile_texts(data)
+    return Catalog(
+        languages=tuple(data["languages"]),
+        language_labels=_freeze(data["languages"]),
+        games=_freeze(data["games"]),
+        faq=_freeze(data["faq"]),
+        translations=_freeze(data["translations"]),
+        version=format(zlib.crc32(fingerprint), "08x"),
+        tables=MappingProxyType(tables),
+        templates=MappingProxyType(templates),
+        rendered=MappingProxyType(_render_static(data, tables, templates)),
+        coverage=MappingProxyType(coverage),
+        path=path,
+        mtime=mtime,
+    )
+
+
+def load(path: str | os.PathLike) -> Catalog:
+    path = str(path)
+    mtime = os.stat(path).st_mtime
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except ValueError as exc:
+            # Invalid JSON or not UTF-8.
+            raise CatalogError(f"{path}: {exc}") from exc
+    return compile_catalog(data, path, mtime)
+
+
+_current: Catalog = load(CATALOG_PATH)
+_subscribers: list[Callable[[Catalog], None]] = []
+_seen_mtime = _current.mtime
+
+
+def current() -> Catalog:
+    return _current
+
+
+def supported(lang: str | None) -> str:
+    """``lang`` if the current catalog has it, otherwise the fallback language."""
+    return lang if lang in _current.tables else FALLBACK_LANGUAGE
+
+
+def texts(lang: str) -> Mapping[str, str]:
+    """Flat text table for ``lang``, or the English one for unknown languages."""
+    tables = _current.tables
+    return tables.get(lang) or tables[FALLBACK_LANGUAGE]
+
+
+def rendered(*key: str) -> str | None:
+    """Pre-rendered message, e.g. ``rendered("offer", "pubg", "30", "ru")``."""
+    return _current.rendered.get(key)
+
+
+def coverage_report(catalog: Catalog) -> str:
+    parts = ", ".join(f"{lang} {share:.0%}" for lang, share in catalog.coverage.items())
+    return (
+        f"catalog {catalog.version}: {len(catalog.translations)} keys, {parts}; "
+        f"{len(catalog.rendered)} texts pre-rendered"
+    )
+
+
+def subscribe(callback: Callable[[Catalog], None]) -> None:
+    """Call ``callback(catalog)`` after every successful reload."""
+    _subscribers.append(callback)
+
+
+def _publish(catalog: Catalog) -> None:
+    global _current
+    _current = catalog
+    for callback in _subscribers:
+        callback(catalog)
+
+
+def install(catalog: Catalog) -> bool:
+    """Swap in ``catalog``; roll back if a derived cache cannot be rebuilt."""
+    previous = _current
+    try:
+        _publish(catalog)
+    except Exception:
+        logger.exception("Rebuilding caches for the new catalog failed, keeping the previous one")
+        _publish(previous)
+        return False
+    logger.info("Loaded %s from %s", coverage_report(catalog), catalog.path)
+    return True
+
+
+def reload(path: str | os.PathLike | None = None) -> bool:
+    """Load the catalog file again; on any error keep serving the current one."""
+    path = path or _current.path
+    try:
+        catalog = load(path)
+    except (OSError, CatalogError) as exc:
+        logger.error("Ignoring invalid catalog %s: %s", path, exc)
+        return False
+    except Exception:
+        # A validation gap must not take the JobQueue (or startup reloads) down with it.
+        logger.exception("Compiling catalog %s failed, keeping the current one", path)
+        return False
+    return install(catalog)
+
+
+def reload_if_changed() -> bool:
+    """Reload when the file's mtime moved; a bad version is only reported once."""
+    global _seen_mtime
+    try:
+        mtime = os.stat(_current.path).st_mtime
+    except OSError:
+        return False
+    if mtime == _seen_mtime:
+        return False
+    _seen_mtime = mtime
+    return reload()
+
+
+async def watch(context) -> None:
+    """JobQueue callback that picks up edits to the catalog file."""
+    reload_if_changed()
+
+
+class CatalogView(Mapping):
+    """Read-only mapping that always reflects the current catalog."""
+
+    def __init__(self, field: str):
+        self._field = field
+
+    def __getitem__(self, key):
+        return getattr(_current, self._field)[key]
+
+    def __iter__(self):
+        return iter(getattr(_current, self._field))
+
+    def __len__(self) -> int:
+        return len(getattr(_current, self._field))
+
+
+games = CatalogView("games")
+faq = CatalogView("faq")
+translations = CatalogView("translations")
@@ -0,0 +1,116 @@
+"""Concurrent update processing that keeps each user's updates in order."""
+
+import asyncio
+import logging
+import time
+
+from telegram.ext import BaseUpdateProcessor
+
+from metrics import update_wait_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Run up to ``max_workers`` updates at once, but one at a time per user.
+
+    PTB starts a task per update in arrival order; each task first queues on
+    its user's lock (FIFO) and only then competes for a worker slot, so a
+    double tap on two buttons is always handled in the order it was sent.
+    ``max_pending`` bounds how many updates may be in flight or waiting.
+
+    With a ``guard`` (see :mod:`floodguard`), updates it refuses are discarded
+    before they queue, and a button press is skipped when a newer press from
+    the same user is already waiting: only the latest screen matters.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int | None = None, guard=None):
+        super().__init__(max_pending or max_workers * 16)
+        self.max_workers = max_workers
+        self.guard = guard
+        self._workers = asyncio.BoundedSemaphore(max_workers)
+        self._user_locks: dict[int, list] = {}
+        self.in_flight = 0
+        self.running = 0
+        self.processed = 0
+        self.coalesced = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_process_update(self, update, coroutine) -> None:
+        if self.guard is not None and not self.guard.admit(update):
+            coroutine.close()
+            return
+        queued_at = time.monotonic()
+        self.in_flight += 1
+        try:
+            user = getattr(update, "effective_user", None)
+            if user is None:
+                await self._run(coroutine, queued_at)
+                return
+            entry = self._user_locks.get(user.id)
+            if entry is None:
+                # [lock, queued updates, update id of the latest button press]
+                entry = self._user_locks[user.id] = [asyncio.Lock(), 0, None]
+            entry[1] += 1
+            press = self.guard is not None and getattr(update, "callback_query", None) is not None
+            if press:
+                entry[2] = update.update_id
+            try:
+                async with entry[0]:
+                    if press and entry[2] != update.update_id:
+                        self.coalesced += 1
+                        coroutine.close()
+                    else:
+                        await self._run(coroutine, queued_at)
+            finally:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._user_locks[user.id]
+        finally:
+            self.in_flight -= 1
+
+    async def _run(self, coroutine, queued_at: float) -> None:
+        async with self._workers:
+            waited = time.monotonic() - queued_at
+            self.wait_seconds_total += waited
+            update_wait_seconds.observe(waited)
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+            self.running += 1
+            try:
+                await coroutine
+            finally:
+                self.running -= 1
+                self.processed += 1
+
+    @property
+    def waiting(self) -> int:
+        """Updates accepted but not yet running (the effective queue depth)."""
+        return self.in_flight - self.running
+
+    def stats(self) -> dict[str, float]:
+        """Snapshot of queue depth and wait times for sizing ``max_workers``."""
+        return {
+            "max_workers": self.max_workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "queued_users": len(self._user_locks),
+            "processed": self.processed,
+            "coalesced": self.coalesced,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+async def log_update_stats(context) -> None:
+    """JobQueue callback that logs the processor statistics."""
+    processor = context.application.update_processor
+    if isinstance(processor, PerUserUpdateProcessor):
+        logger.info("Update processing: %s", processor.stats())
@@ -1,7 +1,103 @@
 """Configuration for the Telegram bot."""
 
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
 SUPPORT_CONTACTS = [
     "@white_listed",
     "@blacklist3d3",
     "@Desync_tech",
 ]
+
+# Product catalog, FAQ and texts; edits are picked up without a restart
+CATALOG_PATH = os.getenv("CATALOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json"))
+CATALOG_POLL_INTERVAL = float(os.getenv("CATALOG_POLL_INTERVAL", "5"))
+
+LOADER_URL = "http://desync.pro:5000/home/download_packed"
+
+# Per-user state (language): "sqlite" or "memory"
+STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "bot_state.sqlite3")
+STATE_CACHE_SIZE = int(os.getenv("STATE_CACHE_SIZE", "10000"))
+
+# Update processing: updates run concurrently, but in order for each user
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "32"))
+MAX_PENDING_UPDATES = int(os.getenv("MAX_PENDING_UPDATES", "1024"))
+
+# Per-user limits checked before any handler runs, as action=count/seconds for
+# start, command, callback, message and inline; empty disables the guard
+FLOOD_GUARD_LIMITS = os.getenv(
+    "FLOOD_GUARD_LIMITS", "start=5/60,command=10/60,callback=30/10,message=10/60,inline=60/60"
+)
+
+# Outbound flood limits (messages per second)
+FLOOD_OVERALL_RATE = float(os.getenv("FLOOD_OVERALL_RATE", "30"))
+FLOOD_CHAT_RATE = float(os.getenv("FLOOD_CHAT_RATE", "1"))
+FLOOD_MAX_RETRIES = int(os.getenv("FLOOD_MAX_RETRIES", "3"))
+
+# Idle sessions: after SESSION_TIMEOUT seconds without a button press the menu
+# shows the session_timeout screen (SESSION_TIMEOUT_MESSAGE=0 only drops the state); 0 disables
+SESSION_TIMEOUT = float(os.getenv("SESSION_TIMEOUT", "900"))
+SESSION_TICK = float(os.getenv("SESSION_TICK", "10"))
+SESSION_TIMEOUT_MESSAGE = os.getenv("SESSION_TIMEOUT_MESSAGE", "1") == "1"
+
+# Collapse updates queued while the bot was down before polling (1/0)
+BACKLOG_DRAIN = os.getenv("BACKLOG_DRAIN", "1") == "1"
+
+# Bot API server; set for a local Bot API server or a test stub
+BOT_API_URL = os.getenv("BOT_API_URL") or None
+# A self-hosted telegram-bot-api started with --local: files are served from its disk
+BOT_API_LOCAL = os.getenv("BOT_API_LOCAL", "0") == "1"
+BOT_API_FILE_URL = os.getenv("BOT_API_FILE_URL") or None
+
+# HTTP connections to the Bot API for replies; getUpdates has its own connection
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))
+# Seconds an idle connection is kept open for reuse
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "60"))
+# "1.1" or "2"; HTTP/2 needs python-telegram-bot[http2]
+HTTP_VERSION = os.getenv("HTTP_VERSION", "1.1")
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "5"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("HTTP_WRITE_TIMEOUT", "5"))
+
+# Multi-process mode (python main.py --mode supervisor); 0 means one worker per CPU
+SUPERVISOR_WORKERS = int(os.getenv("SUPERVISOR_WORKERS", "0"))
+SUPERVISOR_DRAIN_TIMEOUT = float(os.getenv("SUPERVISOR_DRAIN_TIMEOUT", "30"))
+# Set by the supervisor for each worker process
+WORKER_INDEX = int(os.getenv("WORKER_INDEX", "0"))
+
+# Seconds Telegram may cache inline search results (@bot pubg 30)
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))
+
+# Product status source polled in the background; empty disables the in-bot status
+STATUS_URL = os.getenv("STATUS_URL") or None
+STATUS_POLL_INTERVAL = float(os.getenv("STATUS_POLL_INTERVAL", "60"))
+# Chats told when a product's status changes (comma-separated ids)
+STATUS_NOTIFY_CHATS = tuple(int(cid) for cid in os.getenv("STATUS_NOTIFY_CHATS", "").split(",") if cid.strip())
+
+# Telegram user ids allowed to use admin commands such as /broadcast
+ADMIN_IDS = frozenset(int(uid) for uid in os.getenv("ADMIN_IDS", "").split(",") if uid.strip())
+# Broadcast pacing (messages per second) stays below FLOOD_OVERALL_RATE for interactive traffic
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "20"))
+BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", "50"))
+
+# Funnel analytics events appended as JSON lines; empty disables them
+ANALYTICS_PATH = os.getenv("ANALYTICS_PATH", "analytics.jsonl") or None
+ANALYTICS_BUFFER = int(os.getenv("ANALYTICS_BUFFER", "10000"))
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "5"))
+
+# Prometheus metrics endpoint (GET /metrics); port 0 disables it
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+
+# Webhook ingress (python main.py --mode webhook)
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+# Public URL registered with Telegram; leave empty when it is managed elsewhere
+WEBHOOK_URL = os.getenv("WEBHOOK_URL") or None
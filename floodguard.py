@@ -0,0 +1,138 @@
+"""Per-user flood guard applied before an update reaches any handler.
+
+:class:`PerUserUpdateProcessor` asks :meth:`FloodGuard.admit` about every
+update before it takes a worker slot; a refused update is discarded without
+running a handler or making an API call (a dropped button press just stops
+spinning on the user's side). Limits are set per action (``/start``, other
+commands, button presses, typed messages, inline queries) as
+``count/seconds`` and checked with a sliding-window counter: two counts and
+a window index per user and action, weighted by how far the current window
+has advanced. Counters of users who have been idle for two windows are
+evicted as new updates come in, and the table is capped.
+
+Users with the most dropped updates are listed by the admin ``/flood``
+command.
+"""
+
+import time
+from collections import Counter, OrderedDict
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+import metrics
+from config import ADMIN_IDS
+
+MAX_TRACKED = 100_000
+MAX_OFFENDERS = 1_000
+# Idle counters removed per admitted update; keeps eviction O(1) per update.
+EVICT_PER_CHECK = 2
+
+dropped_updates = metrics.REGISTRY.counter(
+    "bot_flood_guard_dropped_total", "Updates dropped by the per-user flood guard", ("action",))
+
+
+def parse_limits(spec: str) -> dict[str, tuple[int, float]]:
+    """``"start=5/60,callback=30/10"`` -> ``{"start": (5, 60.0), "callback": (30, 10.0)}``."""
+    limits = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        action, _, rule = item.partition("=")
+        count, _, seconds = rule.partition("/")
+        limits[action.strip()] = (int(count), float(seconds))
+    return limits
+
+
+def action_of(update) -> str | None:
+    if update.callback_query is not None:
+        return "callback"
+    if update.inline_query is not None:
+        return "inline"
+    message = update.message
+    if message is None or not message.text:
+        return None
+    if not message.text.startswith("/"):
+        return "message"
+    return "start" if message.text.split()[0].split("@")[0] == "/start" else "command"
+
+
+class FloodGuard:
+    """Sliding-window limits per (user, action)."""
+
+    def __init__(self, limits: dict[str, tuple[int, float]], max_tracked: int = MAX_TRACKED):
+        self.limits = limits
+        self.max_tracked = max_tracked
+        # (user id, action) -> [window index, previous window count, current window count]
+        self._windows: OrderedDict[tuple[int, str], list] = OrderedDict()
+        self.offenders: Counter[int] = Counter()
+        self.dropped = 0
+
+    def admit(self, update, now: float | None = None) -> bool:
+        user = update.effective_user
+        if user is None:
+            return True
+        action = action_of(update)
+        limit = self.limits.get(action)
+        if limit is None:
+            return True
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+        count, seconds = limit
+        index, elapsed = divmod(now, seconds)
+        key = (user.id, action)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = [index, 0, 0]
+            if len(self._windows) > self.max_tracked:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+            if window[0] != index:
+                window[1] = window[2] if window[0] == index - 1 else 0
+                window[2] = 0
+                window[0] = index
+        if window[1] * (1 - elapsed / seconds) + window[2] >= count:
+            self._drop(user.id, action)
+            return False
+        window[2] += 1
+        return True
+
+    def _evict(self, now: float) -> None:
+        for _ in range(EVICT_PER_CHECK):
+            if not self._windows:
+                return
+            (_, action), window = next(iter(self._windows.items()))
+            if window[0] >= now // self.limits[action][1] - 1:
+                return
+            self._windows.popitem(last=False)
+
+    def _drop(self, user_id: int, action: str) -> None:
+        self.dropped += 1
+        dropped_updates.inc(action)
+        self.offenders[user_id] += 1
+        if len(self.offenders) > MAX_OFFENDERS:
+            self.offenders = Counter(dict(self.offenders.most_common(MAX_OFFENDERS // 2)))
+
+    def stats(self) -> dict[str, int]:
+        return {"tracked": len(self._windows), "dropped": self.dropped, "offenders": len(self.offenders)}
+
+
+guard: FloodGuard | None = None
+
+
+def configure(spec: str) -> FloodGuard:
+    global guard
+    guard = FloodGuard(parse_limits(spec))
+    return guard
+
+
+async def flood_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """List the users with the most dropped updates (admins only)."""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+    if guard is None or not guard.offenders:
+        await update.message.reply_text("No updates dropped.")
+        return
+    lines = [f"{user_id}: {count}" for user_id, count in guard.offenders.most_common(20)]
+    await update.message.reply_text("Dropped updates by user:\n" + "\n".join(lines))
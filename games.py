@@ -1,57 +0,0 @@
-
-games = {
-    "pubg": {
-        "title": "PUBG",
-        "description": {
-            "en": "🎯 Battle royale shooter with realistic gunplay.",
-            "ru": "🎯 Королевская битва с реалистичной стрельбой.",
-            "zh": "🎯 真实射击的吃鸡游戏。",
-            "ko": "🎯 현실적인 총기 조작의 배틀로얄.",
-            "tr": "🎯 Gerçekçi silah mekaniği ile battle royale.",
-            "ja": "🎯 リアルな銃撃戦のバトルロイヤルゲーム。"
-        },
-        "guide": "https://docs.google.com/document/d/1wKudPSVOK5TG58Ssv16LPPTup1-Ag_h8eDcR7r8zMsg/edit?tab=t.0#heading=h.ijrhw6dpoj89",
-        "links": {
-            "1": "https://oplata.info/asp2/pay_wm.asp?id_d=2653160&lang=ru-RU",
-            "7": "https://oplata.info/asp2/pay_wm.asp?id_d=2653191&lang=ru-RU",
-            "15": "https://oplata.info/asp2/pay_wm.asp?id_d=2653193&lang=ru-RU",
-            "30": "https://oplata.info/asp2/pay_wm.asp?id_d=2653196&lang=ru-RU"
-        },
-        "durations": ["1", "7", "15", "30"]
-    },
-    "tarkov": {
-        "title": "Escape from Tarkov + Arena",
-        "description": {
-            "en": "🎯 Hardcore extraction shooter with Arena mode.",
-            "ru": "🎯 Хардкорный шутер с режимом \"Арена\".",
-            "zh": "🎯 硬核撤离射击并含竞技场模式。",
-            "ko": "🎯 하드코어 추출 슈터와 아레나 모드.",
-            "tr": "🎯 Arena modlu hardcore extraction shooter.",
-            "ja": "🎯 ハードコア脱出シューターとアリーナモード。"
-        },
-        "guide": "https://docs.google.com/document/d/18R7nkxCIMkbPVAsqft_G2EXiSs-ai3alh7r-lMS79K8/edit?tab=t.0#heading=h.ijrhw6dpoj89",
-        "links": {
-            "1": "https://oplata.info/asp2/pay_wm.asp?id_d=2775543&lang=ru-RU",
-            "15": "https://oplata.info/asp2/pay_wm.asp?id_d=2774554&lang=ru-RU",
-            "30": "https://oplata.info/asp2/pay_wm.asp?id_d=2774559&lang=ru-RU"
-        },
-        "durations": ["1", "15", "30"]
-    },
-    "spoofer": {
-        "title": "HWID Spoofer",
-        "description": {
-            "en": "🔒 Spoofs hardware IDs to bypass bans.",
-            "ru": "🔒 Подменяет HWID для обхода банов.",
-            "zh": "🔒 伪装硬件ID以绕过封禁。",
-            "ko": "🔒 HWID를 변경해 차단을 우회합니다.",
-            "tr": "🔒 Donanım kimliğini sahteleyerek banları aşar.",
-            "ja": "🔒 HWID を変更してBANを回避します。"
-        },
-        "guide": "https://docs.google.com/document/d/1TSe5plI4SNbHSsmscvvwxCaJ-QOzE42jcYchOo4jO7I/edit?tab=t.0#heading=h.ijrhw6dpoj89",
-        "links": {
-            "7": "https://oplata.info/asp2/pay_wm.asp?id_d=3077144&lang=ru-RU",
-            "30": "https://oplata.info/asp2/pay_wm.asp?id_d=3077145&lang=ru-RU"
-        },
-        "durations": ["7", "30"]
-    }
-}
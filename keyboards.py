@@ -0,0 +1,130 @@
+"""Registry of prebuilt inline keyboards keyed by menu and language.
+
+Every static menu only varies by language (and, for the subscription menu, by
+game), so the markups are built once and shared between all callbacks.
+PTB markups are immutable, which makes it safe to hand the same object to
+many concurrent requests. The registry is rebuilt whenever the catalog is
+reloaded.
+"""
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+import catalog
+from catalog import faq, games, rendered, texts
+from router import encode
+
+_registry: dict[tuple, InlineKeyboardMarkup] = {}
+
+
+def catalog_version() -> str:
+    """Short fingerprint of the games catalog carried in purchase callbacks."""
+    return catalog.current().version
+
+
+def duration_label(days: str, lang: str) -> str:
+    """Return label for subscription duration in the given language."""
+    label = rendered("duration", days, lang)
+    if label is None:
+        key = "day" if days == "1" else "days"
+        label = f"{days} {texts(lang)[key]}"
+    return label
+
+
+def _back_row(lang: str) -> list:
+    return [InlineKeyboardButton(texts(lang)["back"], callback_data=encode("main"))]
+
+
+def _build_main(lang: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(texts(lang)["menu_website"], url="https://desync.pro/")],
+        [InlineKeyboardButton(texts(lang)["menu_game"], callback_data=encode("games"))],
+        [InlineKeyboardButton(texts(lang)["menu_loader"], callback_data=encode("loader"))],
+        [InlineKeyboardButton(texts(lang)["menu_status"], url="https://desync.pro/statuses")],
+        [InlineKeyboardButton(texts(lang)["menu_faq"], callback_data=encode("faqs"))],
+        [InlineKeyboardButton(texts(lang)["menu_support"], callback_data=encode("support"))],
+        [InlineKeyboardButton(texts(lang)["menu_language"], callback_data=encode("language"))],
+    ])
+
+
+def _build_games(lang: str) -> InlineKeyboardMarkup:
+    keyboard = [[InlineKeyboardButton(g["title"], callback_data=encode("game", gid))] for gid, g in games.items()]
+    keyboard.append(_back_row(lang))
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _build_game(lang: str, gid: str) -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(duration_label(d, lang), callback_data=encode("sub", gid, d, catalog_version()))]
+        for d in games[gid]["durations"]
+    ]
+    keyboard.append([
+        InlineKeyboardButton(texts(lang)["menu_instruction"], callback_data=encode("guide", gid, catalog_version()))
+    ])
+    keyboard.append(_back_row(lang))
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _build_faq(lang: str) -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(entry["title"][lang], callback_data=encode("faq", faq_id))]
+        for faq_id, entry in faq.items()
+    ]
+    keyboard.append(_back_row(lang))
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _build_back(lang: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([_back_row(lang)])
+
+
+def _build_language(lang: str) -> InlineKeyboardMarkup:
+    labels = catalog.current().language_labels
+    return InlineKeyboardMarkup(
+        [[InlineKeyboardButton(label, callback_data=encode("lang", code))] for code, label in labels.items()]
+    )
+
+
+_BUILDERS = {
+    "main": _build_main,
+    "games": _build_games,
+    "game": _build_game,
+    "faq": _build_faq,
+    "back": _build_back,
+    "language": _build_language,
+}
+
+
+def get_keyboard(menu: str, lang: str, *args: str) -> InlineKeyboardMarkup:
+    """Return the shared markup for ``menu`` in ``lang``, building it on first use."""
+    lang = catalog.supported(lang)
+    key = (menu, lang, *args)
+    markup = _registry.get(key)
+    if markup is None:
+        markup = _registry[key] = _BUILDERS[menu](lang, *args)
+    return markup
+
+
+def build_all() -> int:
+    """Prebuild every known menu for every language and return the number of markups."""
+    global _registry
+    previous, _registry = _registry, {}
+    try:
+        for lang in catalog.current().languages:
+            for menu in ("main", "games", "faq", "back"):
+                get_keyboard(menu, lang)
+            for gid in games:
+                get_keyboard("game", lang, gid)
+        # The language picker is the same for everyone.
+        get_keyboard("language", "en")
+    except Exception:
+        _registry = previous
+        raise
+    return len(_registry)
+
+
+def invalidate() -> None:
+    """Drop all cached markups; they are rebuilt lazily on next use."""
+    _registry.clear()
+
+
+catalog.subscribe(lambda new_catalog: build_all())
@@ -1,25 +1,26 @@
-
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import Update
 from telegram.ext import ContextTypes
-from translations import translations
 
-user_languages = {}
+import analytics
+import catalog
+from catalog import texts
+from keyboards import get_keyboard
+from storage import StateMap
+
+user_languages = StateMap("lang")
 
 def ask_language():
-    keyboard = [
-        [InlineKeyboardButton("🇷🇺 Русский", callback_data="lang_ru")],
-        [InlineKeyboardButton("🇬🇧 English", callback_data="lang_en")],
-        [InlineKeyboardButton("🇨🇳 中文", callback_data="lang_zh")],
-        [InlineKeyboardButton("🇰🇷 한국어", callback_data="lang_ko")],
-        [InlineKeyboardButton("🇹🇷 Türkçe", callback_data="lang_tr")],
-        [InlineKeyboardButton("🇯🇵 日本語", callback_data="lang_ja")],
-    ]
-    return InlineKeyboardMarkup(keyboard)
+    return get_keyboard("language", "en")
+
+def client_language(user):
+    """The language of the user's Telegram app if the catalog has it (``pt-br`` -> ``pt``), else None."""
+    code = (user.language_code or "").partition("-")[0].lower()
+    return code if code in catalog.current().languages else None
 
-async def handle_language_selection(update: Update, context: ContextTypes.DEFAULT_TYPE, *, show_main_menu_fn):
+async def handle_language_selection(update: Update, context: ContextTypes.DEFAULT_TYPE, lang, *, main_menu_fn):
     query = update.callback_query
-    await query.answer()
-    lang = query.data.split("_")[1]
+    if lang not in catalog.current().languages:
+        lang = "en"
     user_languages[query.from_user.id] = lang
-    await query.edit_message_text(translations["language_selected"][lang])
-    await show_main_menu_fn(query.message, lang)
+    analytics.emit(analytics.LANGUAGE, query.from_user.id, lang)
+    return main_menu_fn(lang, header=texts(lang)["language_selected"])
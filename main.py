@@ -1,336 +1,374 @@
+import argparse
+import asyncio
+import logging
 import os
+import sys
 from functools import partial
 
-from dotenv import load_dotenv
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import InlineKeyboardMarkup, Update
 from telegram.ext import (
     ApplicationBuilder,
     CallbackQueryHandler,
     CommandHandler,
     ContextTypes,
+    InlineQueryHandler,
+    MessageHandler,
+    filters,
 )
 
-from config import SUPPORT_CONTACTS
-from games import games
-from language import ask_language, handle_language_selection, user_languages
-from translations import translations
-
-load_dotenv()
+import analytics
+import backlog
+import broadcast
+import catalog
+import floodguard
+import metrics
+import navigation
+import search
+import sessions
+import status
+import storage
+import supervisor
+import transport
+import webhook
+from concurrency import PerUserUpdateProcessor, log_update_stats
+from config import (
+    ANALYTICS_FLUSH_INTERVAL,
+    BACKLOG_DRAIN,
+    BOT_API_FILE_URL,
+    BOT_API_LOCAL,
+    BOT_API_URL,
+    CATALOG_POLL_INTERVAL,
+    FLOOD_CHAT_RATE,
+    FLOOD_GUARD_LIMITS,
+    FLOOD_MAX_RETRIES,
+    FLOOD_OVERALL_RATE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE,
+    HTTP_POOL_SIZE,
+    HTTP_POOL_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_VERSION,
+    HTTP_WRITE_TIMEOUT,
+    MAX_CONCURRENT_UPDATES,
+    MAX_PENDING_UPDATES,
+    METRICS_LISTEN,
+    METRICS_PORT,
+    SESSION_TICK,
+    SESSION_TIMEOUT,
+    SESSION_TIMEOUT_MESSAGE,
+    STATE_BACKEND,
+    STATE_CACHE_SIZE,
+    STATE_DB_PATH,
+    STATUS_POLL_INTERVAL,
+    STATUS_URL,
+    SUPERVISOR_DRAIN_TIMEOUT,
+    SUPERVISOR_WORKERS,
+    SUPPORT_CONTACTS,
+    WEBHOOK_LISTEN,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+)
+from catalog import escape_markdown, faq, games, rendered, texts
+from keyboards import build_all, catalog_version, get_keyboard
+from language import ask_language, client_language, handle_language_selection, user_languages
+from navigation import Render
+from ratelimit import FloodRateLimiter
+from router import CallbackRouter
 
-LOADER_URL = "http://desync.pro:5000/home/download_packed"
+# Kept importable from main for tools and tests that use the old names.
+from catalog import translations  # noqa: F401
+from config import LOADER_URL  # noqa: F401
+from keyboards import duration_label  # noqa: F401
 
-# Dictionary storing chosen game for each user
-user_game_selection: dict[int, str] = {}
+logger = logging.getLogger(__name__)
 
 
-def escape_markdown(text: str) -> str:
-    """Escape characters that have special meaning in Markdown."""
-    return text.replace("_", "\\_")
+def get_lang(user_id):
+    # A stored language may have been dropped by a catalog reload since.
+    return catalog.supported(user_languages.get(user_id))
 
 
-def duration_label(days: str, lang: str) -> str:
-    """Return label for subscription duration in the given language."""
-    key = "day" if days == "1" else "days"
-    word = translations[key][lang]
-    return f"{days} {word}"
-
-def get_lang(user_id):
-    return user_languages.get(user_id, "en")
+def update_lang(update):
+    user = update.effective_user
+    return get_lang(user.id) if user else "en"
 
 
 def build_main_menu_keyboard(lang: str) -> InlineKeyboardMarkup:
-    keyboard = [
-        [InlineKeyboardButton(translations["menu_website"][lang], url="https://desync.pro/")],
-        [InlineKeyboardButton(translations["menu_game"][lang], callback_data="menu_choose_game")],
-        [InlineKeyboardButton(translations["menu_loader"][lang], callback_data="download_loader")],
-        [InlineKeyboardButton(translations["menu_status"][lang], url="https://desync.pro/statuses")],
-        [InlineKeyboardButton(translations["menu_faq"][lang], callback_data="faq")],
-        [InlineKeyboardButton(translations["menu_support"][lang], callback_data="support")],
-        [InlineKeyboardButton(translations["menu_language"][lang], callback_data="change_language")],
-    ]
-    return InlineKeyboardMarkup(keyboard)
+    return get_keyboard("main", lang)
 
 
 
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(translations["start"]["en"], reply_markup=ask_language())
-
-async def show_main_menu(target, lang):
-    await target.reply_text(
-        translations["menu_title"][lang],
-        reply_markup=build_main_menu_keyboard(lang),
-    )
+    user = update.effective_user
+    lang = user_languages.get(user.id)
+    if lang is not None:
+        lang = catalog.supported(lang)
+    else:
+        lang = client_language(user)
+        if lang is not None:
+            user_languages[user.id] = lang
+            analytics.emit(analytics.LANGUAGE, user.id, lang)
+    render = deep_link(context.args[0], user.id, lang or "en") if context.args else None
+    if render is None:
+        render = main_menu(lang) if lang else Render(texts("en")["start"], ask_language())
+    await navigation.send(update.message, render.text, reply_markup=render.reply_markup, menu=render.menu,
+                          **render.options())
+
+def deep_link(payload, user_id, lang):
+    """The screen a ``t.me/<bot>?start=<payload>`` link opens: ``pubg``, ``pubg_30`` or ``faq_7``."""
+    if payload.startswith("faq_"):
+        return faq_answer(user_id, lang, payload[4:])
+    if payload in games:
+        analytics.emit(analytics.GAME, user_id, lang, game=payload)
+        return game_menu(lang, payload)
+    gid, _, days = payload.rpartition("_")
+    if gid in games and days in games[gid]["links"]:
+        analytics.emit(analytics.GAME, user_id, lang, game=gid)
+        analytics.emit(analytics.DURATION, user_id, lang, game=gid, days=days)
+        return offer(lang, gid, days)
+    return None
+
+def main_menu(lang, header=None):
+    text = texts(lang)["menu_title"]
+    if header:
+        text = f"{header}\n\n{text}"
+    return Render(text, build_main_menu_keyboard(lang))
 
 async def menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    uid = query.from_user.id
-    lang = get_lang(uid)
-    if query.data == "menu_choose_game":
-        await show_games(query.message, uid)
-
-async def game_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    uid = query.from_user.id
-    lang = get_lang(uid)
-    gid = query.data.split("_")[1]
-    user_game_selection[uid] = gid
-    game = games[gid]
-    keyboard = []
-    for d in game["durations"]:
-        label = duration_label(d, lang)
-        keyboard.append([InlineKeyboardButton(label, callback_data=f"sub_{d}")])
-    keyboard.append([InlineKeyboardButton(translations["menu_instruction"][lang], callback_data="guide")])
-    keyboard.append([InlineKeyboardButton(translations["back"][lang], callback_data="back_to_main")])
-    await query.edit_message_text(translations["choose_subscription"][lang], reply_markup=InlineKeyboardMarkup(keyboard))
-
-async def subscription_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    uid = query.from_user.id
-    lang = get_lang(uid)
-    days = query.data.split("_")[1]
-    gid = user_game_selection.get(uid)
-    game = games[gid]
-    text = translations["subscription_result"][lang].format(
-        title=game["title"], days=days, desc=game["description"][lang], link=game["links"][days]
-    )
-    await query.edit_message_text(text, parse_mode="Markdown", disable_web_page_preview=True, reply_markup=back_to_main_button(lang))
-
-async def guide_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    uid = query.from_user.id
-    lang = get_lang(uid)
-    gid = user_game_selection.get(uid)
-    url = games[gid]["guide"]
-    text = f"{translations['menu_instruction'][lang]}\n{escape_markdown(url)}"
-    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=back_to_main_button(lang))
+    return games_menu(get_lang(update.callback_query.from_user.id))
+
+async def game_selected(update: Update, context: ContextTypes.DEFAULT_TYPE, gid):
+    user_id = update.callback_query.from_user.id
+    lang = get_lang(user_id)
+    if gid not in games:
+        return games_menu(lang)
+    analytics.emit(analytics.GAME, user_id, lang, game=gid)
+    return game_menu(lang, gid)
+
+async def subscription_selected(update: Update, context: ContextTypes.DEFAULT_TYPE, gid, days, version):
+    user_id = update.callback_query.from_user.id
+    lang = get_lang(user_id)
+    if version != catalog_version() or gid not in games or days not in games[gid]["links"]:
+        return outdated_offer(lang, gid)
+    analytics.emit(analytics.DURATION, user_id, lang, game=gid, days=days)
+    return offer(lang, gid, days)
+
+async def guide_handler(update: Update, context: ContextTypes.DEFAULT_TYPE, gid, version):
+    user_id = update.callback_query.from_user.id
+    lang = get_lang(user_id)
+    if version != catalog_version() or gid not in games:
+        return outdated_offer(lang, gid)
+    analytics.emit(analytics.GUIDE, user_id, lang, game=gid)
+    text = rendered("guide", gid, lang) or rendered("guide", gid, "en")
+    return Render(text, back_to_main_button(lang), parse_mode="Markdown", menu=False)
 
 async def send_loader_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    lang = get_lang(query.from_user.id)
-    await query.message.reply_text(
-        translations["loader_password"][lang].format(url=LOADER_URL),
-        parse_mode="Markdown",
-    )
+    lang = get_lang(update.callback_query.from_user.id)
+    text = rendered("loader", lang) or rendered("loader", "en")
+    return Render(text, back_to_main_button(lang), parse_mode="Markdown", menu=False)
 
 async def show_faq(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    lang = get_lang(query.from_user.id)
-    faq_titles = {
-        "faq_1": {
-            "en": "What to do after purchase?",
-            "ru": "Что делать после покупки?",
-            "zh": "购买后该怎么办？",
-            "ko": "구매 후 무엇을 해야 하나요?",
-            "tr": "Satın aldıktan sonra ne yapmalıyım?",
-            "ja": "購入後はどうすればいいですか？",
-        },
-        "faq_2": {
-            "en": "Secure boot & UEFI",
-            "ru": "Secure boot & UEFI",
-            "zh": "Secure boot 与 UEFI",
-            "ko": "Secure boot & UEFI",
-            "tr": "Secure boot & UEFI",
-            "ja": "Secure boot と UEFI",
-        },
-        "faq_3": {
-            "en": "Additional loader settings",
-            "ru": "Дополнительные настройки лоадера",
-            "zh": "Loader 的其他设置",
-            "ko": "로더 추가 설정",
-            "tr": "Loader ek ayarlar",
-            "ja": "ローダーの追加設定",
-        },
-        "faq_4": {
-            "en": "Bought cheat elsewhere, help",
-            "ru": "Купил чит в другом месте, помогите",
-            "zh": "在别处买了外挂，帮帮我",
-            "ko": "다른 곳에서 핵을 샀습니다. 도와주세요",
-            "tr": "Hileyi başka yerde aldım, yardım edin",
-            "ja": "他でチートを買いました。助けて",
-        },
-        "faq_5": {
-            "en": "Antivirus / anticheat settings",
-            "ru": "Antivirus / anticheat settings",
-            "zh": "杀毒 / 反作弊设置",
-            "ko": "백신/안티치트 설정",
-            "tr": "Antivirus/anticheat ayarları",
-            "ja": "アンチウイルス/アンチチート設定",
-        },
-        "faq_6": {
-            "en": "Problem with cheat or launch, what to do?",
-            "ru": "Проблема с читом / запуском, что делать?",
-            "zh": "外挂/启动问题怎么办？",
-            "ko": "핵/실행 문제, 어떻게 해야 하나요?",
-            "tr": "Hile/başlatma sorunu, ne yapmalıyım?",
-            "ja": "チート/起動の問題、どうすれば？",
-        },
-        "faq_7": {
-            "en": "24h bans PUBG",
-            "ru": "24h bans PUBG",
-            "zh": "24小时封禁 PUBG",
-            "ko": "PUBG 24시간 정지",
-            "tr": "PUBG 24 saat ban",
-            "ja": "PUBGの24時間BAN",
-        },
-        "faq_8": {
-            "en": "Sorry, this application cannot run under Virtual Machine",
-            "ru": "Sorry, this application cannot run under Virtual Machine",
-            "zh": "抱歉，此应用无法在虚拟机中运行",
-            "ko": "죄송합니다. 이 프로그램은 가상 머신에서 실행될 수 없습니다",
-            "tr": "Üzgünüz, bu uygulama sanal makinede çalışamaz",
-            "ja": "申し訳ありませんが、このアプリは仮想マシンでは実行できません",
-        },
-        "faq_9": {
-            "en": "ASLR windows defender",
-            "ru": "ASLR windows defender",
-            "zh": "ASLR windows defender",
-            "ko": "ASLR windows defender",
-            "tr": "ASLR windows defender",
-            "ja": "ASLR windows defender",
-        },
-        "faq_10": {
-            "en": "Payment questions",
-            "ru": "Вопросы по оплате",
-            "zh": "支付问题",
-            "ko": "결제 관련 질문",
-            "tr": "Ödeme soruları",
-            "ja": "支払いに関する質問",
-        },
-        "faq_11": {
-            "en": "Are there any discounts or coupons?",
-            "ru": "Есть ли какие-то скидки / купоны?",
-            "zh": "有折扣/优惠券吗？",
-            "ko": "할인이나 쿠폰이 있나요?",
-            "tr": "Herhangi bir indirim veya kupon var mı?",
-            "ja": "割引やクーポンはありますか？",
-        },
-        "faq_12": {
-            "en": "Where to get cryptocurrency",
-            "ru": "Где взять криптовалюту",
-            "zh": "哪里获取加密货币",
-            "ko": "암호화폐는 어디서 구하나요?",
-            "tr": "Kripto para nereden alabilirim",
-            "ja": "暗号通貨はどこで入手できますか",
-        },
-        "faq_13": {
-            "en": "Subscription freezing",
-            "ru": "Заморозка подписки",
-            "zh": "暂停订阅",
-            "ko": "구독 일시 정지",
-            "tr": "Aboneliği dondurma",
-            "ja": "サブスクリプションの凍結",
-        },
-        "faq_14": {
-            "en": "Subscription transfer",
-            "ru": "Перенос подписки",
-            "zh": "转移订阅",
-            "ko": "구독 이전",
-            "tr": "Aboneliği taşıma",
-            "ja": "サブスクリプションの移行",
-        },
-        "faq_15": {
-            "en": "When will the cheat be updated?",
-            "ru": "Когда обновят чит?",
-            "zh": "什么时候更新外挂？",
-            "ko": "핵은 언제 업데이트되나요?",
-            "tr": "Hile ne zaman güncellenecek?",
-            "ja": "チートはいつ更新されますか？",
-        },
-        "faq_16": {
-            "en": "How to enable spoofer?",
-            "ru": "Как включить спуфер?",
-            "zh": "如何开启欺骗器?",
-            "ko": "스푸퍼를 켜려면?",
-            "tr": "Spoofer nasıl açılır?",
-            "ja": "スプーファーを有効にするには？",
-        },
-    }
-    keyboard = [[InlineKeyboardButton(title[lang], callback_data=faq_id)] for faq_id, title in faq_titles.items()]
-    keyboard.append([InlineKeyboardButton(translations["back"][lang], callback_data="back_to_main")])
-    await query.edit_message_text("❓ " + translations["menu_faq"][lang], reply_markup=InlineKeyboardMarkup(keyboard))
-
-async def send_faq_link(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    lang = get_lang(query.from_user.id)
-    faq_links = {
-        "faq_1": "https://docs.google.com/document/d/1MfuO-0WRbwu6gXjv2VKfuZPU294_bEOeSczHQMWvtQI/edit?tab=t.0#heading=h.jpyqgkmaltcj",
-        "faq_2": "https://docs.google.com/document/d/1gMyIKqeMjLwlnmtfeW3u9d7holGtamNAmtkSGmLXvPk/edit?tab=t.0#heading=h.lr6zthfd0myp",
-        "faq_3": "https://docs.google.com/document/d/1zJkuqf6WRJsbhDw2pcuyo9qvFHL7qccRjTZu16_eO_U/edit?tab=t.0#heading=h.f14wq4uqpmlu",
-        "faq_4": "https://docs.google.com/document/d/1Rh-7X6hl_qSEWLnMe0k1JZ0BRdhiGB74oFvml9xbOxM/edit?tab=t.0#heading=h.sxeylmtoyft",
-        "faq_5": "https://docs.google.com/document/d/1P4H4KNaW3cTZM-COkU1Q673jDxIB-zSFtDAuNw7pV_8/edit?tab=t.0#heading=h.snl0ea7h39p9",
-        "faq_6": "https://docs.google.com/document/d/1pj1ttxVbPbBwmv9ngmvL84YEP04QtgYhyPau_sZSEPk/edit?tab=t.0#heading=h.34jmecbadn9c",
-        "faq_7": "https://docs.google.com/document/d/174uELSHPfE5n2ZBQSp6QRtEMs1l3XAxKZY2FqXJVAZQ/edit?tab=t.0#heading=h.n3aovjwsw5s2",
-        "faq_8": "https://docs.google.com/document/d/1aJd6RNmjpJeTdOqEiVPyJk8H6g9gCFACpwUszdWsEgU/edit?tab=t.0",
-        "faq_9": "https://docs.google.com/document/d/1ygELrYJPOtRkRMLV_OPS8NOqw28LhlOWRB3pNDyXGwE/edit?tab=t.0#heading=h.s7qc8wtl3l0q",
-        "faq_10": "https://docs.google.com/document/d/1xdg75FQQazrgSa563Fadzp9lNLdcQUpFsK2rvSAnJKA/edit?tab=t.0#heading=h.mmu7ffux95z7",
-        "faq_11": "https://docs.google.com/document/d/147zpS3DUUKZAwO8K18bn-sxGjjlKzLl_CLH-1tnohKw/edit?tab=t.0",
-        "faq_12": "https://docs.google.com/document/d/13nTn03ziGMq-UDOtUhV0EpMIn8-s_AIOYeYCS2-HCPE/edit?tab=t.0#heading=h.lhjokw49jht7",
-        "faq_13": "https://docs.google.com/document/d/11Hqj9LICiwNF7I6CreuB2PPB5fNUYzkLIWayH6z6Vfs/edit?tab=t.0#heading=h.abdlztxcnvgy",
-        "faq_14": "https://docs.google.com/document/d/11bYA17l0Ed74a23d6-8BKYJ0lwLPKvP8QVFp-ePO0tA/edit?tab=t.0#heading=h.706a7uunpv3d",
-        "faq_15": "https://docs.google.com/document/d/19yWs7tvSwmmk9Tm9dA8Y0Hr7Y-1_vR28_oYmilHcfe4/edit?tab=t.0#heading=h.b57i0xsait03",
-        "faq_16": "https://docs.google.com/document/d/1KAwkU2oy9PS04zgn96Oe4jOIM8-uiLns7_BSQ_SwQCE/edit?tab=t.0#heading=h.yqdxjguk2tpn",
-    }
-    doc_url = faq_links.get(query.data)
-    if doc_url:
-        await query.edit_message_text(f"📄 {doc_url}", reply_markup=back_to_main_button(lang))
-    else:
-        await query.edit_message_text("❌ Вопрос не найден.", reply_markup=back_to_main_button(lang))
+    lang = get_lang(update.callback_query.from_user.id)
+    return Render("❓ " + texts(lang)["menu_faq"], get_keyboard("faq", lang))
+
+async def send_faq_link(update: Update, context: ContextTypes.DEFAULT_TYPE, faq_num):
+    user_id = update.callback_query.from_user.id
+    lang = get_lang(user_id)
+    return faq_answer(user_id, lang, faq_num) or Render("❌ Вопрос не найден.", back_to_main_button(lang))
+
+def faq_answer(user_id, lang, faq_num):
+    entry = faq.get(faq_num)
+    if entry is None:
+        return None
+    analytics.emit(analytics.FAQ, user_id, lang, faq=faq_num)
+    return Render(f"📄 {entry['link']}", back_to_main_button(lang), menu=False)
 
 async def back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    lang = get_lang(query.from_user.id)
-    await show_main_menu(query.message, lang)
+    return main_menu(get_lang(update.callback_query.from_user.id))
 
 def back_to_main_button(lang):
-    return InlineKeyboardMarkup([[InlineKeyboardButton(translations["back"][lang], callback_data="back_to_main")]])
+    return get_keyboard("back", lang)
 
-async def show_games(message, user_id):
-    lang = get_lang(user_id)
-    keyboard = [[InlineKeyboardButton(g["title"], callback_data=f"choose_{gid}")] for gid, g in games.items()]
-    keyboard.append([InlineKeyboardButton(translations["back"][lang], callback_data="back_to_main")])
-    await message.reply_text(translations["choose_game"][lang], reply_markup=InlineKeyboardMarkup(keyboard))
+def games_menu(lang):
+    return Render(texts(lang)["choose_game"], get_keyboard("games", lang))
+
+def game_menu(lang, gid):
+    text = texts(lang)["choose_subscription"]
+    status_line = status.line(gid, lang)
+    if status_line:
+        text = f"{status_line}\n\n{text}"
+    return Render(text, get_keyboard("game", lang, gid))
+
+def offer(lang, gid, days):
+    text = rendered("offer", gid, days, lang) or rendered("offer", gid, days, "en")
+    return Render(text, back_to_main_button(lang), parse_mode="Markdown", disable_web_page_preview=True, menu=False)
+
+def outdated_offer(lang, gid):
+    """Re-render the purchase menu when a button was built from an older catalog."""
+    if gid in games:
+        return game_menu(lang, gid)
+    return games_menu(lang)
 
 async def support_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    lang = get_lang(query.from_user.id)
+    lang = get_lang(update.callback_query.from_user.id)
     contacts = "\n".join(f"• {escape_markdown(name)}" for name in SUPPORT_CONTACTS)
     support_text = "💬 *Support contacts:*\n" + contacts
-    await query.edit_message_text(support_text, parse_mode="Markdown", reply_markup=back_to_main_button(lang))
+    return Render(support_text, back_to_main_button(lang), parse_mode="Markdown", menu=False)
 
 async def change_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-    await query.message.reply_text(translations["start"]["en"], reply_markup=ask_language())
-
-def main():
+    return Render(texts("en")["start"], ask_language())
+
+def session_timeout_menu(chat_id):
+    lang = get_lang(chat_id)
+    return main_menu(lang, header=texts(lang)["session_timeout"])
+
+async def stale_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer buttons from outdated or foreign keyboards with a fresh main menu."""
+    return main_menu(get_lang(update.callback_query.from_user.id))
+
+callbacks = CallbackRouter(fallback=stale_callback, respond=navigation.respond)
+callbacks.route("lang", partial(handle_language_selection, main_menu_fn=main_menu), 1)
+callbacks.route("main", back_to_main)
+callbacks.route("games", menu_handler)
+callbacks.route("game", game_selected, 1)
+callbacks.route("sub", subscription_selected, 3)
+callbacks.route("guide", guide_handler, 2)
+callbacks.route("faqs", show_faq)
+callbacks.route("faq", send_faq_link, 1)
+callbacks.route("support", support_handler)
+callbacks.route("loader", send_loader_info)
+callbacks.route("language", change_language)
+callbacks.wrap(lambda action, handler: metrics.timed(action, handler, update_lang))
+
+async def on_shutdown(app):
+    await analytics.flush()
+    storage.get_store().close()
+
+async def on_startup(app, drain_backlog=False):
+    if METRICS_PORT:
+        await metrics.serve(METRICS_LISTEN, METRICS_PORT)
+    if drain_backlog:
+        await backlog.drain(app)
+
+async def stop_metrics(app):
+    await metrics.stop()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Desync Telegram bot")
+    parser.add_argument("--mode", choices=("polling", "webhook", "supervisor", "worker"), default="polling")
+    parser.add_argument("--workers", type=int, default=SUPERVISOR_WORKERS or os.cpu_count(),
+                        help="worker processes in supervisor mode")
+    parser.add_argument("--ingress", choices=("polling", "webhook"), default="polling",
+                        help="how the supervisor receives updates")
+    parser.add_argument("--listen", default=WEBHOOK_LISTEN, help="webhook listen address")
+    parser.add_argument("--port", type=int, default=WEBHOOK_PORT, help="webhook listen port")
+    parser.add_argument("--path", default=WEBHOOK_PATH, help="webhook URL path")
+    parser.add_argument("--webhook-url", default=WEBHOOK_URL, help="public URL to register with Telegram")
+    parser.add_argument("--delete-webhook", action="store_true", help="remove the webhook on shutdown")
+    return parser.parse_args(argv)
+
+def build_application(token, base_url=None, drain_backlog=False):
+    build_all()
+    logger.info(catalog.coverage_report(catalog.current()))
+    storage.configure(storage.open_store(STATE_BACKEND, STATE_DB_PATH, STATE_CACHE_SIZE))
+
+    guard = floodguard.configure(FLOOD_GUARD_LIMITS) if FLOOD_GUARD_LIMITS else None
+    processor = PerUserUpdateProcessor(MAX_CONCURRENT_UPDATES, MAX_PENDING_UPDATES, guard=guard)
+    limiter = FloodRateLimiter(FLOOD_OVERALL_RATE, FLOOD_CHAT_RATE, max_retries=FLOOD_MAX_RETRIES)
+    replies, polling = transport.build_requests(
+        HTTP_POOL_SIZE,
+        keepalive=HTTP_KEEPALIVE,
+        http_version=HTTP_VERSION,
+        connect_timeout=HTTP_CONNECT_TIMEOUT,
+        read_timeout=HTTP_READ_TIMEOUT,
+        write_timeout=HTTP_WRITE_TIMEOUT,
+        pool_timeout=HTTP_POOL_TIMEOUT,
+    )
+    builder = (
+        ApplicationBuilder()
+        .token(token)
+        .request(replies)
+        .get_updates_request(polling)
+        .update_queue(metrics.TimedQueue())
+        .concurrent_updates(processor)
+        .rate_limiter(metrics.InstrumentedRateLimiter(limiter))
+        .post_init(partial(on_startup, drain_backlog=drain_backlog))
+        .post_stop(stop_metrics)
+        .post_shutdown(on_shutdown)
+    )
+    if base_url:
+        builder.base_url(base_url)
+    if BOT_API_FILE_URL:
+        builder.base_file_url(BOT_API_FILE_URL)
+    if BOT_API_LOCAL:
+        builder.local_mode(True)
+    app = builder.build()
+    metrics.REGISTRY.stats("bot_updates", "Update processor state", processor.stats)
+    metrics.REGISTRY.stats("bot_flood", "Outbound rate limiter counters", limiter.stats)
+    metrics.REGISTRY.stats("bot_navigation", "Menu edits sent and skipped", lambda: dict(navigation.stats))
+    if guard is not None:
+        metrics.REGISTRY.stats("bot_flood_guard", "Per-user flood guard state", guard.stats)
+    metrics.REGISTRY.stats("bot_analytics", "Funnel analytics events", analytics.events.stats)
+    metrics.REGISTRY.stats("bot_sessions", "Idle-session tracking", sessions.stats)
+    metrics.REGISTRY.stats("bot_http", "Bot API requests in flight and waiting for a connection", replies.stats)
+    metrics.REGISTRY.stats("bot_update_queue", "Updates waiting to be processed", lambda: {"size": app.update_queue.qsize()})
+    if app.job_queue:
+        app.job_queue.run_repeating(log_update_stats, interval=60)
+        app.job_queue.run_repeating(catalog.watch, interval=CATALOG_POLL_INTERVAL)
+        app.job_queue.run_repeating(analytics.flush, interval=ANALYTICS_FLUSH_INTERVAL)
+        app.job_queue.run_repeating(broadcast.resume, interval=broadcast.RESUME_INTERVAL, first=0)
+        if STATUS_URL:
+            app.job_queue.run_repeating(status.poll, interval=STATUS_POLL_INTERVAL, first=0)
+        if SESSION_TIMEOUT:
+            sessions.start(SESSION_TIMEOUT, SESSION_TICK, session_timeout_menu if SESSION_TIMEOUT_MESSAGE else None)
+            app.job_queue.run_repeating(sessions.tick, interval=SESSION_TICK)
+    app.add_handler(CommandHandler("start", metrics.timed("start", start_command, update_lang)))
+    app.add_handler(CommandHandler("broadcast", metrics.timed("broadcast", broadcast.broadcast_command, update_lang)))
+    app.add_handler(CommandHandler("flood", metrics.timed("flood", floodguard.flood_command, update_lang)))
+    app.add_handler(CallbackQueryHandler(callbacks.dispatch))
+    app.add_handler(InlineQueryHandler(metrics.timed("inline", search.inline_query, update_lang)))
+    app.add_handler(MessageHandler(
+        filters.TEXT & ~filters.COMMAND & filters.ChatType.PRIVATE,
+        metrics.timed("faq_text", search.faq_message, update_lang),
+    ))
+    return app
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s %(message)s", level=logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
     token = os.getenv("BOT_TOKEN")
     if not token:
         raise RuntimeError("BOT_TOKEN environment variable is not set")
 
-    app = ApplicationBuilder().token(token).build()
-    app.add_handler(CommandHandler("start", start_command))
-    app.add_handler(CallbackQueryHandler(partial(handle_language_selection, show_main_menu_fn=show_main_menu), pattern="^lang_"))
-    app.add_handler(CallbackQueryHandler(menu_handler, pattern="^menu_"))
-    app.add_handler(CallbackQueryHandler(game_selected, pattern="^choose_"))
-    app.add_handler(CallbackQueryHandler(subscription_selected, pattern="^sub_"))
-    app.add_handler(CallbackQueryHandler(guide_handler, pattern="^guide$"))
-    app.add_handler(CallbackQueryHandler(send_faq_link, pattern="^faq_"))
-    app.add_handler(CallbackQueryHandler(show_faq, pattern="^faq$"))
-    app.add_handler(CallbackQueryHandler(back_to_main, pattern="^back_to_main$"))
-    app.add_handler(CallbackQueryHandler(support_handler, pattern="^support$"))
-    app.add_handler(CallbackQueryHandler(send_loader_info, pattern="^download_loader$"))
-    app.add_handler(CallbackQueryHandler(change_language, pattern="^change_language$"))
-    app.run_polling()
+    if args.mode == "supervisor":
+        asyncio.run(supervisor.run(
+            token, args.workers, [sys.executable, os.path.abspath(__file__), "--mode", "worker"],
+            ingress=args.ingress,
+            base_url=BOT_API_URL,
+            listen=args.listen, port=args.port, path=args.path,
+            secret_token=WEBHOOK_SECRET,
+            webhook_url=args.webhook_url,
+            metrics_listen=METRICS_LISTEN, metrics_port=METRICS_PORT,
+            drain_timeout=SUPERVISOR_DRAIN_TIMEOUT,
+        ))
+        return
+
+    app = build_application(token, BOT_API_URL, drain_backlog=args.mode == "polling" and BACKLOG_DRAIN)
+    if args.mode == "worker":
+        asyncio.run(supervisor.run_worker(app))
+    elif args.mode == "webhook":
+        asyncio.run(webhook.serve(
+            app, args.listen, args.port, args.path,
+            secret_token=WEBHOOK_SECRET,
+            webhook_url=args.webhook_url,
+            delete_on_exit=args.delete_webhook,
+        ))
+    else:
+        app.run_polling()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,262 @@
+"""Latency and error metrics exposed in the Prometheus text format.
+
+Handlers are wrapped with :func:`timed`, Bot API calls are timed by
+:class:`InstrumentedRateLimiter` (PTB's ``rate_limiter`` hook sees every
+request) and :class:`TimedQueue` records how long updates sit in the
+application's update queue. Recording a sample is a bisect and two dict
+updates, cheap enough to leave on in production; the endpoint started by
+:func:`serve` renders everything on demand.
+"""
+
+import asyncio
+import collections
+import functools
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable
+
+from telegram.ext import BaseRateLimiter
+
+from httpserver import Request, Response, start_server
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+    name = help = ""
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        samples = self.samples()
+        if not samples:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *samples]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple, float] = collections.defaultdict(int)
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+            for key, value in self.values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # Per-bucket counts followed by the running sum.
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class StatsGauge(_Metric):
+    """Gauges read from a ``stats()`` dict when the endpoint is scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, source: Callable[[], dict]):
+        self.name = name
+        self.help = help
+        self.source = source
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, value in self.source().items():
+            name = f"{self.name}_{key}"
+            lines += [f"# HELP {name} {self.help}", f"# TYPE {name} gauge", f"{name} {_format_number(value)}"]
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help, labels, buckets))
+
+    def stats(self, name: str, help: str, source: Callable[[], dict]) -> None:
+        """Expose ``source()`` as gauges; registering a name again replaces it."""
+        self._metrics[name] = StatsGauge(name, help, source)
+
+    def render(self) -> str:
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+handler_seconds = REGISTRY.histogram(
+    "bot_handler_seconds", "Handler run time including its Bot API calls", ("handler", "lang"))
+handler_errors = REGISTRY.counter(
+    "bot_handler_errors_total", "Handlers that raised", ("handler", "lang"))
+api_seconds = REGISTRY.histogram(
+    "bot_api_request_seconds", "Bot API HTTP request time per attempt", ("method",))
+api_errors = REGISTRY.counter(
+    "bot_api_errors_total", "Failed Bot API attempts", ("method", "error"))
+api_throttle_seconds = REGISTRY.histogram(
+    "bot_api_throttle_seconds", "Time a Bot API call waited for rate limits and retry backoff", ("method",))
+update_queue_seconds = REGISTRY.histogram(
+    "bot_update_queue_seconds", "Time an update spent in the application update queue")
+update_wait_seconds = REGISTRY.histogram(
+    "bot_update_wait_seconds", "Time an accepted update waited for its user's turn and a worker")
+
+
+def timed(name: str, handler, lang_of: Callable | None = None):
+    """Wrap ``handler(update, context, *args)`` to record latency and errors."""
+
+    @functools.wraps(handler)
+    async def wrapper(update, context, *args):
+        lang = lang_of(update) if lang_of else ""
+        started = time.perf_counter()
+        try:
+            return await handler(update, context, *args)
+        except Exception:
+            handler_errors.inc(name, lang)
+            raise
+        finally:
+            handler_seconds.observe(time.perf_counter() - started, name, lang)
+
+    return wrapper
+
+
+class InstrumentedRateLimiter(BaseRateLimiter):
+    """Time every Bot API request around an inner rate limiter.
+
+    The HTTP attempt itself and the time spent throttled or backing off are
+    recorded separately, so slow buttons can be attributed to Telegram or to
+    our own flood limits.
+    """
+
+    def __init__(self, inner: BaseRateLimiter):
+        self.inner = inner
+
+    async def initialize(self) -> None:
+        await self.inner.initialize()
+
+    async def shutdown(self) -> None:
+        await self.inner.shutdown()
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        request_time = 0.0
+
+        async def attempt(*call_args, **call_kwargs):
+            nonlocal request_time
+            started = time.perf_counter()
+            try:
+                return await callback(*call_args, **call_kwargs)
+            except Exception as exc:
+                api_errors.inc(endpoint, type(exc).__name__)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                request_time += elapsed
+                api_seconds.observe(elapsed, endpoint)
+
+        started = time.perf_counter()
+        try:
+            return await self.inner.process_request(attempt, args, kwargs, endpoint, data, rate_limit_args)
+        finally:
+            api_throttle_seconds.observe(max(0.0, time.perf_counter() - started - request_time), endpoint)
+
+
+class TimedQueue(asyncio.Queue):
+    """Update queue that records how long each update waited to be picked up."""
+
+    def _put(self, item) -> None:
+        super()._put((time.monotonic(), item))
+
+    def _get(self):
+        queued_at, item = super()._get()
+        update_queue_seconds.observe(time.monotonic() - queued_at)
+        return item
+
+
+async def _handle(request: Request) -> Response:
+    if request.path != "/metrics":
+        return Response(404, b"not found")
+    if request.method != "GET":
+        return Response(405, b"method not allowed")
+    return Response(200, REGISTRY.render().encode(), CONTENT_TYPE)
+
+
+_server: asyncio.AbstractServer | None = None
+
+
+async def serve(host: str, port: int) -> asyncio.AbstractServer:
+    """Start the ``/metrics`` endpoint on ``host:port``."""
+    global _server
+    _server = await start_server(_handle, host, port)
+    logger.info("Metrics available at http://%s:%s/metrics", host, _server.sockets[0].getsockname()[1])
+    return _server
+
+
+async def stop() -> None:
+    global _server
+    if _server is not None:
+        _server.close()
+        _server = None
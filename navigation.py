@@ -0,0 +1,163 @@
+"""Single-message navigation: menus are edited in place, never re-posted.
+
+A digest of the last text and markup rendered into each message is kept in a
+bounded LRU, so pressing a button that would show the same screen again does
+not cost an API call (and cannot fail with "message is not modified").
+
+Callback handlers return a :class:`Render` instead of calling the Bot API;
+:func:`respond` then answers the query and edits the message concurrently,
+so a button press costs one round trip instead of two. When the message can
+no longer be edited (too old, deleted, not a text message) the screen is
+sent as a new message instead.
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
+
+from telegram.error import BadRequest
+
+MAX_TRACKED_MESSAGES = 50_000
+
+_UNEDITABLE = (
+    "message can't be edited",
+    "message to edit not found",
+    "there is no text in the message to edit",
+)
+
+_rendered: OrderedDict[tuple[int, int], int] = OrderedDict()
+_subscribers: list[Callable[[int, int, bool], None]] = []
+stats = {"edits": 0, "skipped": 0, "fallbacks": 0}
+
+
+@dataclass(frozen=True)
+class Render:
+    """A screen: the message text, its keyboard and formatting options."""
+
+    text: str
+    reply_markup: object = None
+    parse_mode: str | None = None
+    disable_web_page_preview: bool | None = None
+    # False for content the user came for (links, contacts): idle sessions never close it.
+    menu: bool = True
+
+    def options(self) -> dict:
+        options = {}
+        if self.parse_mode is not None:
+            options["parse_mode"] = self.parse_mode
+        if self.disable_web_page_preview is not None:
+            options["disable_web_page_preview"] = self.disable_web_page_preview
+        return options
+
+
+def _digest(text: str, reply_markup, kwargs: dict) -> int:
+    return hash((text, reply_markup, tuple(sorted(kwargs.items()))))
+
+
+def _remember(key: tuple[int, int], digest: int) -> None:
+    _rendered[key] = digest
+    _rendered.move_to_end(key)
+    if len(_rendered) > MAX_TRACKED_MESSAGES:
+        _rendered.popitem(last=False)
+
+
+def forget(chat_id: int, message_id: int) -> None:
+    _rendered.pop((chat_id, message_id), None)
+
+
+def subscribe(callback: Callable[[int, int, bool], None]) -> None:
+    """Call ``callback(chat_id, message_id, menu)`` whenever a user is shown a screen."""
+    _subscribers.append(callback)
+
+
+def _shown(key: tuple[int, int], menu: bool) -> None:
+    for callback in _subscribers:
+        callback(*key, menu)
+
+
+def is_not_modified(exc: BadRequest) -> bool:
+    return "message is not modified" in str(exc).lower()
+
+
+def is_uneditable(exc: BadRequest) -> bool:
+    message = str(exc).lower()
+    return any(reason in message for reason in _UNEDITABLE)
+
+
+async def _edit(key: tuple[int, int] | None, edit_message_text, text: str, reply_markup, kwargs: dict) -> bool:
+    digest = _digest(text, reply_markup, kwargs)
+    if key is not None and _rendered.get(key) == digest:
+        _rendered.move_to_end(key)
+        stats["skipped"] += 1
+        return False
+    try:
+        await edit_message_text(text, reply_markup=reply_markup, **kwargs)
+    except BadRequest as exc:
+        if not is_not_modified(exc):
+            raise
+    stats["edits"] += 1
+    if key is not None:
+        _remember(key, digest)
+    return True
+
+
+async def edit(query, text: str, reply_markup=None, *, menu: bool = True, **kwargs) -> bool:
+    """Render ``text`` into the query's message; return False if nothing changed."""
+    message = query.message
+    key = (message.chat_id, message.message_id) if message else None
+    if key is not None:
+        _shown(key, menu)
+    return await _edit(key, query.edit_message_text, text, reply_markup, kwargs)
+
+
+async def edit_message(bot, chat_id: int, message_id: int, render: Render) -> bool:
+    """Render into a message outside of a callback (e.g. from a job); subscribers are not told."""
+    edit_message_text = partial(bot.edit_message_text, chat_id=chat_id, message_id=message_id)
+    return await _edit((chat_id, message_id), edit_message_text, render.text, render.reply_markup, render.options())
+
+
+async def send(message, text: str, reply_markup=None, *, menu: bool = True, **kwargs):
+    """Post a new navigation message (e.g. for /start) and track its content."""
+    sent = await message.reply_text(text, reply_markup=reply_markup, **kwargs)
+    if sent is not None:
+        key = (sent.chat_id, sent.message_id)
+        _remember(key, _digest(text, reply_markup, kwargs))
+        _shown(key, menu)
+    return sent
+
+
+async def _answer(query) -> None:
+    try:
+        await query.answer()
+    except BadRequest:
+        # "Query is too old": the spinner is gone already, the edit still matters.
+        pass
+
+
+async def _show(query, render: Render) -> None:
+    options = render.options()
+    try:
+        await edit(query, render.text, render.reply_markup, menu=render.menu, **options)
+    except BadRequest as exc:
+        if not is_uneditable(exc):
+            raise
+        stats["fallbacks"] += 1
+        if query.message is not None:
+            await send(query.message, render.text, render.reply_markup, menu=render.menu, **options)
+        else:
+            await query.get_bot().send_message(
+                query.from_user.id, render.text, reply_markup=render.reply_markup, **options
+            )
+
+
+async def respond(query, render: Render | None) -> None:
+    """Answer ``query`` and show ``render`` with the two API calls in flight together."""
+    if render is None:
+        await _answer(query)
+        return
+    answered, shown = await asyncio.gather(_answer(query), _show(query, render), return_exceptions=True)
+    for result in (shown, answered):
+        if isinstance(result, BaseException):
+            raise result
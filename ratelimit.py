@@ -0,0 +1,150 @@
+"""Outbound request scheduling within Telegram's flood limits.
+
+Every Bot API call made through the application passes through
+:class:`FloodRateLimiter` (PTB's ``rate_limiter`` hook), so handlers keep
+calling ``reply_text``/``edit_message_text`` as usual. Messages are paced by a
+global token bucket and per-chat buckets; ``RetryAfter`` pauses all sends for
+the requested time, and transient network errors are retried with jittered
+exponential backoff.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Calls that do not post anything into a chat and are not subject to message limits.
+UNTHROTTLED_ENDPOINTS = frozenset({
+    "answerCallbackQuery",
+    "answerInlineQuery",
+    "getMe",
+    "getUpdates",
+    "setWebhook",
+    "deleteWebhook",
+    "getWebhookInfo",
+    "close",
+    "logOut",
+})
+
+
+class TokenBucket:
+    """Asyncio token bucket; waiters are served in FIFO order."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_idle(self) -> bool:
+        """True when the bucket is full again and can be forgotten."""
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity and not self._lock.locked()
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FloodRateLimiter(BaseRateLimiter):
+    """Global and per-chat pacing with ``RetryAfter`` and network-error retries."""
+
+    def __init__(self, overall_rate: float = 30, chat_rate: float = 1, chat_burst: float = 3,
+                 group_rate: float = 20 / 60, max_retries: int = 3, max_chats: int = 10_000):
+        self.overall = TokenBucket(overall_rate, overall_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+        self._chats: dict[int | str, TokenBucket] = {}
+        self.retries = 0
+        self.retry_after_events = 0
+        self.failures = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chats:
+                self._chats = {cid: b for cid, b in self._chats.items() if not b.is_idle()}
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = self.group_rate if is_group else self.chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, 1 if is_group else self.chat_burst)
+        return bucket
+
+    async def _throttle(self, endpoint: str, data: dict) -> None:
+        if endpoint in UNTHROTTLED_ENDPOINTS:
+            return
+        chat_id = data.get("chat_id")
+        if chat_id is not None:
+            await self._chat_bucket(chat_id).acquire()
+        await self.overall.acquire()
+
+    def _backoff(self, attempt: int) -> float:
+        return min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        attempt = 0
+        while True:
+            await self._throttle(endpoint, data)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as exc:
+                self.retry_after_events += 1
+                delay = float(exc.retry_after) + random.uniform(0, 1)
+                # Flood control applies to the whole bot, so every throttled send waits.
+                self.overall.block(delay)
+                error, backoff = exc, delay if endpoint in UNTHROTTLED_ENDPOINTS else 0.0
+                logger.warning("%s hit flood control, retrying in %ss", endpoint, exc.retry_after)
+            except BadRequest:
+                raise
+            except TimedOut as exc:
+                # A timed out send may still have been delivered; do not post it twice.
+                if endpoint.startswith("send"):
+                    raise
+                error, backoff = exc, self._backoff(attempt)
+            except NetworkError as exc:
+                error, backoff = exc, self._backoff(attempt)
+            attempt += 1
+            if attempt > self.max_retries:
+                self.failures += 1
+                raise error
+            self.retries += 1
+            await asyncio.sleep(backoff)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "tracked_chats": len(self._chats),
+            "retries": self.retries,
+            "retry_after_events": self.retry_after_events,
+            "failures": self.failures,
+        }
@@ -0,0 +1,79 @@
+"""Callback data encoding and dispatch through a single handler.
+
+Callback payloads are ``<version>:<action>[:<arg>...]``, e.g. ``1:game:pubg``.
+The version prefix lets stale keyboards from older deployments be recognised
+and answered with a cheap fallback instead of being misinterpreted.
+"""
+
+import functools
+
+CALLBACK_VERSION = "1"
+SEPARATOR = ":"
+MAX_CALLBACK_BYTES = 64
+
+
+def encode(action: str, *args: str) -> str:
+    """Build callback data for ``action``; Telegram limits it to 64 bytes."""
+    data = SEPARATOR.join((CALLBACK_VERSION, action, *args))
+    if len(data.encode()) > MAX_CALLBACK_BYTES:
+        raise ValueError(f"Callback data too long: {data!r}")
+    return data
+
+
+def decode(data: str | None) -> tuple[str, list[str]] | None:
+    """Split callback data into (action, args), or None if it is not ours."""
+    if not data:
+        return None
+    version, _, rest = data.partition(SEPARATOR)
+    if version != CALLBACK_VERSION or not rest:
+        return None
+    action, *args = rest.split(SEPARATOR)
+    return action, args
+
+
+class CallbackRouter:
+    """Dispatch callback queries by action name with one dict lookup.
+
+    With ``respond``, whatever a handler returns is passed on as
+    ``respond(callback_query, result)``, so handlers can describe the reply
+    instead of sending it themselves.
+    """
+
+    def __init__(self, fallback, respond=None):
+        self.respond = respond
+        self.fallback = self._responding(fallback)
+        self._routes: dict[str, tuple] = {}
+
+    def _responding(self, handler):
+        if self.respond is None:
+            return handler
+
+        @functools.wraps(handler)
+        async def handle_and_respond(update, context, *args):
+            result = await handler(update, context, *args)
+            await self.respond(update.callback_query, result)
+            return result
+
+        return handle_and_respond
+
+    def route(self, action: str, handler, nargs: int = 0) -> None:
+        """Register ``handler(update, context, *args)`` for ``action``."""
+        self._routes[action] = (self._responding(handler), nargs)
+
+    def wrap(self, decorator) -> None:
+        """Replace every route with ``decorator(action, route)``; the fallback is "stale".
+
+        A route includes ``respond``, so the decorator sees the whole press,
+        Bot API calls included.
+        """
+        self._routes = {action: (decorator(action, handler), nargs) for action, (handler, nargs) in self._routes.items()}
+        self.fallback = decorator("stale", self.fallback)
+
+    async def dispatch(self, update, context):
+        handler, args = self.fallback, ()
+        parsed = decode(update.callback_query.data)
+        if parsed is not None:
+            entry = self._routes.get(parsed[0])
+            if entry is not None and len(parsed[1]) == entry[1]:
+                handler, args = entry[0], parsed[1]
+        return await handler(update, context, *args)
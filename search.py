@@ -0,0 +1,233 @@
+"""Catalog search: inline mode (``@bot pubg 30``) and free-text FAQ answers.
+
+Every offer (game x duration) and FAQ entry is a document whose tokens come
+from all languages: game titles and ids, duration labels ("30 days",
+"30 дней", ...) and FAQ titles. The index maps every token prefix straight
+to the set of matching documents, so a query is one dict lookup per word
+and a set intersection. Results are pre-built for each language, and the
+whole index is rebuilt when the catalog is reloaded.
+
+Free-text messages are matched against FAQ titles in every language and the
+entries' extra ``keywords`` through a trigram index: the score of a title is
+the Dice coefficient of the trigram sets (or, for a short fragment of a
+title, how much of the message it covers), the score of a keyword is how much
+of it the message contains. Matching a question costs one postings walk per
+trigram of the message.
+"""
+
+import re
+from collections import defaultdict
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import ContextTypes
+
+import catalog
+import navigation
+from catalog import faq, texts
+from config import INLINE_CACHE_TIME
+from keyboards import get_keyboard
+from language import user_languages
+
+MAX_PREFIX = 20
+MAX_RESULTS = 50  # Telegram's limit per answer
+FAQ_MIN_SCORE = 0.5
+FAQ_MAX_ANSWERS = 3
+# A message fully contained in a title (a fragment such as "虚拟机") still counts.
+FAQ_FRAGMENT_SCORE = 0.6
+
+# Kana, CJK ideographs and Hangul; runs of them are split from Latin/Cyrillic words.
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_WORD = re.compile(rf"[{_CJK}]+|[^\W{_CJK}]+")
+_WIDE = re.compile(rf"[{_CJK}]")
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.casefold())
+
+
+def _is_wide(token: str) -> bool:
+    return _WIDE.match(token) is not None
+
+
+def _prefixes(token: str):
+    # Chinese and Japanese titles have no spaces, so every suffix is indexed
+    # too and a query can match from anywhere inside the phrase.
+    starts = range(len(token)) if _is_wide(token) else (0,)
+    for start in starts:
+        for end in range(start + 1, min(len(token), start + MAX_PREFIX) + 1):
+            yield token[start:end]
+
+
+@dataclass(frozen=True)
+class Document:
+    id: str
+    results: dict  # lang -> InlineQueryResultArticle
+
+
+class PrefixIndex:
+    """Documents in catalog order plus a prefix -> document ids map."""
+
+    def __init__(self):
+        self.documents: list[Document] = []
+        self.postings: dict[str, set[int]] = defaultdict(set)
+
+    def add(self, document: Document, words) -> None:
+        position = len(self.documents)
+        self.documents.append(document)
+        for text in words:
+            for token in tokenize(text):
+                for prefix in _prefixes(token):
+                    self.postings[prefix].add(position)
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> list[Document]:
+        matches = None
+        for token in tokenize(query):
+            found = self.postings.get(token[:MAX_PREFIX])
+            if not found:
+                return []
+            matches = found if matches is None else matches & found
+        positions = range(len(self.documents)) if matches is None else sorted(matches)
+        return [self.documents[position] for position in positions[:limit]]
+
+
+def _offer_results(current: catalog.Catalog, gid: str, days: str) -> dict:
+    game = current.games[gid]
+    return {
+        lang: InlineQueryResultArticle(
+            id=f"offer:{gid}:{days}",
+            title=f"{game['title']} — {current.rendered[('duration', days, lang)]}",
+            description=game["description"][lang],
+            input_message_content=InputTextMessageContent(
+                current.rendered[("offer", gid, days, lang)], parse_mode="Markdown", disable_web_page_preview=True
+            ),
+        )
+        for lang in current.languages
+    }
+
+
+def _faq_results(faq_id: str, entry, languages) -> dict:
+    return {
+        lang: InlineQueryResultArticle(
+            id=f"faq:{faq_id}",
+            title=entry["title"][lang],
+            description=entry["link"],
+            input_message_content=InputTextMessageContent(f"📄 {entry['title'][lang]}\n{entry['link']}"),
+        )
+        for lang in languages
+    }
+
+
+def trigrams(text: str) -> set[str]:
+    """Padded word trigrams; unspaced Chinese/Japanese phrases use character bigrams."""
+    grams = set()
+    for token in tokenize(text):
+        if _is_wide(token) and len(token) > 1:
+            grams.update(token[i:i + 2] for i in range(len(token) - 1))
+            continue
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FaqMatcher:
+    """Trigram index over FAQ titles (all languages) and keywords."""
+
+    def __init__(self, entries: Mapping[str, Mapping]):
+        # Each indexed phrase: (faq id, trigram count, is keyword).
+        self.phrases: list[tuple[str, int, bool]] = []
+        self.postings: dict[str, list[int]] = defaultdict(list)
+        for faq_id, entry in entries.items():
+            seen = set()
+            for text, is_keyword in [*((t, False) for t in entry["title"].values()),
+                                     *((k, True) for k in entry.get("keywords", ()))]:
+                grams = frozenset(trigrams(text))
+                if grams and grams not in seen:
+                    seen.add(grams)
+                    self._add(faq_id, grams, is_keyword)
+
+    def _add(self, faq_id: str, grams: frozenset, is_keyword: bool) -> None:
+        phrase = len(self.phrases)
+        self.phrases.append((faq_id, len(grams), is_keyword))
+        for gram in grams:
+            self.postings[gram].append(phrase)
+
+    def match(self, text: str, limit: int = FAQ_MAX_ANSWERS, min_score: float = FAQ_MIN_SCORE) -> list[str]:
+        """FAQ ids best answering ``text``, best first."""
+        query = trigrams(text)
+        overlaps: dict[int, int] = defaultdict(int)
+        for gram in query:
+            for phrase in self.postings.get(gram, ()):
+                overlaps[phrase] += 1
+        scores: dict[str, float] = {}
+        for phrase, overlap in overlaps.items():
+            faq_id, size, is_keyword = self.phrases[phrase]
+            if is_keyword:
+                score = overlap / size
+            else:
+                score = max(2 * overlap / (len(query) + size), FAQ_FRAGMENT_SCORE * overlap / len(query))
+            if score > scores.get(faq_id, 0.0):
+                scores[faq_id] = score
+        ranked = sorted((faq_id for faq_id, score in scores.items() if score >= min_score),
+                        key=scores.__getitem__, reverse=True)
+        return ranked[:limit]
+
+
+def build_index(current: catalog.Catalog) -> PrefixIndex:
+    index = PrefixIndex()
+    for gid, game in current.games.items():
+        for days in game["durations"]:
+            labels = [current.rendered[("duration", days, lang)] for lang in current.languages]
+            index.add(Document(f"offer:{gid}:{days}", _offer_results(current, gid, days)), [gid, game["title"], *labels])
+    for faq_id, entry in current.faq.items():
+        index.add(Document(f"faq:{faq_id}", _faq_results(faq_id, entry, current.languages)), entry["title"].values())
+    return index
+
+
+_index = build_index(catalog.current())
+_faq_matcher = FaqMatcher(catalog.current().faq)
+
+
+def rebuild(new_catalog: catalog.Catalog) -> None:
+    global _index, _faq_matcher
+    _index = build_index(new_catalog)
+    _faq_matcher = FaqMatcher(new_catalog.faq)
+
+
+def search(query: str, lang: str) -> list:
+    """Inline results for ``query`` in ``lang``, offers first."""
+    lang = catalog.supported(lang)
+    return [document.results[lang] for document in _index.search(query)]
+
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.inline_query
+    lang = catalog.supported(user_languages.get(query.from_user.id))
+    # Results depend on the user's language, so Telegram must cache them per user.
+    await query.answer(search(query.query, lang), cache_time=INLINE_CACHE_TIME, is_personal=True)
+
+
+def match_faq(text: str) -> list[str]:
+    return _faq_matcher.match(text)
+
+
+async def faq_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer a typed question with the best matching FAQ articles."""
+    message = update.message
+    lang = catalog.supported(user_languages.get(message.from_user.id))
+    matches = match_faq(message.text)
+    if not matches:
+        await navigation.send(message, texts(lang)["faq_no_match"], reply_markup=get_keyboard("faq", lang))
+        return
+    articles = [f"📄 {faq[faq_id]['title'][lang]}\n{faq[faq_id]['link']}" for faq_id in matches]
+    await navigation.send(
+        message,
+        "\n\n".join([texts(lang)["faq_suggestions"], *articles]),
+        reply_markup=get_keyboard("back", lang),
+        menu=False,
+        disable_web_page_preview=True,
+    )
+
+
+catalog.subscribe(rebuild)
@@ -0,0 +1,137 @@
+"""Idle-session expiry on a hashed timer wheel.
+
+A session is a user's current menu message. Every time navigation shows a
+user a menu the session is rescheduled, and when the user has been idle for
+``timeout`` seconds the session expires: the message's navigation state is
+dropped and, optionally, the menu is edited to the ``session_timeout``
+screen. Content screens (payment links, the loader, FAQ answers, contacts)
+end the session instead, so the link a user came for is never replaced.
+
+Instead of one JobQueue job per user, all sessions live in a single
+:class:`TimerWheel` advanced by one repeating job. Rescheduling moves a key
+between two slot dicts and a tick only looks at the slot that is due, so the
+cost of a touch or a tick does not depend on how many users are active, and
+the number of tracked sessions is capped.
+"""
+
+import logging
+import math
+from typing import Callable
+
+from telegram.error import TelegramError
+
+import navigation
+
+logger = logging.getLogger(__name__)
+
+MAX_SESSIONS = 50_000
+
+
+class TimerWheel:
+    """Keys expire ``timeout`` seconds after their last touch, rounded up to whole ticks and up to a tick late."""
+
+    def __init__(self, timeout: float, tick: float, capacity: int = MAX_SESSIONS):
+        # One slot for every tick of the timeout, one for the partial tick the
+        # touch happened in, and the slot being drained.
+        self.size = math.ceil(timeout / tick) + 2
+        self.capacity = capacity
+        self.slots: list[dict] = [{} for _ in range(self.size)]
+        self.where: dict = {}
+        self.cursor = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.where)
+
+    def touch(self, key, value=None) -> None:
+        """Schedule ``key`` (with ``value``) to expire a full timeout from now."""
+        slot = self.where.get(key)
+        if slot is not None:
+            del self.slots[slot][key]
+        target = (self.cursor - 1) % self.size
+        self.slots[target][key] = value
+        self.where[key] = target
+        if len(self.where) > self.capacity:
+            self._evict()
+
+    def get(self, key):
+        slot = self.where.get(key)
+        return None if slot is None else self.slots[slot][key]
+
+    def discard(self, key) -> None:
+        slot = self.where.pop(key, None)
+        if slot is not None:
+            del self.slots[slot][key]
+
+    def advance(self) -> dict:
+        """Move one tick forward and return the ``{key: value}`` that expired."""
+        self.cursor = (self.cursor + 1) % self.size
+        expired = self.slots[self.cursor]
+        self.slots[self.cursor] = {}
+        for key in expired:
+            del self.where[key]
+        return expired
+
+    def _evict(self) -> None:
+        # Drop the session closest to expiry; it was going to go first anyway.
+        for step in range(1, self.size + 1):
+            slot = self.slots[(self.cursor + step) % self.size]
+            if slot:
+                key = next(iter(slot))
+                del slot[key]
+                del self.where[key]
+                self.evicted += 1
+                return
+
+
+_wheel: TimerWheel | None = None
+_render: Callable[[int], navigation.Render] | None = None
+_expired = 0
+
+
+def touch(chat_id: int, message_id: int, menu: bool = True) -> None:
+    if _wheel is None:
+        return
+    if menu:
+        _wheel.touch(chat_id, message_id)
+    elif _wheel.get(chat_id) == message_id:
+        _wheel.discard(chat_id)
+
+
+def start(timeout: float, tick: float, render: Callable[[int], navigation.Render] | None = None) -> None:
+    """Track sessions; ``render(chat_id)``, if given, is the screen shown on expiry."""
+    global _wheel, _render
+    if _wheel is None:
+        navigation.subscribe(touch)
+    _wheel = TimerWheel(timeout, tick)
+    _render = render
+
+
+async def _expire(bot, expired: dict[int, int]) -> None:
+    for chat_id, message_id in expired.items():
+        try:
+            await navigation.edit_message(bot, chat_id, message_id, _render(chat_id))
+        except TelegramError as exc:
+            logger.debug("Could not close the session of %s: %s", chat_id, exc)
+            navigation.forget(chat_id, message_id)
+
+
+async def tick(context) -> None:
+    """JobQueue callback advancing the wheel by one tick."""
+    global _expired
+    expired = _wheel.advance()
+    if not expired:
+        return
+    _expired += len(expired)
+    if _render is None:
+        for chat_id, message_id in expired.items():
+            navigation.forget(chat_id, message_id)
+        return
+    # Edits are paced by the rate limiter; do not hold up the next tick.
+    context.application.create_task(_expire(context.bot, expired))
+
+
+def stats() -> dict[str, int]:
+    if _wheel is None:
+        return {"active": 0, "expired": 0, "evicted": 0}
+    return {"active": len(_wheel), "expired": _expired, "evicted": _wheel.evicted}
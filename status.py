@@ -0,0 +1,147 @@
+"""Product status shown inside the bot, refreshed in the background.
+
+A JobQueue task polls ``STATUS_URL`` every ``STATUS_POLL_INTERVAL`` seconds
+with conditional requests (``If-None-Match`` / ``If-Modified-Since``), so an
+unchanged status costs the source a 304 and the bot no parsing. The source
+is a JSON object mapping game ids to a state, either as a string or as an
+object with a ``status`` field::
+
+    {"pubg": "working", "tarkov": {"status": "updating"}}
+
+States are ``working``, ``updating`` and ``down``; anything else is ignored.
+The localized status line of every (game, language) is rendered when the
+snapshot or the catalog changes, so showing it in a menu is one dict lookup.
+When a known state changes, the chats in ``STATUS_NOTIFY_CHATS`` are told.
+If the source is unreachable, the last snapshot keeps being shown.
+"""
+
+import logging
+
+import httpx
+from telegram.error import TelegramError
+
+import catalog
+import metrics
+from config import STATUS_NOTIFY_CHATS, STATUS_URL, WORKER_INDEX
+from language import user_languages
+
+logger = logging.getLogger(__name__)
+
+STATES = frozenset({"working", "updating", "down"})
+REQUEST_TIMEOUT = 10.0
+
+status_polls = metrics.REGISTRY.counter(
+    "bot_status_polls_total", "Status source polls by outcome", ("outcome",))
+
+_snapshot: dict[str, str] = {}
+_lines: dict[tuple[str, str], str] = {}
+_validators: dict[str, str] = {}
+
+
+def parse(data) -> dict[str, str]:
+    """``{game id: state}`` from a status document; unknown states are dropped."""
+    if not isinstance(data, dict):
+        raise ValueError("status document must be a JSON object")
+    snapshot = {}
+    for gid, value in data.items():
+        state = value.get("status") if isinstance(value, dict) else value
+        if state in STATES:
+            snapshot[gid] = state
+    return snapshot
+
+
+def _render_lines(snapshot: dict[str, str], current: catalog.Catalog) -> dict[tuple[str, str], str]:
+    lines = {}
+    for gid, state in snapshot.items():
+        if gid not in current.games:
+            continue
+        for lang in current.languages:
+            text = current.tables[lang].get(f"status_{state}")
+            if text:
+                lines[(gid, lang)] = text
+    return lines
+
+
+def line(gid: str, lang: str) -> str | None:
+    """The status line for ``gid`` in ``lang``, or None when the state is unknown."""
+    return _lines.get((gid, lang))
+
+
+def install(snapshot: dict[str, str]) -> dict[str, tuple[str, str]]:
+    """Swap in ``snapshot`` and return ``{game id: (old, new)}`` for known states that changed."""
+    global _snapshot, _lines
+    changes = {
+        gid: (_snapshot[gid], state)
+        for gid, state in snapshot.items()
+        if gid in _snapshot and _snapshot[gid] != state
+    }
+    _snapshot = snapshot
+    _lines = _render_lines(snapshot, catalog.current())
+    return changes
+
+
+def _rerender(new_catalog: catalog.Catalog) -> None:
+    global _lines
+    _lines = _render_lines(_snapshot, new_catalog)
+
+
+async def fetch(client: httpx.AsyncClient, url: str) -> dict[str, str] | None:
+    """The new snapshot, or None when the source reports it unchanged."""
+    response = await client.get(url, headers=dict(_validators))
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    snapshot = parse(response.json())
+    _validators.clear()
+    if "etag" in response.headers:
+        _validators["If-None-Match"] = response.headers["etag"]
+    if "last-modified" in response.headers:
+        _validators["If-Modified-Since"] = response.headers["last-modified"]
+    return snapshot
+
+
+async def refresh(client: httpx.AsyncClient, url: str) -> dict[str, tuple[str, str]]:
+    """Poll ``url`` once and return the state changes."""
+    try:
+        snapshot = await fetch(client, url)
+    except (httpx.HTTPError, ValueError) as exc:
+        status_polls.inc("error")
+        logger.warning("Status poll failed, keeping the last snapshot: %s", exc)
+        return {}
+    if snapshot is None:
+        status_polls.inc("not_modified")
+        return {}
+    status_polls.inc("updated")
+    return install(snapshot)
+
+
+async def notify(bot, changes: dict[str, tuple[str, str]], chats=STATUS_NOTIFY_CHATS) -> None:
+    current = catalog.current()
+    for gid, (_, state) in changes.items():
+        if gid not in current.games:
+            continue
+        for chat_id in chats:
+            lang = catalog.supported(user_languages.get(chat_id))
+            template = current.templates[lang].get("status_changed")
+            status_line = line(gid, lang)
+            if template is None or status_line is None:
+                continue
+            text = template.render(game=current.games[gid]["title"], status=status_line)
+            try:
+                await bot.send_message(chat_id, text)
+            except TelegramError as exc:
+                logger.warning("Could not send the status change to %s: %s", chat_id, exc)
+
+
+async def poll(context) -> None:
+    """JobQueue callback refreshing the snapshot from ``STATUS_URL``."""
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+        changes = await refresh(client, STATUS_URL)
+    for gid, (old, new) in changes.items():
+        logger.info("Status of %s changed: %s -> %s", gid, old, new)
+    # Every worker keeps its own snapshot, but only the first one notifies.
+    if changes and WORKER_INDEX == 0:
+        await notify(context.bot, changes)
+
+
+catalog.subscribe(_rerender)
@@ -0,0 +1,315 @@
+"""Per-user state storage.
+
+Handlers talk to :class:`StateMap` objects (``language.user_languages`` and
+friends), which behave like dicts but delegate to the configured backend.
+:class:`SQLiteStateStore` is the production backend: a bounded LRU in front of
+SQLite with writes flushed in batches by a background thread, so memory stays
+flat no matter how many users the bot has seen and nothing is lost on restart.
+Lookups use their own read connection: in WAL mode they never wait for the
+writer, even while another process holds the write lock.
+"""
+
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator, MutableMapping
+
+logger = logging.getLogger(__name__)
+
+_DELETED = object()
+# Seconds the writer waits for another process's write lock before retrying on the next flush.
+WRITE_BUSY_TIMEOUT = 0.2
+# Flush attempts on close before giving up on a database other processes keep locked.
+CLOSE_ATTEMPTS = 50
+
+
+class StateStore:
+    """Unbounded in-memory backend, used until :func:`configure` is called."""
+
+    def __init__(self):
+        self._data: dict[tuple[str, int], str] = {}
+
+    def get(self, namespace: str, user_id: int, default=None):
+        return self._data.get((namespace, user_id), default)
+
+    def set(self, namespace: str, user_id: int, value: str) -> None:
+        self._data[(namespace, user_id)] = value
+
+    def delete(self, namespace: str, user_id: int) -> None:
+        self._data.pop((namespace, user_id), None)
+
+    def fetch(self, namespace: str, user_id: int, default=None):
+        """The persisted value, bypassing caches; for records several processes write."""
+        return self.get(namespace, user_id, default)
+
+    def compare_and_set(self, namespace: str, user_id: int, expected: str, value: str) -> bool:
+        """Store ``value`` only if the persisted value is still ``expected``."""
+        key = (namespace, user_id)
+        if self._data.get(key) != expected:
+            return False
+        self._data[key] = value
+        return True
+
+    def users(self, namespace: str, after: int = -1) -> Iterator[int]:
+        return iter(sorted(uid for ns, uid in list(self._data) if ns == namespace and uid > after))
+
+    def count(self, namespace: str) -> int:
+        return sum(1 for ns, _ in self._data if ns == namespace)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteStateStore(StateStore):
+    """SQLite backend with a hot-user LRU and write-behind batching."""
+
+    def __init__(self, path: str, cache_size: int = 10_000, flush_interval: float = 1.0, batch_size: int = 500):
+        self._conn = sqlite3.connect(path, timeout=WRITE_BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_state ("
+            " namespace TEXT NOT NULL, user_id INTEGER NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (namespace, user_id)) WITHOUT ROWID"
+        )
+        self._reader = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._reader.execute("PRAGMA query_only=ON")
+        # _db_lock guards the write connection (held across BEGIN...COMMIT), _read_lock
+        # the read connection and _lock the in-memory state; lookups never take _db_lock.
+        self._db_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple[str, int], str] = OrderedDict()
+        self._pending: dict[tuple[str, int], object] = {}
+        # Changes being committed by flush(): still newer than what the reader sees.
+        self._inflight: dict[tuple[str, int], object] = {}
+        # Bumped on every change, so a lookup can tell one raced its database read.
+        self._changes = 0
+        self._cache_size = cache_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run_writer, name="state-writer", daemon=True)
+        self._writer.start()
+
+    def _remember(self, key: tuple[str, int], value: str) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _unwritten(self, key: tuple[str, int]):
+        """The queued or committing change for ``key``; call with ``_lock`` held."""
+        value = self._pending.get(key)
+        return self._inflight.get(key) if value is None else value
+
+    def _read(self, key: tuple[str, int]) -> str | None:
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT value FROM user_state WHERE namespace = ? AND user_id = ?", key
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def get(self, namespace: str, user_id: int, default=None):
+        key = (namespace, user_id)
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+                return value
+            value = self._unwritten(key)
+            changes = self._changes
+        if value is _DELETED:
+            return default
+        if value is not None:
+            return value
+        value = self._read(key)
+        with self._lock:
+            if self._changes != changes:
+                # Something changed while we read the row; only cache what is known current.
+                newer = self._unwritten(key)
+                if newer is not None:
+                    return default if newer is _DELETED else newer
+            elif value is not None:
+                self._remember(key, value)
+        return default if value is None else value
+
+    def set(self, namespace: str, user_id: int, value: str) -> None:
+        key = (namespace, user_id)
+        with self._lock:
+            # Queued even when the cache already holds ``value``: another process (a
+            # broadcast prune) may have deleted the row. Identical values are not rewritten.
+            self._remember(key, value)
+            self._pending[key] = value
+            self._changes += 1
+            backlog = len(self._pending)
+        if backlog >= self._batch_size:
+            self._wakeup.set()
+
+    def delete(self, namespace: str, user_id: int) -> None:
+        key = (namespace, user_id)
+        with self._lock:
+            self._cache.pop(key, None)
+            self._pending[key] = _DELETED
+            self._changes += 1
+
+    def fetch(self, namespace: str, user_id: int, default=None):
+        key = (namespace, user_id)
+        with self._lock:
+            value = self._unwritten(key)
+        if value is _DELETED:
+            return default
+        if value is None:
+            value = self._read(key)
+        return default if value is None else value
+
+    def compare_and_set(self, namespace: str, user_id: int, expected: str, value: str) -> bool:
+        self.flush()
+        with self._db_lock:
+            changed = self._conn.execute(
+                "UPDATE user_state SET value = ? WHERE namespace = ? AND user_id = ? AND value = ?",
+                (value, namespace, user_id, expected),
+            ).rowcount
+        if changed:
+            with self._lock:
+                self._remember((namespace, user_id), value)
+        return bool(changed)
+
+    def users(self, namespace: str, after: int = -1) -> Iterator[int]:
+        """Yield every user id stored in ``namespace`` above ``after`` in ascending order."""
+        self.flush()
+        last = after
+        while True:
+            with self._read_lock:
+                rows = self._reader.execute(
+                    "SELECT user_id FROM user_state WHERE namespace = ? AND user_id > ? ORDER BY user_id LIMIT 1000",
+                    (namespace, last),
+                ).fetchall()
+            if not rows:
+                return
+            for (user_id,) in rows:
+                yield user_id
+            last = rows[-1][0]
+
+    def count(self, namespace: str) -> int:
+        self.flush()
+        with self._read_lock:
+            row = self._reader.execute("SELECT COUNT(*) FROM user_state WHERE namespace = ?", (namespace,)).fetchone()
+        return row[0]
+
+    def flush(self) -> None:
+        """Write all pending changes to disk."""
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                # Lookups keep seeing these until COMMIT instead of the old rows.
+                self._inflight = pending
+            if not pending:
+                return
+            upserts = [(ns, uid, value) for (ns, uid), value in pending.items() if value is not _DELETED]
+            deletes = [key for key, value in pending.items() if value is _DELETED]
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT INTO user_state (namespace, user_id, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (namespace, user_id) DO UPDATE SET value = excluded.value "
+                    "WHERE value != excluded.value",
+                    upserts,
+                )
+                self._conn.executemany("DELETE FROM user_state WHERE namespace = ? AND user_id = ?", deletes)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as exc:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                if isinstance(exc, sqlite3.OperationalError) and "locked" in str(exc):
+                    # Another worker is writing; the batch goes out with the next flush.
+                    logger.info("State database busy, will retry %d changes", len(pending))
+                else:
+                    logger.exception("Failed to flush %d state changes, will retry", len(pending))
+                with self._lock:
+                    for key, value in pending.items():
+                        self._pending.setdefault(key, value)
+                    self._inflight = {}
+                return
+            with self._lock:
+                self._inflight = {}
+
+    def _run_writer(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the writer thread, flush outstanding writes and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        for _ in range(CLOSE_ATTEMPTS):
+            self.flush()
+            if not self._pending:
+                break
+        else:
+            logger.error("Closing the state store with %d changes unwritten", len(self._pending))
+        with self._db_lock, self._read_lock:
+            self._conn.close()
+            self._reader.close()
+
+
+_store: StateStore = StateStore()
+
+
+def configure(store: StateStore) -> None:
+    """Route all :class:`StateMap` objects to ``store``."""
+    global _store
+    _store = store
+
+
+def get_store() -> StateStore:
+    return _store
+
+
+def open_store(backend: str, path: str, cache_size: int = 10_000) -> StateStore:
+    """Create a backend by name (``sqlite`` or ``memory``)."""
+    if backend == "sqlite":
+        return SQLiteStateStore(path, cache_size=cache_size)
+    if backend == "memory":
+        return StateStore()
+    raise ValueError(f"Unknown state backend: {backend}")
+
+
+class StateMap(MutableMapping):
+    """Dict-like view over one namespace of the configured store."""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    def __getitem__(self, user_id: int) -> str:
+        value = _store.get(self.namespace, user_id)
+        if value is None:
+            raise KeyError(user_id)
+        return value
+
+    def get(self, user_id: int, default=None):
+        return _store.get(self.namespace, user_id, default)
+
+    def __setitem__(self, user_id: int, value: str) -> None:
+        _store.set(self.namespace, user_id, value)
+
+    def __delitem__(self, user_id: int) -> None:
+        if _store.get(self.namespace, user_id) is None:
+            raise KeyError(user_id)
+        _store.delete(self.namespace, user_id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(_store.users(self.namespace))
+
+    def __len__(self) -> int:
+        return _store.count(self.namespace)
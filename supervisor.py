@@ -0,0 +1,305 @@
+"""Multi-process mode: one update ingress feeding N worker processes.
+
+The supervisor receives updates by long polling or webhook and forwards the
+raw JSON, one object per line, to the stdin of worker ``user_id % N``. Each
+user therefore stays on one worker and sees their updates in order, while
+different users are spread over all cores. Workers are ordinary bot
+processes (``main.py --mode worker``) sharing the catalog file and the SQLite
+state store; because a user never moves between workers, each worker's store
+cache stays authoritative for its users. The one exception is a broadcast
+pruning unreachable users from any worker, which is why the store writes every
+``set`` through instead of trusting its cache. Telegram's global send limit is per
+bot, so every worker gets ``1/N`` of ``FLOOD_OVERALL_RATE`` and
+``BROADCAST_RATE``.
+
+Crashed workers are restarted with exponential backoff; updates for them are
+buffered meanwhile. On shutdown the supervisor closes every worker's stdin
+and waits for it to finish the updates it already accepted.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from collections import deque
+
+import httpx
+from telegram import Update
+
+import metrics
+from config import BROADCAST_RATE, FLOOD_OVERALL_RATE
+from httpserver import start_server
+from webhook import WebhookReceiver
+
+logger = logging.getLogger(__name__)
+
+BOT_API_URL = "https://api.telegram.org/bot"
+MAX_LINE_SIZE = 1 << 20
+STABLE_RUN_SECONDS = 60
+
+
+def user_id(update: dict) -> int | None:
+    """The id of the user an update comes from, without building PTB objects."""
+    for value in update.values():
+        if isinstance(value, dict):
+            user = value.get("from") or value.get("user")
+            if isinstance(user, dict) and isinstance(user.get("id"), int):
+                return user["id"]
+    return None
+
+
+class Worker:
+    """One ``main.py --mode worker`` process and its update pipe."""
+
+    def __init__(self, index: int, command: list[str], env: dict[str, str], max_backlog: int = 10_000):
+        self.index = index
+        self.command = command
+        self.env = env
+        self.proc: asyncio.subprocess.Process | None = None
+        self.backlog: deque[bytes] = deque(maxlen=max_backlog)
+        self.started_at = 0.0
+        self.restarts = 0
+        self.forwarded = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def start(self) -> None:
+        self.proc = await asyncio.create_subprocess_exec(*self.command, stdin=asyncio.subprocess.PIPE, env=self.env)
+        self.started_at = time.monotonic()
+        logger.info("Worker %s started (pid %s)", self.index, self.proc.pid)
+        # Written without awaiting in between so buffered updates stay ahead of new ones.
+        while self.backlog:
+            self.proc.stdin.write(self.backlog.popleft())
+        await self._drain_pipe()
+
+    async def send(self, line: bytes) -> None:
+        if not self.alive:
+            self.backlog.append(line)
+            return
+        self.proc.stdin.write(line)
+        self.forwarded += 1
+        await self._drain_pipe()
+
+    async def _drain_pipe(self) -> None:
+        try:
+            await self.proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    async def stop(self, timeout: float) -> None:
+        """Close stdin and let the worker finish its queue; kill it after ``timeout``."""
+        if not self.alive:
+            return
+        self.proc.stdin.close()
+        try:
+            await asyncio.wait_for(self.proc.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Worker %s did not drain in %ss, killing it", self.index, timeout)
+            self.proc.kill()
+            await self.proc.wait()
+
+
+class Supervisor:
+    """Start, partition updates between and restart a fixed set of workers."""
+
+    def __init__(self, workers: int, command: list[str], env: dict[str, str] | None = None,
+                 restart_delay: float = 1.0, max_restart_delay: float = 30.0, drain_timeout: float = 30.0):
+        env = dict(os.environ if env is None else env)
+        self.workers = [Worker(index, command, self._worker_env(env, index, workers)) for index in range(workers)]
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.drain_timeout = drain_timeout
+        self.stopping = False
+        self._watchers: list[asyncio.Task] = []
+
+    @staticmethod
+    def _worker_env(env: dict[str, str], index: int, workers: int) -> dict[str, str]:
+        env = dict(env)
+        env["WORKER_INDEX"] = str(index)
+        # The global limits are per bot token: split them so N workers together stay within them.
+        for name, default in (("FLOOD_OVERALL_RATE", FLOOD_OVERALL_RATE), ("BROADCAST_RATE", BROADCAST_RATE)):
+            env[name] = repr(float(env.get(name) or default) / workers)
+        # Every worker gets its own metrics port next to the supervisor's.
+        port = int(env.get("METRICS_PORT", "0") or 0)
+        if port:
+            env["METRICS_PORT"] = str(port + 1 + index)
+        return env
+
+    def shard(self, update: dict) -> Worker:
+        uid = user_id(update)
+        key = uid if uid is not None else update.get("update_id", 0)
+        return self.workers[key % len(self.workers)]
+
+    async def dispatch(self, update: dict) -> None:
+        line = json.dumps(update, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+        await self.shard(update).send(line)
+
+    async def start(self) -> None:
+        for worker in self.workers:
+            await worker.start()
+            self._watchers.append(asyncio.create_task(self._watch(worker)))
+
+    async def _watch(self, worker: Worker) -> None:
+        delay = self.restart_delay
+        while True:
+            code = await worker.proc.wait()
+            if self.stopping:
+                return
+            if time.monotonic() - worker.started_at > STABLE_RUN_SECONDS:
+                delay = self.restart_delay
+            logger.error("Worker %s exited with code %s, restarting in %.1fs", worker.index, code, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+            worker.restarts += 1
+            await worker.start()
+
+    async def stop(self) -> None:
+        self.stopping = True
+        for task in self._watchers:
+            task.cancel()
+        await asyncio.gather(*(worker.stop(self.drain_timeout) for worker in self.workers))
+        logger.info("All workers stopped")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": len(self.workers),
+            "alive": sum(worker.alive for worker in self.workers),
+            "restarts": sum(worker.restarts for worker in self.workers),
+            "forwarded": sum(worker.forwarded for worker in self.workers),
+            "backlog": sum(len(worker.backlog) for worker in self.workers),
+        }
+
+
+class ShardingReceiver(WebhookReceiver):
+    """Webhook endpoint that forwards raw updates to the supervisor's workers."""
+
+    def __init__(self, supervisor: Supervisor, path: str, secret_token: str | None = None):
+        super().__init__(None, path, secret_token)
+        self.supervisor = supervisor
+
+    def parse(self, data):
+        if not isinstance(data, dict) or not isinstance(data.get("update_id"), int):
+            raise ValueError("not an update")
+        return data
+
+    async def deliver(self, update) -> None:
+        await self.supervisor.dispatch(update)
+
+
+async def poll(supervisor: Supervisor, client: httpx.AsyncClient, api_url: str, timeout: int = 30) -> None:
+    """Long-poll ``getUpdates`` and forward every update until cancelled.
+
+    The offset of forwarded updates is confirmed with a last short call on
+    cancellation, so a restart does not receive them again.
+    """
+    offset = 0
+    try:
+        while True:
+            try:
+                response = await client.post(f"{api_url}/getUpdates", json={"offset": offset, "timeout": timeout})
+                data = response.json()
+            except (httpx.HTTPError, ValueError) as exc:
+                logger.warning("getUpdates failed: %s", exc)
+                await asyncio.sleep(1)
+                continue
+            if not data.get("ok"):
+                logger.warning("getUpdates returned an error: %s", data.get("description"))
+                await asyncio.sleep(data.get("parameters", {}).get("retry_after", 1))
+                continue
+            for update in data["result"]:
+                await supervisor.dispatch(update)
+                offset = update["update_id"] + 1
+    except asyncio.CancelledError:
+        if offset:
+            try:
+                await client.post(f"{api_url}/getUpdates", json={"offset": offset, "timeout": 0})
+            except httpx.HTTPError:
+                logger.warning("Could not confirm the last update offset %s", offset)
+        raise
+
+
+async def run(token: str, workers: int, command: list[str], ingress: str = "polling",
+              base_url: str | None = None, listen: str = "0.0.0.0", port: int = 8443, path: str = "/telegram",
+              secret_token: str | None = None, webhook_url: str | None = None,
+              metrics_listen: str = "127.0.0.1", metrics_port: int = 0,
+              drain_timeout: float = 30.0, stop_event: asyncio.Event | None = None) -> None:
+    """Run the supervisor until SIGINT/SIGTERM or ``stop_event``."""
+    stop_event = stop_event or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    supervisor = Supervisor(workers, command, drain_timeout=drain_timeout)
+    metrics.REGISTRY.stats("bot_supervisor", "Worker processes and forwarded updates", supervisor.stats)
+    if metrics_port:
+        await metrics.serve(metrics_listen, metrics_port)
+    api_url = f"{base_url or BOT_API_URL}{token}"
+    await supervisor.start()
+    async with httpx.AsyncClient(timeout=60) as client:
+        try:
+            if ingress == "webhook":
+                if webhook_url:
+                    params = {"url": webhook_url, "secret_token": secret_token} if secret_token else {"url": webhook_url}
+                    await client.post(f"{api_url}/setWebhook", json=params)
+                server = await start_server(ShardingReceiver(supervisor, path, secret_token), listen, port)
+                logger.info("Supervisor webhook listening on %s:%s%s", listen, port, path)
+                await stop_event.wait()
+                server.close()
+            else:
+                await client.post(f"{api_url}/deleteWebhook")
+                poller = asyncio.create_task(poll(supervisor, client, api_url))
+                await stop_event.wait()
+                poller.cancel()
+                await asyncio.gather(poller, return_exceptions=True)
+        finally:
+            await supervisor.stop()
+            await metrics.stop()
+
+
+async def run_worker(app, stream=None) -> None:
+    """Feed updates read line by line from ``stream`` (stdin) into ``app``.
+
+    End of input, e.g. the supervisor closing the pipe, or SIGTERM stops the
+    worker after the updates it already read have been processed. SIGINT is
+    ignored: a Ctrl+C in the terminal reaches the supervisor, which drains the
+    workers itself.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=MAX_LINE_SIZE)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), stream or sys.stdin)
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        loop.add_signal_handler(signal.SIGTERM, reader.feed_eof)
+    except (NotImplementedError, RuntimeError, ValueError):
+        pass
+
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+    try:
+        await app.start()
+        try:
+            while line := await reader.readline():
+                try:
+                    update = Update.de_json(json.loads(line), app.bot)
+                except ValueError:
+                    logger.warning("Skipping malformed update line")
+                    continue
+                await app.update_queue.put(update)
+        finally:
+            # Stopping processes every update that was already queued.
+            await app.stop()
+            if app.post_stop:
+                await app.post_stop(app)
+    finally:
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
@@ -0,0 +1,12 @@
+import sys
+from pathlib import Path
+
+# Ensure repository root is in sys.path
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import stubs  # noqa: E402
+
+# Provide dummy telegram modules so the bot modules can be imported without dependency.
+stubs.install()
@@ -0,0 +1,122 @@
+"""Minimal stand-ins for the ``telegram`` package.
+
+The tests and the handler benchmarks import the bot modules against these
+instead of python-telegram-bot, so they run without the dependency and
+without any Bot API objects. Only what the modules touch is provided.
+"""
+
+import asyncio
+import sys
+import types
+
+
+class InlineKeyboardButton:
+    """Minimal stand-in recording the fields handlers care about."""
+
+    def __init__(self, text, url=None, callback_data=None, **kwargs):
+        self.text = text
+        self.url = url
+        self.callback_data = callback_data
+
+
+class InlineKeyboardMarkup:
+    def __init__(self, inline_keyboard):
+        self.inline_keyboard = tuple(tuple(row) for row in inline_keyboard)
+
+
+class InlineQueryResultArticle:
+    def __init__(self, id, title, input_message_content, **kwargs):
+        self.id = id
+        self.title = title
+        self.input_message_content = input_message_content
+        self.description = kwargs.get("description")
+
+
+class InputTextMessageContent:
+    def __init__(self, message_text, parse_mode=None, **kwargs):
+        self.message_text = message_text
+        self.parse_mode = parse_mode
+
+
+class BaseUpdateProcessor:
+    def __init__(self, max_concurrent_updates):
+        self.max_concurrent_updates = max_concurrent_updates
+        self._semaphore = asyncio.BoundedSemaphore(max_concurrent_updates)
+
+    async def process_update(self, update, coroutine):
+        async with self._semaphore:
+            await self.do_process_update(update, coroutine)
+
+
+class BaseRateLimiter:
+    pass
+
+
+class TelegramError(Exception):
+    pass
+
+
+class NetworkError(TelegramError):
+    pass
+
+
+class BadRequest(NetworkError):
+    pass
+
+
+class TimedOut(NetworkError):
+    pass
+
+
+class Forbidden(TelegramError):
+    pass
+
+
+class RetryAfter(TelegramError):
+    def __init__(self, retry_after):
+        super().__init__(f"Flood control exceeded. Retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class HTTPXRequest:
+    def __init__(self, connection_pool_size=1, **kwargs):
+        self.options = dict(kwargs, connection_pool_size=connection_pool_size)
+        self._client_kwargs = {"limits": None}
+        self._client = self._build_client()
+
+    def _build_client(self):
+        return types.SimpleNamespace(**self._client_kwargs)
+
+
+def install() -> None:
+    """Register the stand-ins as ``telegram``, ``telegram.ext``, ``telegram.error`` and ``telegram.request``."""
+    telegram = types.ModuleType('telegram')
+    telegram.InlineKeyboardButton = InlineKeyboardButton
+    telegram.InlineKeyboardMarkup = InlineKeyboardMarkup
+    telegram.InlineQueryResultArticle = InlineQueryResultArticle
+    telegram.InputTextMessageContent = InputTextMessageContent
+    telegram.Update = object
+
+    telegram_ext = types.ModuleType('telegram.ext')
+    telegram_ext.ApplicationBuilder = object
+    telegram_ext.CommandHandler = object
+    telegram_ext.CallbackQueryHandler = object
+    telegram_ext.InlineQueryHandler = object
+    telegram_ext.MessageHandler = object
+    telegram_ext.filters = types.SimpleNamespace()
+    telegram_ext.BaseUpdateProcessor = BaseUpdateProcessor
+    telegram_ext.BaseRateLimiter = BaseRateLimiter
+    telegram_ext.ContextTypes = types.SimpleNamespace(DEFAULT_TYPE=object)
+
+    telegram_error = types.ModuleType('telegram.error')
+    for cls in (TelegramError, NetworkError, BadRequest, TimedOut, Forbidden, RetryAfter):
+        setattr(telegram_error, cls.__name__, cls)
+    telegram.error = telegram_error
+
+    telegram_request = types.ModuleType('telegram.request')
+    telegram_request.HTTPXRequest = HTTPXRequest
+
+    sys.modules.setdefault('telegram', telegram)
+    sys.modules.setdefault('telegram.ext', telegram_ext)
+    sys.modules.setdefault('telegram.error', telegram_error)
+    sys.modules.setdefault('telegram.request', telegram_request)
@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import analytics
+
+
+def test_events_are_buffered_and_appended_off_the_loop(tmp_path):
+    path = tmp_path / "events.jsonl"
+    log = analytics.EventLog(str(path), capacity=3)
+    for uid in range(4):
+        log.emit(analytics.GAME, uid, "ru", game="pubg")
+    assert log.stats() == {"buffered": 3, "written": 0, "dropped": 1}
+
+    assert asyncio.run(log.flush()) == 3
+    log.emit(analytics.DURATION, 3, "ru", game="pubg", days="30")
+    asyncio.run(log.flush())
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [r["user"] for r in records] == [1, 2, 3, 3]
+    assert records[-1] == {**records[-1], "event": "duration", "lang": "ru", "game": "pubg", "days": "30"}
+
+
+def test_disabled_log_keeps_nothing():
+    log = analytics.EventLog(None)
+    log.emit(analytics.FAQ, 1, "en", faq="7")
+    assert log.stats()["buffered"] == 0
+
+
+def test_funnel_report_streams_records_into_conversion_rates():
+    def line(event, user, lang, **fields):
+        return json.dumps({"ts": 0, "event": event, "user": user, "lang": lang, **fields})
+
+    lines = [
+        line("language", 1, "ru"), line("language", 2, "en"), line("language", 3, "ru"),
+        line("game", 1, "ru", game="pubg"), line("game", 2, "en", game="pubg"), line("game", 3, "ru", game="tarkov"),
+        line("game", 1, "ru", game="pubg"),
+        line("duration", 1, "ru", game="pubg", days="30"),
+        line("guide", 2, "en", game="pubg"),
+        line("faq", 3, "ru", faq="7"),
+        '{"ts": 0, "event": "dura',
+    ]
+    funnel = analytics.Funnel()
+    funnel.read(iter(lines))
+    report = funnel.report()
+    assert "pubg                        2               1       50.0%" in report
+    assert "pubg                 30           1          50.0%" in report
+    assert "ru                      2           2               1       50.0%" in report
+    assert "Guides opened: pubg 1" in report and "FAQ opened: #7 1" in report
+    assert funnel.skipped == 1
@@ -0,0 +1,61 @@
+import asyncio
+import types
+
+import backlog
+
+
+def make_update(update_id, uid=None, data=None, text=None, inline=None):
+    user = types.SimpleNamespace(id=uid) if uid is not None else None
+    answered = []
+
+    async def answer():
+        answered.append(update_id)
+
+    query = types.SimpleNamespace(data=data, answer=answer, answered=answered) if data else None
+    message = types.SimpleNamespace(text=text) if text is not None else None
+    return types.SimpleNamespace(update_id=update_id, effective_user=user, callback_query=query,
+                                 message=message, inline_query=inline)
+
+
+def test_collapse_keeps_latest_navigation_per_user():
+    updates = [
+        make_update(1, uid=1, text="/start"),
+        make_update(2, uid=1, data="1:games"),
+        make_update(3, uid=2, data="1:faqs"),
+        make_update(4, uid=1, data="1:game:pubg"),
+        make_update(5, uid=2, text="/broadcast status_updated"),
+        make_update(6, uid=3, inline="pubg"),
+        make_update(7),
+        make_update(8, uid=2, text="как включить спуфер"),
+    ]
+    keep, stale, dropped = backlog.collapse(updates)
+    assert [u.update_id for u in keep] == [4, 5, 7, 8]
+    assert [q.data for q in stale] == ["1:games", "1:faqs"]
+    assert dropped == 2
+
+
+class FakeBot:
+    def __init__(self, pending):
+        self.pending = pending
+        self.offsets = []
+
+    async def get_updates(self, offset=None, limit=100, timeout=0):
+        self.offsets.append(offset)
+        if offset is not None:
+            self.pending = [u for u in self.pending if u.update_id >= offset]
+        return self.pending[:limit]
+
+
+def test_drain_answers_stale_buttons_queues_the_rest_and_confirms(monkeypatch):
+    monkeypatch.setattr(backlog, "FETCH_LIMIT", 2)
+    updates = [make_update(i, uid=1, data=f"1:faq:{i}") for i in range(1, 6)]
+    bot = FakeBot(updates)
+    app = types.SimpleNamespace(bot=bot, update_queue=asyncio.Queue())
+
+    asyncio.run(backlog.drain(app))
+
+    assert app.update_queue.qsize() == 1
+    assert app.update_queue.get_nowait().update_id == 5
+    assert [u.callback_query.answered for u in updates[:4]] == [[1], [2], [3], [4]]
+    assert bot.offsets == [None, 3, 5, 6]
+    assert bot.pending == []
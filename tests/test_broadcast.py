@@ -0,0 +1,103 @@
+import asyncio
+import types
+
+import pytest
+from telegram.error import BadRequest, Forbidden
+
+import broadcast
+import storage
+
+
+class FakeBot:
+    def __init__(self, blocked=(), missing=()):
+        self.sent = []
+        self.blocked = set(blocked)
+        self.missing = set(missing)
+
+    async def send_message(self, chat_id, text):
+        if chat_id in self.blocked:
+            raise Forbidden("Forbidden: bot was blocked by the user")
+        if chat_id in self.missing:
+            raise BadRequest("Chat not found")
+        self.sent.append((chat_id, text))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = storage.SQLiteStateStore(str(tmp_path / "state.sqlite3"))
+    monkeypatch.setattr(storage, "_store", store)
+    for uid, lang in [(1, "ru"), (2, "en"), (3, "ja"), (4, "ru"), (5, "tr")]:
+        store.set("lang", uid, lang)
+    yield store
+    store.close()
+
+
+def test_broadcast_is_localized_and_prunes_unreachable_users(store):
+    bot = FakeBot(blocked={2}, missing={5})
+    job = broadcast.Broadcast(key="status_updated", text=None, admin_chat=99)
+    asyncio.run(broadcast.run(bot, job, rate=1000, batch_size=2))
+
+    texts = dict(bot.sent)
+    assert texts[1] == texts[4] == "✅ Чит обновлён и снова работает."
+    assert texts[3].startswith("✅ チート")
+    assert texts[99] == "Broadcast finished: 3 sent, 2 removed, 0 failed"
+    assert store.get("lang", 2) is None and store.get("lang", 5) is None
+    saved = broadcast.load()
+    assert saved.done and saved.last_user == 5
+
+
+def test_interrupted_broadcast_resumes_after_checkpoint(store):
+    bot = FakeBot()
+    # A previous run checkpointed the batch ending at user 3 before it crashed.
+    job = broadcast.Broadcast(key=None, text="Maintenance at 22:00", admin_chat=99, last_user=3, sent=3)
+    asyncio.run(broadcast.save(job))
+    asyncio.run(broadcast.run(bot, broadcast.load(), rate=1000, batch_size=2))
+    assert bot.sent == [(4, "Maintenance at 22:00"), (5, "Maintenance at 22:00"),
+                        (99, "Broadcast finished: 5 sent, 0 removed, 0 failed")]
+
+
+def test_command_is_admin_only_and_starts_a_job(store, monkeypatch):
+    monkeypatch.setattr(broadcast, "ADMIN_IDS", frozenset({99}))
+    monkeypatch.setattr(broadcast, "_task", None)
+    replies = []
+
+    async def reply_text(text):
+        replies.append(text)
+
+    def make_update(uid, text):
+        message = types.SimpleNamespace(text=text, chat_id=uid, reply_text=reply_text)
+        return types.SimpleNamespace(effective_user=types.SimpleNamespace(id=uid), message=message)
+
+    async def scenario():
+        bot = FakeBot()
+        context = types.SimpleNamespace(application=types.SimpleNamespace(
+            bot=bot, create_task=lambda coro: asyncio.get_running_loop().create_task(coro)))
+        await broadcast.broadcast_command(make_update(1, "/broadcast status_updated"), context)
+        await broadcast.broadcast_command(make_update(99, "/broadcast status_maintenance"), context)
+        await broadcast.broadcast_command(make_update(99, "/broadcast again"), context)
+        await broadcast._task
+        await broadcast.broadcast_command(make_update(99, "/broadcast"), context)
+        return bot
+
+    bot = asyncio.run(scenario())
+    assert replies[0] == "Broadcast started for 5 users."
+    assert replies[1].startswith("A broadcast is already running.")
+    assert replies[2] == "Broadcast finished: 5 sent, 0 removed, 0 failed"
+    assert (1, "⚠️ Чит временно недоступен — идёт обновление. Мы сообщим, когда он снова заработает.") in bot.sent
+
+
+def test_only_one_worker_claims_a_broadcast_whose_process_died(store, tmp_path, monkeypatch):
+    dead = 2**22 + 1
+    job = broadcast.Broadcast(key=None, text="Maintenance", admin_chat=99, last_user=2, owner=dead)
+    asyncio.run(broadcast.save(job))
+    monkeypatch.setattr(broadcast, "_owner_alive", lambda job: job.owner != dead)
+    other_worker = storage.SQLiteStateStore(str(tmp_path / "state.sqlite3"))
+    try:
+        seen_by_other = other_worker.fetch(broadcast.NAMESPACE, broadcast.RECORD_ID)
+        claimed = broadcast.claim()
+        assert claimed.last_user == 2 and claimed.owner != dead
+        # The other worker read the record before the claim; its compare-and-set loses.
+        assert not other_worker.compare_and_set(broadcast.NAMESPACE, broadcast.RECORD_ID, seen_by_other, "{}")
+        assert broadcast.claim() is None
+    finally:
+        other_worker.close()
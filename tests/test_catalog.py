@@ -0,0 +1,187 @@
+import json
+import os
+
+import pytest
+
+import catalog
+import keyboards
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    with open(catalog.current().path, encoding="utf-8") as f:
+        data = json.load(f)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(catalog, "_current", catalog.load(path))
+    monkeypatch.setattr(catalog, "_seen_mtime", catalog.current().mtime)
+    yield path, data
+    monkeypatch.undo()
+    # Rebuild every derived cache (keyboards, search indexes) from the original catalog.
+    catalog.install(catalog.current())
+
+
+def write(path, data, bump=1):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + bump))
+
+
+def test_catalog_is_read_only():
+    with pytest.raises(TypeError):
+        catalog.games["pubg"]["links"]["1"] = "https://example.com"
+
+
+def test_reload_swaps_catalog_and_rebuilds_keyboards(catalog_file):
+    path, data = catalog_file
+    data["games"]["pubg"]["durations"].insert(1, "3")
+    data["games"]["pubg"]["links"]["3"] = "https://example.com/pubg-3"
+    old_version = catalog.current().version
+    write(path, data)
+
+    assert catalog.reload_if_changed() is True
+    assert catalog.games["pubg"]["links"]["3"] == "https://example.com/pubg-3"
+    assert catalog.current().version != old_version
+    markup = keyboards.get_keyboard("game", "en", "pubg")
+    assert markup.inline_keyboard[1][0].text == "3 days"
+
+
+def test_invalid_file_keeps_serving_previous_catalog(catalog_file):
+    path, data = catalog_file
+    before = catalog.current()
+    data["games"]["pubg"]["durations"].append("90")
+    write(path, data)
+    assert catalog.reload_if_changed() is False
+    assert catalog.current() is before
+
+    path.write_text("{ not json", encoding="utf-8")
+    assert catalog.reload(path) is False
+    assert catalog.current() is before
+
+
+@pytest.mark.parametrize("source", ["{url!r:>5}", "{url:>5}", "{url!s}", "{0}", "{url.host}", "{url[0]}"])
+def test_templates_accept_only_plain_placeholders(source):
+    with pytest.raises(ValueError):
+        catalog.Template(source)
+    assert catalog.Template("{url} {{literal}}").render(url="x") == "x {literal}"
+
+
+def test_template_with_format_spec_is_rejected_by_validate(catalog_file):
+    path, data = catalog_file
+    data["translations"]["loader_password"] = {lang: "{url!r:>5}" for lang in data["languages"]}
+    with pytest.raises(catalog.CatalogError, match="unsupported placeholder"):
+        catalog.validate(data)
+
+
+@pytest.mark.parametrize("key", ["faq_no_match", "faq_suggestions"])
+def test_catalog_without_a_key_the_handlers_read_is_rejected(catalog_file, key):
+    path, data = catalog_file
+    before = catalog.current()
+    del data["translations"][key]
+    write(path, data)
+    assert catalog.reload_if_changed() is False
+    assert catalog.current() is before
+
+
+def test_every_text_indexed_by_the_code_is_required():
+    import re
+    from pathlib import Path
+
+    root = Path(catalog.__file__).resolve().parent
+    used = {
+        key
+        for source in root.glob("*.py")
+        for key in re.findall(r'(?:texts\([^)]*\)|table)\["(\w+)"\]', source.read_text(encoding="utf-8"))
+    }
+    assert used and used <= set(catalog.REQUIRED_TRANSLATIONS)
+
+
+def test_templates_without_placeholders_still_render(catalog_file):
+    path, data = catalog_file
+    for key in catalog.TEMPLATE_FIELDS:
+        data["translations"][key] = {lang: f"plain {key}" for lang in data["languages"]}
+    write(path, data)
+    assert catalog.reload_if_changed() is True
+    assert catalog.rendered("loader", "ru") == "plain loader_password"
+    assert catalog.rendered("offer", "pubg", "30", "en") == "plain subscription_result"
+    status_changed = catalog.current().templates["en"]["status_changed"]
+    assert status_changed.render(game="PUBG", status="ok") == "plain status_changed"
+
+
+def test_language_dropped_by_a_reload_falls_back_to_english(catalog_file):
+    import main
+    from language import user_languages
+
+    path, data = catalog_file
+    del data["languages"]["tr"]
+    write(path, data)
+    assert catalog.reload_if_changed() is True
+    user_languages[5101] = "tr"
+    assert main.get_lang(5101) == "en"
+    assert keyboards.get_keyboard("faq", "tr") is keyboards.get_keyboard("faq", "en")
+    assert not [key for key in keyboards._registry if key[1] == "tr"]
+
+
+@pytest.mark.parametrize("breakage", ["latin1", "non_string", "positional", "unknown_field"])
+def test_every_malformed_file_is_rejected_not_raised(catalog_file, breakage):
+    path, data = catalog_file
+    before = catalog.current()
+    if breakage == "latin1":
+        path.write_bytes(json.dumps(data).encode().replace(b"\"en\"", b"\"\xe9n\"", 1))
+    else:
+        if breakage == "non_string":
+            data["translations"]["status_working"]["ru"] = 5
+        elif breakage == "positional":
+            data["translations"]["loader_password"] = {lang: "{}" for lang in data["languages"]}
+        else:
+            data["translations"]["subscription_result"]["en"] += " {price}"
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    with pytest.raises(catalog.CatalogError):
+        catalog.load(path)
+    assert catalog.reload(path) is False
+    assert catalog.current() is before
+
+
+def test_validation_reports_missing_language():
+    with open(catalog.current().path, encoding="utf-8") as f:
+        data = json.load(f)
+    del data["faq"]["3"]["title"]["ja"]
+    with pytest.raises(catalog.CatalogError, match="faq.3.title is missing languages: ja"):
+        catalog.compile_catalog(data)
+
+
+def test_texts_fall_back_to_english_for_unknown_language():
+    assert catalog.texts("de") is catalog.texts("en")
+    assert catalog.texts("ru")["back"] == "🔙 Назад в меню"
+
+
+def test_offers_are_prerendered_for_every_language():
+    current = catalog.current()
+    for lang in current.languages:
+        for gid, game in current.games.items():
+            for days in game["durations"]:
+                text = catalog.rendered("offer", gid, days, lang)
+                assert game["links"][days] in text
+                assert game["title"] in text
+    assert catalog.LOADER_URL in catalog.rendered("loader", "ko")
+
+
+def test_template_placeholders_must_match_english():
+    with open(catalog.current().path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["translations"]["loader_password"]["tr"] = "Loader: {link}"
+    with pytest.raises(catalog.CatalogError, match="loader_password.tr uses different placeholders"):
+        catalog.compile_catalog(data)
+
+
+def test_missing_required_key_fails_fast_and_optional_keys_fall_back():
+    with open(catalog.current().path, encoding="utf-8") as f:
+        data = json.load(f)
+    del data["translations"]["status_coming_soon"]["ja"]
+    compiled = catalog.compile_catalog(data)
+    assert compiled.tables["ja"]["status_coming_soon"] == data["translations"]["status_coming_soon"]["en"]
+    assert compiled.coverage["ja"] < 1
+
+    del data["translations"]["menu_title"]
+    with pytest.raises(catalog.CatalogError, match="missing keys: menu_title"):
+        catalog.compile_catalog(data)
@@ -0,0 +1,53 @@
+import asyncio
+import types
+
+from concurrency import PerUserUpdateProcessor
+
+
+def make_update(user_id):
+    return types.SimpleNamespace(effective_user=types.SimpleNamespace(id=user_id))
+
+
+def test_same_user_runs_in_order_other_users_overlap():
+    events = []
+
+    async def handle(name, delay):
+        events.append(("start", name))
+        await asyncio.sleep(delay)
+        events.append(("end", name))
+
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_workers=4)
+        await asyncio.gather(
+            processor.process_update(make_update(1), handle("a1", 0.02)),
+            processor.process_update(make_update(1), handle("a2", 0)),
+            processor.process_update(make_update(2), handle("b1", 0)),
+        )
+        return processor
+
+    processor = asyncio.run(scenario())
+    assert events.index(("end", "a1")) < events.index(("start", "a2"))
+    assert events.index(("end", "b1")) < events.index(("end", "a1"))
+    stats = processor.stats()
+    assert stats["processed"] == 3
+    assert stats["waiting"] == 0 and stats["running"] == 0
+    assert stats["queued_users"] == 0
+    assert stats["wait_seconds_max"] > 0
+
+
+def test_worker_limit_is_respected():
+    active = []
+    peak = []
+
+    async def handle():
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.001)
+        active.pop()
+
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_workers=2)
+        await asyncio.gather(*(processor.process_update(make_update(i), handle()) for i in range(10)))
+
+    asyncio.run(scenario())
+    assert max(peak) == 2
@@ -0,0 +1,68 @@
+import asyncio
+import types
+
+import floodguard
+from concurrency import PerUserUpdateProcessor
+
+
+def press(uid, update_id=0):
+    return types.SimpleNamespace(
+        update_id=update_id,
+        effective_user=types.SimpleNamespace(id=uid),
+        callback_query=object(),
+        inline_query=None,
+        message=None,
+    )
+
+
+def command(uid, text):
+    return types.SimpleNamespace(
+        update_id=0,
+        effective_user=types.SimpleNamespace(id=uid),
+        callback_query=None,
+        inline_query=None,
+        message=types.SimpleNamespace(text=text),
+    )
+
+
+def test_limits_are_per_user_and_action_over_a_sliding_window():
+    guard = floodguard.FloodGuard(floodguard.parse_limits("start=2/60,callback=3/10"))
+    assert [guard.admit(command(1, "/start"), now=0) for _ in range(3)] == [True, True, False]
+    assert guard.admit(command(2, "/start@desync_bot"), now=0)
+    assert guard.admit(command(1, "/broadcast"), now=0)  # no limit for other commands
+    assert [guard.admit(press(1), now=5) for _ in range(4)] == [True, True, True, False]
+    # Halfway into the next window half of the previous count still applies.
+    assert [guard.admit(press(1), now=15) for _ in range(3)] == [True, True, False]
+    assert guard.offenders.most_common(1) == [(1, 3)]
+
+
+def test_idle_counters_are_evicted():
+    guard = floodguard.FloodGuard(floodguard.parse_limits("callback=3/10"))
+    for uid in range(5):
+        guard.admit(press(uid), now=0)
+    for step in range(3):
+        guard.admit(press(100), now=30 + step)
+    assert guard.stats()["tracked"] == 1
+
+
+def test_dropped_and_superseded_updates_never_run():
+    ran = []
+
+    async def handle(name, delay=0):
+        await asyncio.sleep(delay)
+        ran.append(name)
+
+    async def scenario():
+        guard = floodguard.FloodGuard(floodguard.parse_limits("callback=3/60"))
+        processor = PerUserUpdateProcessor(max_workers=4, guard=guard)
+        await asyncio.gather(
+            processor.process_update(press(1, 1), handle("first", 0.01)),
+            processor.process_update(press(1, 2), handle("superseded")),
+            processor.process_update(press(1, 3), handle("latest")),
+            processor.process_update(press(1, 4), handle("over limit")),
+        )
+        return processor
+
+    processor = asyncio.run(scenario())
+    assert ran == ["first", "latest"]
+    assert processor.stats()["coalesced"] == 1
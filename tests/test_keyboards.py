@@ -0,0 +1,40 @@
+import keyboards
+
+
+def test_keyboard_is_shared_between_calls():
+    keyboards.invalidate()
+    assert keyboards.get_keyboard("main", "ru") is keyboards.get_keyboard("main", "ru")
+    assert keyboards.get_keyboard("main", "ru") is not keyboards.get_keyboard("main", "en")
+
+
+def test_game_keyboard_lists_durations():
+    markup = keyboards.get_keyboard("game", "en", "spoofer")
+    data = [row[0].callback_data for row in markup.inline_keyboard]
+    version = keyboards.catalog_version()
+    assert data == [f"1:sub:spoofer:7:{version}", f"1:sub:spoofer:30:{version}", f"1:guide:spoofer:{version}", "1:main"]
+    assert all(len(d.encode()) <= 64 for d in data)
+
+
+def test_faq_keyboard_uses_language():
+    markup = keyboards.get_keyboard("faq", "ru")
+    assert markup.inline_keyboard[0][0].text == "Что делать после покупки?"
+    assert len(markup.inline_keyboard) == 17
+
+
+def test_build_all_and_invalidate():
+    count = keyboards.build_all()
+    assert count == len(keyboards.catalog.current().languages) * (4 + len(keyboards.games)) + 1
+    keyboards.invalidate()
+    assert not keyboards._registry
+
+
+def test_keyboard_benchmark_cases_still_run():
+    import importlib.util
+    from pathlib import Path
+
+    path = Path(__file__).resolve().parents[1] / "benchmarks" / "bench_keyboards.py"
+    spec = importlib.util.spec_from_file_location("bench_keyboards", path)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    for rebuild, registry in bench.CASES.values():
+        assert len(rebuild("ru").inline_keyboard) == len(registry("ru").inline_keyboard)
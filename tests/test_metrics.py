@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from telegram.error import TimedOut
+
+import metrics
+from ratelimit import FloodRateLimiter
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("handler",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "faq")
+    registry.stats("queue", "Queue state", lambda: {"size": 2})
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{handler="faq",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{handler="faq",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{handler="faq",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{handler="faq"} 4' in lines
+    assert "# TYPE queue_size gauge" in lines and "queue_size 2" in lines
+
+
+def test_timed_handler_records_latency_and_errors():
+    async def failing(update, context, gid):
+        raise RuntimeError(gid)
+
+    wrapped = metrics.timed("test_game", failing, lambda update: "ru")
+    before = metrics.handler_seconds.count("test_game", "ru")
+    with pytest.raises(RuntimeError):
+        asyncio.run(wrapped(None, None, "pubg"))
+    assert metrics.handler_seconds.count("test_game", "ru") == before + 1
+    assert metrics.handler_errors.values[("test_game", "ru")] >= 1
+
+
+def test_instrumented_limiter_times_every_attempt():
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TimedOut()
+        return True
+
+    limiter = metrics.InstrumentedRateLimiter(FloodRateLimiter(1000, 1000, max_retries=1))
+    limiter.inner._backoff = lambda attempt: 0
+    before = metrics.api_seconds.count("testMethod")
+    result = asyncio.run(limiter.process_request(call, (), {}, "testMethod", {"chat_id": 1}, None))
+    assert result is True
+    assert metrics.api_seconds.count("testMethod") == before + 2
+    assert metrics.api_errors.values[("testMethod", "TimedOut")] >= 1
+    assert metrics.api_throttle_seconds.count("testMethod") >= 1
+
+
+def test_timed_queue_and_endpoint():
+    async def scenario():
+        queue = metrics.TimedQueue()
+        before = metrics.update_queue_seconds.count()
+        await queue.put("update")
+        assert await queue.get() == "update"
+        assert metrics.update_queue_seconds.count() == before + 1
+
+        server = await metrics.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        await metrics.stop()
+        return response.decode()
+
+    response = asyncio.run(scenario())
+    assert response.startswith("HTTP/1.1 200")
+    assert "bot_update_queue_seconds_count" in response
@@ -0,0 +1,108 @@
+import asyncio
+import types
+
+from telegram.error import BadRequest
+
+import navigation
+from router import encode
+
+
+class FakeQuery:
+    def __init__(self, message_id=10, error=None, data=None, delay=0.0):
+        self.message = types.SimpleNamespace(chat_id=1, message_id=message_id, reply_text=self.reply_text)
+        self.from_user = types.SimpleNamespace(id=1)
+        self.data = data
+        self.edits = []
+        self.replies = []
+        self.answers = 0
+        self.error = error
+        self.delay = delay
+        self.log = []
+
+    async def answer(self, *args, **kwargs):
+        self.log.append("answer start")
+        await asyncio.sleep(self.delay)
+        self.answers += 1
+        self.log.append("answer done")
+
+    async def edit_message_text(self, text, **kwargs):
+        self.log.append("edit start")
+        await asyncio.sleep(self.delay)
+        self.edits.append(text)
+        if self.error:
+            raise self.error
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+        return types.SimpleNamespace(chat_id=1, message_id=self.message.message_id + 1)
+
+
+def test_repeated_render_is_skipped():
+    query = FakeQuery(message_id=101)
+
+    async def scenario():
+        assert await navigation.edit(query, "menu", reply_markup=None) is True
+        assert await navigation.edit(query, "menu", reply_markup=None) is False
+        assert await navigation.edit(query, "faq", reply_markup=None) is True
+
+    asyncio.run(scenario())
+    assert query.edits == ["menu", "faq"]
+
+
+def test_not_modified_error_is_swallowed():
+    query = FakeQuery(message_id=102, error=BadRequest("Message is not modified: specified new message content"))
+    assert asyncio.run(navigation.edit(query, "menu")) is True
+
+
+def press(query, action, *args):
+    import main
+
+    query.data = encode(action, *args)
+    update = types.SimpleNamespace(callback_query=query, effective_user=query.from_user)
+    asyncio.run(main.callbacks.dispatch(update, None))
+
+
+def test_back_to_main_edits_in_place_once():
+    import main
+
+    query = FakeQuery(message_id=103)
+    press(query, "main")
+    press(query, "main")
+    assert query.answers == 2
+    assert query.edits == [main.translations["menu_title"]["en"]]
+
+
+def test_subscription_needs_no_server_state():
+    import main
+
+    version = main.catalog_version()
+    query = FakeQuery(message_id=104)
+    press(query, "sub", "tarkov", "15", version)
+    assert main.games["tarkov"]["links"]["15"] in query.edits[-1]
+
+    press(query, "sub", "tarkov", "15", "stale")
+    assert query.edits[-1] == main.translations["choose_subscription"]["en"]
+
+
+def test_answer_and_edit_are_in_flight_together():
+    query = FakeQuery(message_id=105, delay=0.01)
+    asyncio.run(navigation.respond(query, navigation.Render("menu")))
+    assert query.log[:2] == ["answer start", "edit start"]
+    assert query.answers == 1 and query.edits == ["menu"]
+
+
+def test_uneditable_message_falls_back_to_a_new_one():
+    query = FakeQuery(message_id=106, error=BadRequest("Message can't be edited"))
+    asyncio.run(navigation.respond(query, navigation.Render("menu", parse_mode="Markdown")))
+    assert query.answers == 1 and query.replies == ["menu"]
+
+
+def test_expired_query_still_edits():
+    query = FakeQuery(message_id=107)
+
+    async def expired():
+        raise BadRequest("Query is too old and response timeout expired or query id is invalid")
+
+    query.answer = expired
+    asyncio.run(navigation.respond(query, navigation.Render("menu")))
+    assert query.edits == ["menu"]
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+from telegram.error import BadRequest, RetryAfter, TimedOut
+
+from ratelimit import FloodRateLimiter, TokenBucket
+
+
+class FlakyCall:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return True
+
+
+def process(limiter, call, endpoint="editMessageText", chat_id=1):
+    return asyncio.run(limiter.process_request(call, (), {}, endpoint, {"chat_id": chat_id}, None))
+
+
+def test_token_bucket_paces_after_burst():
+    async def scenario():
+        bucket = TokenBucket(rate=100, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) >= 0.015
+
+
+def test_retry_after_is_honoured(monkeypatch):
+    monkeypatch.setattr("ratelimit.random.uniform", lambda a, b: 0)
+    limiter = FloodRateLimiter()
+    call = FlakyCall(RetryAfter(0.02))
+    start = time.monotonic()
+    assert process(limiter, call) is True
+    assert time.monotonic() - start >= 0.02
+    assert call.calls == 2
+    assert limiter.stats()["retry_after_events"] == 1
+
+
+def test_network_errors_are_retried_but_bad_requests_are_not(monkeypatch):
+    monkeypatch.setattr(FloodRateLimiter, "_backoff", lambda self, attempt: 0)
+    limiter = FloodRateLimiter(chat_rate=1000, chat_burst=100, max_retries=2)
+    assert process(limiter, FlakyCall(TimedOut(), TimedOut())) is True
+    with pytest.raises(TimedOut):
+        process(limiter, FlakyCall(TimedOut(), TimedOut(), TimedOut()))
+    with pytest.raises(TimedOut):
+        process(limiter, FlakyCall(TimedOut()), endpoint="sendMessage")
+    bad = FlakyCall(BadRequest("Message is not modified"))
+    with pytest.raises(BadRequest):
+        process(limiter, bad)
+    assert bad.calls == 1
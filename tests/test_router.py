@@ -0,0 +1,88 @@
+import asyncio
+import types
+
+import pytest
+
+import router
+
+
+def test_encode_decode_roundtrip():
+    data = router.encode("game", "pubg")
+    assert data == "1:game:pubg"
+    assert router.decode(data) == ("game", ["pubg"])
+
+
+@pytest.mark.parametrize("data", [None, "", "faq_3", "back_to_main", "0:game:pubg", "1:"])
+def test_decode_rejects_legacy_and_foreign_payloads(data):
+    assert router.decode(data) is None
+
+
+def test_encode_enforces_telegram_limit():
+    with pytest.raises(ValueError):
+        router.encode("faq", "x" * 64)
+
+
+def test_dispatch_routes_by_action_and_falls_back():
+    calls = []
+
+    async def handler(update, context, *args):
+        calls.append(("handler", args))
+
+    async def fallback(update, context):
+        calls.append(("fallback", update.callback_query.data))
+
+    callbacks = router.CallbackRouter(fallback)
+    callbacks.route("game", handler, 1)
+
+    def dispatch(data):
+        update = types.SimpleNamespace(callback_query=types.SimpleNamespace(data=data))
+        asyncio.run(callbacks.dispatch(update, None))
+
+    dispatch("1:game:pubg")
+    dispatch("1:game")
+    dispatch("1:unknown")
+    dispatch("choose_pubg")
+    assert calls == [
+        ("handler", ("pubg",)),
+        ("fallback", "1:game"),
+        ("fallback", "1:unknown"),
+        ("fallback", "choose_pubg"),
+    ]
+
+
+def test_every_keyboard_button_has_a_route():
+    import keyboards
+    import main
+
+    keyboards.build_all()
+    for markup in keyboards._registry.values():
+        for row in markup.inline_keyboard:
+            for button in row:
+                if button.callback_data:
+                    action, args = router.decode(button.callback_data)
+                    assert main.callbacks._routes[action][1] == len(args)
+
+
+def test_wrapped_route_includes_the_response():
+    log = []
+
+    async def handler(update, context):
+        log.append("handler")
+        return "screen"
+
+    async def respond(query, result):
+        log.append(("respond", result))
+
+    def decorator(action, route):
+        async def timed(update, context, *args):
+            log.append(("start", action))
+            await route(update, context, *args)
+            log.append(("end", action))
+        return timed
+
+    callbacks = router.CallbackRouter(handler, respond=respond)
+    callbacks.route("main", handler)
+    callbacks.wrap(decorator)
+    update = types.SimpleNamespace(callback_query=types.SimpleNamespace(data="1:main"))
+    asyncio.run(callbacks.dispatch(update, None))
+    assert log == [("start", "main"), "handler", ("respond", "screen"), ("end", "main")]
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+import catalog
+import search
+
+
+def ids(query, lang="en"):
+    return [result.id for result in search.search(query, lang)]
+
+
+def test_offers_match_title_and_duration_in_any_language():
+    assert ids("pubg 30") == ["offer:pubg:30"]
+    assert ids("30 дней") == ["offer:pubg:30", "offer:tarkov:30", "offer:spoofer:30"]
+    assert ids("tark") == ["offer:tarkov:1", "offer:tarkov:15", "offer:tarkov:30"]
+    assert ids("pubg 90") == []
+
+
+def test_results_are_localized_and_faq_titles_match_inside_cjk_phrases():
+    [result] = search.search("pubg 7", "ru")
+    assert result.input_message_content.message_text == catalog.rendered("offer", "pubg", "7", "ru")
+    assert result.title == "PUBG — 7 дней"
+    assert ids("покуп") == ["faq:1"]
+    assert "faq:1" in ids("购买后")
+    assert "faq:1" in ids("怎么办")
+    assert search.search("покуп", "xx")[0].title == "What to do after purchase?"
+
+
+def test_empty_query_lists_offers_first_within_telegram_limit():
+    results = ids("")
+    assert results[0] == "offer:pubg:1"
+    assert len(results) <= search.MAX_RESULTS
+
+
+def test_index_is_built_from_the_given_catalog():
+    with open(catalog.current().path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["games"]["pubg"]["durations"].append("90")
+    data["games"]["pubg"]["links"]["90"] = "https://example.com/pubg-90"
+    index = search.build_index(catalog.compile_catalog(data))
+    [document] = index.search("pubg 90")
+    assert document.results["en"].title == "PUBG — 90 days"
+
+
+def test_inline_handler_answers_with_cache_time():
+    answers = []
+
+    async def answer(results, **kwargs):
+        answers.append((results, kwargs))
+
+    query = types.SimpleNamespace(query="hwid", from_user=types.SimpleNamespace(id=123), answer=answer)
+    asyncio.run(search.inline_query(types.SimpleNamespace(inline_query=query), None))
+    [(results, kwargs)] = answers
+    assert [r.id for r in results] == ["offer:spoofer:7", "offer:spoofer:30"]
+    assert kwargs == {"cache_time": search.INLINE_CACHE_TIME, "is_personal": True}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("что делать после покупки", "1"),
+    ("у меня не запускается чит", "6"),
+    ("got banned in pubg", "7"),
+    ("есть промокод?", "11"),
+    ("如何启用spoofer", "16"),
+    ("虚拟机", "8"),
+])
+def test_free_text_matches_faq_in_any_language(text, expected):
+    assert search.match_faq(text)[0] == expected
+
+
+def test_unrelated_text_matches_nothing():
+    assert search.match_faq("привет") == []
+    assert search.match_faq("ok") == []
+
+
+def test_faq_matcher_uses_keywords_of_the_given_entries():
+    entries = {"1": {"title": {"en": "Payment questions"}, "link": "x", "keywords": ["paypal"]}}
+    matcher = search.FaqMatcher(entries)
+    assert matcher.match("can I use PayPal?") == ["1"]
+    assert matcher.match("refund") == []
+
+
+def test_faq_message_replies_with_links_in_user_language(monkeypatch):
+    sent = []
+
+    async def reply_text(text, **kwargs):
+        sent.append((text, kwargs))
+
+    monkeypatch.setattr(search.user_languages, "get", lambda uid, default=None: "ru")
+    message = types.SimpleNamespace(text="как включить спуфер", from_user=types.SimpleNamespace(id=1),
+                                    reply_text=reply_text)
+    asyncio.run(search.faq_message(types.SimpleNamespace(message=message), None))
+    [(text, kwargs)] = sent
+    assert text.startswith(catalog.texts("ru")["faq_suggestions"])
+    assert catalog.faq["16"]["link"] in text and "Как включить спуфер?" in text
@@ -0,0 +1,71 @@
+import asyncio
+import types
+
+import navigation
+import sessions
+
+
+def test_touch_reschedules_and_keys_expire_after_the_timeout():
+    wheel = sessions.TimerWheel(timeout=30, tick=10)
+    wheel.touch(1, "a")
+    wheel.touch(2, "b")
+    assert [wheel.advance() for _ in range(3)] == [{}, {}, {}]
+    wheel.touch(1, "c")
+    assert wheel.advance() == {2: "b"}
+    assert [wheel.advance() for _ in range(2)] == [{}, {}]
+    assert wheel.advance() == {1: "c"}
+    assert len(wheel) == 0
+
+
+def test_capacity_evicts_the_session_closest_to_expiry():
+    wheel = sessions.TimerWheel(timeout=30, tick=10, capacity=2)
+    wheel.touch(1)
+    wheel.advance()
+    wheel.touch(2)
+    wheel.touch(3)
+    assert len(wheel) == 2 and wheel.evicted == 1
+    assert 1 not in wheel.where
+
+
+def test_expired_menu_is_edited_once(monkeypatch):
+    monkeypatch.setattr(sessions, "_wheel", None)
+    monkeypatch.setattr(navigation, "_subscribers", [])
+    edits = []
+
+    async def edit_message_text(text, chat_id, message_id, reply_markup=None):
+        edits.append((chat_id, message_id, text))
+
+    async def reply_text(text, reply_markup=None):
+        return types.SimpleNamespace(chat_id=7, message_id=70)
+
+    async def scenario():
+        sessions.start(timeout=10, tick=10, render=lambda chat_id: navigation.Render(f"bye {chat_id}"))
+        await navigation.send(types.SimpleNamespace(reply_text=reply_text), "menu")
+        tasks = []
+        context = types.SimpleNamespace(
+            bot=types.SimpleNamespace(edit_message_text=edit_message_text),
+            application=types.SimpleNamespace(create_task=lambda coro: tasks.append(asyncio.ensure_future(coro))),
+        )
+        for _ in range(4):
+            await sessions.tick(context)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert edits == [(7, 70, "bye 7")]
+    assert sessions.stats()["expired"] == 1
+
+
+def test_content_screen_ends_the_session(monkeypatch):
+    monkeypatch.setattr(sessions, "_wheel", None)
+    monkeypatch.setattr(navigation, "_subscribers", [])
+    sessions.start(timeout=10, tick=10, render=lambda chat_id: navigation.Render("bye"))
+    query = types.SimpleNamespace(message=types.SimpleNamespace(chat_id=8, message_id=80))
+
+    async def edit_message_text(text, **kwargs):
+        pass
+
+    query.edit_message_text = edit_message_text
+    asyncio.run(navigation.edit(query, "menu"))
+    assert sessions.stats()["active"] == 1
+    asyncio.run(navigation.edit(query, "📄 https://example.com/pay", menu=False))
+    assert sessions.stats()["active"] == 0
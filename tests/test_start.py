@@ -0,0 +1,58 @@
+import asyncio
+import types
+
+import main
+from language import user_languages
+
+
+def start(uid, language_code=None, args=()):
+    replies = []
+
+    async def reply_text(text, reply_markup=None, **kwargs):
+        replies.append((text, reply_markup, kwargs))
+        return types.SimpleNamespace(chat_id=uid, message_id=len(replies))
+
+    user = types.SimpleNamespace(id=uid, language_code=language_code)
+    update = types.SimpleNamespace(effective_user=user, message=types.SimpleNamespace(reply_text=reply_text))
+    asyncio.run(main.start_command(update, types.SimpleNamespace(args=list(args))))
+    assert len(replies) == 1
+    return replies[0]
+
+
+def test_supported_client_language_skips_the_picker():
+    text, markup, _ = start(5001, "ru")
+    assert user_languages[5001] == "ru"
+    assert (text, markup) == (main.main_menu("ru").text, main.build_main_menu_keyboard("ru"))
+
+    text, _, _ = start(5002, "zh-hans")
+    assert user_languages[5002] == "zh"
+
+
+def test_unknown_language_asks_and_a_chosen_one_wins():
+    text, markup, _ = start(5003, "xx")
+    assert user_languages.get(5003) is None
+    assert markup is main.ask_language()
+
+    user_languages[5004] = "tr"
+    text, _, _ = start(5004, "ru")
+    assert user_languages[5004] == "tr"
+    assert text == main.main_menu("tr").text
+
+
+def test_deep_links_open_the_target_screen():
+    text, _, options = start(5005, "en", ["pubg_30"])
+    assert text == main.rendered("offer", "pubg", "30", "en")
+    assert options == {"parse_mode": "Markdown", "disable_web_page_preview": True}
+
+    text, markup, _ = start(5006, "ru", ["tarkov"])
+    assert markup is main.get_keyboard("game", "ru", "tarkov")
+
+    text, _, _ = start(5007, None, ["faq_7"])
+    assert text == f"📄 {main.faq['7']['link']}"
+    assert user_languages.get(5007) is None
+
+
+def test_unknown_payload_falls_back_to_the_menu():
+    for payload in ("pubg_2", "faq_999", "ref42", "_30"):
+        text, _, _ = start(5008, "ko", [payload])
+        assert text == main.main_menu("ko").text
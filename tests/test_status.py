@@ -0,0 +1,86 @@
+import asyncio
+import json
+import types
+
+import httpx
+import pytest
+
+import catalog
+import status
+from httpserver import Response, start_server
+
+
+@pytest.fixture(autouse=True)
+def clean_snapshot(monkeypatch):
+    monkeypatch.setattr(status, "_snapshot", {})
+    monkeypatch.setattr(status, "_lines", {})
+    monkeypatch.setattr(status, "_validators", {})
+
+
+class StatusSource:
+    """Stub status page that honours If-None-Match."""
+
+    def __init__(self, document):
+        self.document = document
+        self.requests = []
+
+    async def __call__(self, request):
+        body = json.dumps(self.document).encode()
+        etag = f'"{hash(body)}"'
+        self.requests.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == etag:
+            return Response(304)
+        return Response(200, body, "application/json", {"ETag": etag})
+
+
+def test_conditional_polls_and_change_detection():
+    source = StatusSource({"pubg": "working", "tarkov": {"status": "updating"}, "rust": "unknown"})
+
+    async def scenario():
+        server = await start_server(source, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/status"
+        try:
+            async with httpx.AsyncClient() as client:
+                first = await status.refresh(client, url)
+                unchanged = await status.refresh(client, url)
+                source.document["pubg"] = "down"
+                changed = await status.refresh(client, url)
+        finally:
+            server.close()
+        return first, unchanged, changed
+
+    first, unchanged, changed = asyncio.run(scenario())
+    assert first == {} and unchanged == {}
+    assert changed == {"pubg": ("working", "down")}
+    assert source.requests[0] is None and source.requests[1] is not None
+    assert status.line("pubg", "ru") == catalog.texts("ru")["status_down"]
+    assert status.line("tarkov", "en") == catalog.texts("en")["status_updating"]
+    assert status.line("rust", "en") is None
+
+
+def test_unreachable_source_keeps_the_last_snapshot():
+    status.install({"pubg": "working"})
+
+    async def scenario():
+        async with httpx.AsyncClient() as client:
+            return await status.refresh(client, "http://127.0.0.1:9/status")
+
+    assert asyncio.run(scenario()) == {}
+    assert status.line("pubg", "en") == catalog.texts("en")["status_working"]
+
+
+def test_game_menu_shows_status_and_changes_are_announced():
+    import main
+
+    status.install({"pubg": "working"})
+    changes = status.install({"pubg": "updating"})
+    render = main.game_menu("en", "pubg")
+    assert render.text.startswith(catalog.texts("en")["status_updating"] + "\n\n")
+
+    sent = []
+
+    async def send_message(chat_id, text):
+        sent.append((chat_id, text))
+
+    asyncio.run(status.notify(types.SimpleNamespace(send_message=send_message), changes, chats=(42,)))
+    assert sent == [(42, f"🔔 {main.games['pubg']['title']}\n{catalog.texts('en')['status_updating']}")]
@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+import time
+
+import storage
+
+
+def test_sqlite_store_survives_restart(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    store = storage.SQLiteStateStore(path)
+    store.set("lang", 1, "ru")
+    store.set("lang", 2, "ja")
+    store.delete("lang", 2)
+    store.close()
+
+    reopened = storage.SQLiteStateStore(path)
+    assert reopened.get("lang", 1) == "ru"
+    assert reopened.get("lang", 2) is None
+    reopened.close()
+
+
+def test_set_rewrites_a_row_another_process_deleted(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    owner, pruner = storage.SQLiteStateStore(path), storage.SQLiteStateStore(path)
+    owner.set("lang", 1, "ru")
+    owner.flush()
+    pruner.delete("lang", 1)
+    pruner.close()
+    owner.set("lang", 1, "ru")
+    owner.close()
+
+    reopened = storage.SQLiteStateStore(path)
+    assert reopened.get("lang", 1) == "ru"
+    reopened.close()
+
+
+class RacingConnection:
+    """Runs ``during_read`` while get() reads a row, as another thread could."""
+
+    def __init__(self, conn, during_read):
+        self._conn = conn
+        self.during_read = during_read
+
+    def execute(self, sql, *args):
+        if sql.startswith("SELECT value") and self.during_read:
+            self.during_read, during_read = None, self.during_read
+            during_read()
+        return self._conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_change_during_a_database_read_is_not_shadowed_by_the_old_row(tmp_path):
+    store = storage.SQLiteStateStore(str(tmp_path / "state.sqlite3"), cache_size=1)
+    store.set("lang", 1, "ru")
+    store.set("lang", 2, "en")  # evicts user 1 from the cache
+    store.flush()
+    store._reader = RacingConnection(store._reader, lambda: store.delete("lang", 1))
+    assert store.get("lang", 1) is None
+    assert store.get("lang", 1) is None
+    store._reader = RacingConnection(store._reader._conn, lambda: store.set("lang", 2, "ja"))
+    store._cache.clear()
+    assert store.get("lang", 2) == "ja"
+    store.close()
+
+
+def test_lookups_do_not_wait_for_a_locked_database(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    store = storage.SQLiteStateStore(path, cache_size=1)
+    store.set("lang", 1, "ru")
+    store.set("lang", 2, "en")
+    store.flush()
+    # Another worker holds the write lock; our writer waits out its busy timeout.
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    store.set("lang", 3, "ja")
+    flushing = threading.Thread(target=store.flush)
+    flushing.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    assert store.get("lang", 1) == "ru"
+    assert store.get("lang", 3) == "ja"
+    assert time.perf_counter() - started < 0.05
+    flushing.join()
+    other.execute("ROLLBACK")
+    other.close()
+    store.flush()
+    store.close()
+    reopened = storage.SQLiteStateStore(path)
+    assert reopened.get("lang", 3) == "ja"
+    reopened.close()
+
+
+def test_sqlite_cache_is_bounded(tmp_path):
+    store = storage.SQLiteStateStore(str(tmp_path / "state.sqlite3"), cache_size=10)
+    for uid in range(100):
+        store.set("lang", uid, "en")
+    assert len(store._cache) == 10
+    assert store.get("lang", 0) == "en"
+    assert list(store.users("lang")) == list(range(100))
+    assert store.count("lang") == 100
+    store.close()
+
+
+def test_state_map_uses_configured_store(tmp_path, monkeypatch):
+    store = storage.SQLiteStateStore(str(tmp_path / "state.sqlite3"))
+    monkeypatch.setattr(storage, "_store", store)
+    languages = storage.StateMap("lang")
+    languages[5] = "tr"
+    assert languages.get(5) == "tr"
+    assert 5 in languages and 6 not in languages
+    del languages[5]
+    assert languages.get(5, "en") == "en"
+    store.close()
+
+
+WORKER = """
+import asyncio, sys, time
+sys.path.insert(0, sys.argv[3])
+import storage
+
+async def main(path, worker):
+    store = storage.SQLiteStateStore(path, cache_size=100, flush_interval=0.005, batch_size=100)
+    slowest = 0.0
+    for i in range(3000):
+        started = time.perf_counter()
+        store.set("lang", worker + 2 * i, "ru")
+        store.get("lang", worker + 2 * (i // 3))
+        slowest = max(slowest, time.perf_counter() - started)
+        if i % 20 == 0:
+            await asyncio.sleep(0.005)
+    store.close()
+    print(slowest)
+
+asyncio.run(main(sys.argv[1], int(sys.argv[2])))
+"""
+
+
+def test_workers_sharing_a_database_do_not_block_each_others_loop(tmp_path):
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    path = str(tmp_path / "state.sqlite3")
+    storage.SQLiteStateStore(path).close()
+    root = str(Path(__file__).resolve().parents[1])
+    workers = [
+        subprocess.Popen([sys.executable, "-c", WORKER, path, str(index), root], stdout=subprocess.PIPE, text=True)
+        for index in range(2)
+    ]
+    # A third writer keeps taking the write lock for longer than the busy timeout.
+    other = sqlite3.connect(path, isolation_level=None)
+    while any(worker.poll() is None for worker in workers):
+        other.execute("BEGIN IMMEDIATE")
+        time.sleep(0.3)
+        other.execute("COMMIT")
+        time.sleep(0.02)
+    other.close()
+    slowest = [float(worker.communicate(timeout=60)[0]) for worker in workers]
+    assert all(worker.returncode == 0 for worker in workers)
+    assert max(slowest) < 0.05
+    store = storage.SQLiteStateStore(path)
+    assert store.count("lang") == 6000
+    store.close()
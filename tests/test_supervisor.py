@@ -0,0 +1,86 @@
+import asyncio
+import json
+import sys
+
+import supervisor
+
+# Appends every received line to the file named by argv[1]; exits after argv[2] lines if given.
+ECHO_WORKER = """
+import sys
+limit = int(sys.argv[2]) if len(sys.argv) > 2 else None
+for count, line in enumerate(sys.stdin, 1):
+    with open(sys.argv[1], "a") as f:
+        f.write(line)
+    if count == limit:
+        sys.exit(3)
+"""
+
+
+def update(update_id, uid):
+    return {"update_id": update_id, "callback_query": {"id": str(update_id), "from": {"id": uid}, "data": "1:main"}}
+
+
+def test_user_id_and_sharding_are_stable():
+    assert supervisor.user_id(update(1, 42)) == 42
+    assert supervisor.user_id({"update_id": 2, "channel_post": {"chat": {"id": -5}}}) is None
+    sup = supervisor.Supervisor(3, ["true"], env={})
+    assert sup.shard(update(1, 42)) is sup.shard(update(9, 42)) is sup.workers[0]
+    assert sup.shard(update(1, 43)) is sup.workers[1]
+    assert sup.shard({"update_id": 5}) is sup.workers[2]
+
+
+def test_worker_env_assigns_metrics_ports():
+    sup = supervisor.Supervisor(2, ["true"], env={"METRICS_PORT": "9464"})
+    assert [w.env["METRICS_PORT"] for w in sup.workers] == ["9465", "9466"]
+
+
+def test_worker_env_splits_the_global_send_rates():
+    sup = supervisor.Supervisor(3, ["true"], env={"FLOOD_OVERALL_RATE": "30", "BROADCAST_RATE": "21"})
+    assert {w.env["FLOOD_OVERALL_RATE"] for w in sup.workers} == {"10.0"}
+    assert {w.env["BROADCAST_RATE"] for w in sup.workers} == {"7.0"}
+
+
+def read_ids(path):
+    return [json.loads(line)["update_id"] for line in path.read_text().splitlines()]
+
+
+def test_updates_reach_their_worker_in_order_and_are_drained(tmp_path):
+    async def scenario():
+        sup = supervisor.Supervisor(2, [], env={})
+        for worker in sup.workers:
+            worker.command = [sys.executable, "-c", ECHO_WORKER, str(tmp_path / f"w{worker.index}")]
+        await sup.start()
+        for i in range(1, 21):
+            await sup.dispatch(update(i, i % 4))
+        await sup.stop()
+        return sup
+
+    sup = asyncio.run(scenario())
+    assert read_ids(tmp_path / "w0") == [i for i in range(1, 21) if i % 4 in (0, 2)]
+    assert read_ids(tmp_path / "w1") == [i for i in range(1, 21) if i % 4 in (1, 3)]
+    assert sup.stats()["forwarded"] == 20
+
+
+def test_crashed_worker_is_restarted_and_receives_buffered_updates(tmp_path):
+    out = tmp_path / "w0"
+
+    async def scenario():
+        sup = supervisor.Supervisor(1, [sys.executable, "-c", ECHO_WORKER, str(out), "2"], env={},
+                                    restart_delay=0.01)
+        await sup.start()
+        await sup.dispatch(update(1, 7))
+        await sup.dispatch(update(2, 7))
+        # The worker exits after two updates; later ones wait for the restart.
+        while sup.workers[0].restarts == 0:
+            await sup.dispatch(update(100 + sup.stats()["forwarded"], 7))
+            await asyncio.sleep(0.02)
+        await sup.dispatch(update(999, 7))
+        await asyncio.sleep(0.2)
+        await sup.stop()
+        return sup
+
+    sup = asyncio.run(scenario())
+    ids = read_ids(out)
+    assert ids[:2] == [1, 2]
+    assert 999 in ids
+    assert sup.workers[0].restarts >= 1
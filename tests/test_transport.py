@@ -0,0 +1,35 @@
+import asyncio
+
+import transport
+
+
+def test_polling_gets_its_own_single_connection_pool():
+    replies, polling = transport.build_requests(16, keepalive=60, read_timeout=7)
+    assert replies.options["connection_pool_size"] == 16
+    assert polling.options["connection_pool_size"] == 1
+    assert replies.options["read_timeout"] == polling.options["read_timeout"] == 7
+    limits = replies._client.limits
+    assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (16, 16, 60)
+
+
+def test_requests_wait_for_a_free_connection_before_entering_httpx(monkeypatch):
+    peak = 0
+
+    async def do_request(self, *args, **kwargs):
+        nonlocal peak
+        peak = max(peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        return 200, b"{}"
+
+    monkeypatch.setattr(transport.HTTPXRequest, "do_request", do_request, raising=False)
+
+    async def scenario():
+        request = transport.PooledRequest(connection_pool_size=3)
+        pending = [asyncio.create_task(request.do_request("url", "POST")) for _ in range(10)]
+        await asyncio.sleep(0.005)
+        assert request.stats() == {"in_flight": 3, "waiting": 7}
+        await asyncio.gather(*pending)
+        return request.stats()
+
+    assert asyncio.run(scenario()) == {"in_flight": 0, "waiting": 0}
+    assert peak == 3
@@ -0,0 +1,59 @@
+import asyncio
+import json
+import types
+
+import httpserver
+import webhook
+
+
+class FakeUpdate:
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def de_json(cls, data, bot):
+        return cls(data) if data else None
+
+
+async def post(port, path, payload, headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    head = [f"POST {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}", "Connection: close"]
+    head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    writer.close()
+    return status
+
+
+def test_webhook_queues_updates_with_valid_secret(monkeypatch):
+    monkeypatch.setattr(webhook, "Update", FakeUpdate)
+    update = {"update_id": 1, "callback_query": {"id": "1", "data": "faq"}}
+
+    async def scenario():
+        app = types.SimpleNamespace(bot=None, update_queue=asyncio.Queue())
+        receiver = webhook.WebhookReceiver(app, "/hook", secret_token="s3cret")
+        server = await httpserver.start_server(receiver, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        statuses = [
+            await post(port, "/hook", update, {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}),
+            await post(port, "/hook", update, {"X-Telegram-Bot-Api-Secret-Token": "wrong"}),
+            await post(port, "/other", update),
+            await post(port, "/hook", {}, {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}),
+            await post(port, "/hook", None, {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}),
+        ]
+        server.close()
+        return statuses, app.update_queue
+
+    statuses, queue = asyncio.run(scenario())
+    assert statuses == [200, 403, 404, 400, 400]
+    assert queue.qsize() == 1
+    assert queue.get_nowait().data == update
+
+
+def test_parse_args_webhook_mode():
+    import main
+
+    args = main.parse_args(["--mode", "webhook", "--port", "9000", "--path", "/tg"])
+    assert (args.mode, args.port, args.path) == ("webhook", 9000, "/tg")
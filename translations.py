@@ -1,187 +0,0 @@
-
-translations = {
-    "start": {
-        "en": "🌐 Please choose your language:",
-        "ru": "🌐 Пожалуйста, выберите язык:",
-        "zh": "🌐 请选择你的语言：",
-        "ko": "🌐 언어를 선택하세요:",
-        "tr": "🌐 Lütfen bir dil seçin:",
-        "ja": "🌐 言語を選択してください："
-    },
-    "language_selected": {
-        "en": "✅ Language set to English.",
-        "ru": "✅ Язык установлен на русский.",
-        "zh": "✅ 语言设置为中文。",
-        "ko": "✅ 언어가 한국어로 설정되었습니다。",
-        "tr": "✅ Dil Türkçe olarak ayarlandı.",
-        "ja": "✅ 言語は日本語に設定されました。"
-    },
-    "choose_game": {
-        "en": "🎮 Choose a product:",
-        "ru": "🎮 Выберите продукт:",
-        "zh": "🎮 选择一个产品：",
-        "ko": "🎮 제품을 선택하세요:",
-        "tr": "🎮 Bir ürün seçin:",
-        "ja": "🎮 製品を選んでください："
-    },
-    "choose_subscription": {
-        "en": "⏳ Choose subscription duration:",
-        "ru": "⏳ Выберите срок подписки:",
-        "zh": "⏳ 选择订阅时长：",
-        "ko": "⏳ 구독 기간을 선택하세요:",
-        "tr": "⏳ Abonelik süresini seçin:",
-        "ja": "⏳ サブスクリプション期間を選んでください："
-    },
-    "day": {
-        "en": "day",
-        "ru": "день",
-        "zh": "天",
-        "ko": "일",
-        "tr": "gün",
-        "ja": "日"
-    },
-    "days": {
-        "en": "days",
-        "ru": "дней",
-        "zh": "天",
-        "ko": "일",
-        "tr": "gün",
-        "ja": "日"
-    },
-    "subscription_result": {
-        "en": """✅ You selected *{title}* for *{days} days*.
-
-{desc}
-
-💳 [Pay here]({link})""",
-        "ru": """✅ Вы выбрали *{title}* на *{days} дней*.
-
-{desc}
-
-💳 [Оплатить здесь]({link})""",
-        "zh": """✅ 你选择了 *{title}*，订阅 *{days} 天*。
-
-{desc}
-
-💳 [点击支付]({link})""",
-        "ko": """✅ *{title}*을 *{days}일* 동안 선택했습니다。
-
-{desc}
-
-💳 [여기서 결제]({link})""",
-        "tr": """✅ *{title}* için *{days} gün* seçtiniz。
-
-{desc}
-
-💳 [Buradan ödeyin]({link})""",
-        "ja": """✅ *{title}* を *{days}日間* 選択しました。
-
-{desc}
-
-💳 [こちらから支払い]({link})"""
-    },
-    "back": {
-        "en": "🔙 Back to menu",
-        "ru": "🔙 Назад в меню",
-        "zh": "🔙 返回菜单",
-        "ko": "🔙 메뉴로 돌아가기",
-        "tr": "🔙 Menüye geri dön",
-        "ja": "🔙 メニューに戻る"
-    },
-    "status_coming_soon": {
-        "en": "📊 Status page coming soon.",
-        "ru": "📊 Раздел статуса скоро появится.",
-        "zh": "📊 状态页面即将推出。",
-        "ko": "📊 상태 페이지가 곧 제공됩니다。",
-        "tr": "📊 Durum sayfası yakında geliyor。",
-        "ja": "📊 ステータスページは近日公開予定です。"
-    },
-    "menu_title": {
-        "en": "📋 Main menu:",
-        "ru": "📋 Главное меню:",
-        "zh": "📋 主菜单：",
-        "ko": "📋 메인 메뉴:",
-        "tr": "📋 Ana menü:",
-        "ja": "📋 メインメニュー："
-    },
-    "menu_website": {
-        "en": "🌐 Website",
-        "ru": "🌐 Сайт",
-        "zh": "🌐 网站",
-        "ko": "🌐 웹사이트",
-        "tr": "🌐 Web sitesi",
-        "ja": "🌐 ウェブサイト"
-    },
-    "menu_game": {
-        "en": "🎮 Choose product",
-        "ru": "🎮 Выбрать продукт",
-        "zh": "🎮 选择产品",
-        "ko": "🎮 제품 선택",
-        "tr": "🎮 Ürün seç",
-        "ja": "🎮 製品を選択"
-    },
-    "menu_loader": {
-        "en": "⬇️ Download loader",
-        "ru": "⬇️ Скачать лоадер",
-        "zh": "⬇️ 下载加载器",
-        "ko": "⬇️ 로더 다운로드",
-        "tr": "⬇️ Yükleyiciyi indir",
-        "ja": "⬇️ ローダーをダウンロード"
-    },
-    "menu_status": {
-        "en": "📊 Statuses",
-        "ru": "📊 Статусы",
-        "zh": "📊 状态列表",
-        "ko": "📊 상태 목록",
-        "tr": "📊 Durumlar",
-        "ja": "📊 ステータス一覧"
-    },
-    "menu_support": {
-        "en": "💬 Support",
-        "ru": "💬 Поддержка",
-        "zh": "💬 支持",
-        "ko": "💬 지원",
-        "tr": "💬 Destek",
-        "ja": "💬 サポート"
-    },
-    "menu_language": {
-        "en": "🗣 Change language",
-        "ru": "🗣 Изменить язык",
-        "zh": "🗣 更改语言",
-        "ko": "🗣 언어 변경",
-        "tr": "🗣 Dili değiştir",
-        "ja": "🗣 言語を変更"
-    },
-    "menu_instruction": {
-        "en": "📘 Instruction",
-        "ru": "📘 Инструкция",
-        "zh": "📘 指南",
-        "ko": "📘 안내서",
-        "tr": "📘 Talimat",
-        "ja": "📘 説明"
-    },
-    "menu_faq": {
-        "en": "❓ FAQ",
-        "ru": "❓ Частые вопросы",
-        "zh": "❓ 常见问题",
-        "ko": "❓ 자주 묻는 질문",
-        "tr": "❓ SSS",
-        "ja": "❓ よくある質問"
-    },
-    "loader_password": {
-        "en": "🔒 Archive password: 123\n⬇️ [Download loader]({url})",
-        "ru": "🔒 Пароль к архиву: 123\n⬇️ [Скачать лоадер]({url})",
-        "zh": "🔒 存档密码: 123\n⬇️ [下载加载器]({url})",
-        "ko": "🔒 압축 파일 암호: 123\n⬇️ [ローダー 다운로드]({url})",
-        "tr": "🔒 Arşiv parolası: 123\n⬇️ [Yükleyiciyi indir]({url})",
-        "ja": "🔒 アーカイブのパスワード: 123\n⬇️ [ローダーをダウンロード]({url})"
-    },
-    "session_timeout": {
-        "en": "🙏 Thank you for contacting us. Returning to the main menu.",
-        "ru": "🙏 Спасибо за обращение. Возвращаемся в главное меню.",
-        "zh": "🙏 感谢你的咨询。返回主菜单。",
-        "ko": "🙏 문의해 주셔서 감사합니다. 메인 메뉴로 돌아갑니다.",
-        "tr": "🙏 İletişime geçtiğiniz için teşekkürler. Ana menüye dönülüyor.",
-        "ja": "🙏 お問い合わせありがとうございます。メインメニューに戻ります。"
-    }
-}
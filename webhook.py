@@ -0,0 +1,93 @@
+"""Webhook ingress: receive updates over HTTP instead of long polling."""
+
+import asyncio
+import hmac
+import logging
+import signal
+
+from telegram import Update
+
+from httpserver import Request, Response, start_server
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+
+class WebhookReceiver:
+    """HTTP handler that validates webhook calls and queues the updates."""
+
+    def __init__(self, app, path: str, secret_token: str | None = None):
+        self.app = app
+        self.path = path
+        self.secret_token = secret_token
+
+    async def __call__(self, request: Request) -> Response:
+        if request.path != self.path:
+            return Response(404, b"not found")
+        if request.method != "POST":
+            return Response(405, b"method not allowed")
+        if self.secret_token and not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, ""), self.secret_token
+        ):
+            return Response(403, b"forbidden")
+        try:
+            update = self.parse(request.json())
+        except Exception:
+            logger.warning("Rejected malformed webhook payload")
+            return Response(400, b"bad request")
+        await self.deliver(update)
+        return Response(200, b"ok")
+
+    def parse(self, data):
+        # de_json returns None for an empty body, null or {}.
+        update = Update.de_json(data, self.app.bot)
+        if not isinstance(update, Update):
+            raise ValueError("not an update")
+        return update
+
+    async def deliver(self, update) -> None:
+        await self.app.update_queue.put(update)
+
+
+async def serve(app, listen: str, port: int, path: str, secret_token: str | None = None,
+                webhook_url: str | None = None, delete_on_exit: bool = False,
+                stop_event: asyncio.Event | None = None) -> None:
+    """Run ``app`` fed by a webhook receiver until SIGINT/SIGTERM or ``stop_event``.
+
+    When ``webhook_url`` is given, the webhook is registered with Telegram on
+    startup. With ``delete_on_exit`` it is removed again on shutdown, which
+    should only be used by the last instance behind a load balancer.
+    """
+    stop_event = stop_event or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+    try:
+        await app.start()
+        if webhook_url:
+            await app.bot.set_webhook(webhook_url, secret_token=secret_token, allowed_updates=Update.ALL_TYPES)
+        server = await start_server(WebhookReceiver(app, path, secret_token), listen, port)
+        logger.info("Webhook receiver listening on %s:%s%s", listen, port, path)
+        try:
+            await stop_event.wait()
+        finally:
+            # Idle keep-alive connections are simply dropped with the loop.
+            server.close()
+            if delete_on_exit:
+                await app.bot.delete_webhook()
+            # Stopping processes every update that was already accepted.
+            await app.stop()
+            if app.post_stop:
+                await app.post_stop(app)
+    finally:
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)